@@ -15,6 +15,7 @@ from DocStringGenerator.ConfigManager import ConfigManager
 from DocStringGenerator.CodeProcessor import CodeProcessor
 from DocStringGenerator.DependencyContainer import DependencyContainer
 from DocStringGenerator.CommunicatorManager import CommunicatorManager
+from DocStringGenerator.CoverageScanner import CoverageScanner
 
 dependencies = DependencyContainer()
 
@@ -24,10 +25,9 @@ def clear_screen():
     else:
         os.system('clear')
 
-def switch_bot(bot, model):
+def switch_bot(bot, model, communicator_manager: CommunicatorManager):
     ConfigManager().set_config("bot", bot)
     ConfigManager().set_config("model", model)
-    communicator_manager = dependencies.resolve(CommunicatorManager)
     communicator_manager.initialize_bot_communicator()
 
 def display_available_bots():
@@ -45,7 +45,14 @@ def main():
     parser.add_argument('--bot', type=str, help='The bot to use')
     parser.add_argument('--model', type=str, help='The model to use')
     parser.add_argument('--source_path', type=str, help='Path to the source files')
-    parser.add_argument('--output_path', type=str, help='Path to save the output files')
+    parser.add_argument('--output_path', type=str, help='Folder receiving a mirror of the source tree with the processed files')
+    parser.add_argument('--in_place', action='store_true', help='Overwrite the source files instead of writing copies')
+    parser.add_argument('--coverage', action='store_true', help='Report missing docstrings without contacting a bot')
+    parser.add_argument('--schedule', type=str, choices=['walk', 'recent', 'smallest', 'largest'], help='Order in which the files of a folder are processed')
+    parser.add_argument('--time_budget', type=float, help='Seconds after which no further files are started')
+    parser.add_argument('--diff', type=str, metavar='REV_RANGE', help="Only document the definitions changed in a git revision range, e.g. 'HEAD~1' or 'main...HEAD'")
+    parser.add_argument('--watch', action='store_true', help='Keep running and document the definitions edited in each saved file')
+    parser.add_argument('--token_budget', type=int, help='Estimated tokens after which no further files are started')
 
     args = parser.parse_args()
 
@@ -58,9 +65,24 @@ def main():
     if args.model:
         config['model'] = args.model
     if args.source_path:
-        config['source_path'] = args.source_path
+        config['path'] = args.source_path
     if args.output_path:
         config['output_path'] = args.output_path
+    if args.in_place:
+        config['in_place'] = True
+    if args.schedule:
+        config['schedule'] = args.schedule
+    if args.time_budget is not None:
+        config['time_budget'] = args.time_budget
+    if args.token_budget is not None:
+        config['token_budget'] = args.token_budget
+    if args.diff:
+        config['diff'] = args.diff
+
+    if args.coverage:
+        coverage_response = CoverageScanner().verify(config.get('path', ''))
+        print(coverage_response.error_message)
+        sys.exit(0 if coverage_response.is_valid else 1)
 
     # Ask for missing config values
     if 'bot' not in config or not config['bot']:
@@ -82,10 +104,8 @@ def main():
             chosen_model_index = int(input("Please choose a model by entering its number: "))
         config['model'] = chosen_bot_models[chosen_model_index - 1]
 
-    if 'source_path' not in config or not config['source_path']:
-        config['source_path'] = input("Please enter the source path: ")
-    if 'output_path' not in config or not config['output_path']:
-        config['output_path'] = input("Please enter the output path: ")
+    if 'path' not in config or not config['path']:
+        config['path'] = input("Please enter the source path: ")
 
     config_manager.update_config(config)
 
@@ -102,6 +122,14 @@ def main():
 
     code_processor = CodeProcessor()
 
+    if args.watch:
+        switch_bot(config['bot'], config.get('model'), code_processor.communicator_manager)
+        try:
+            code_processor.watch()
+        except KeyboardInterrupt:
+            pass
+        return
+
     if enabled_bots:
         index = 0
         for bot_info in enabled_bots:
@@ -112,14 +140,14 @@ def main():
                 
             bot = bot_info['bot']
             model = bot_info.get('model')
-            switch_bot(bot, model)
+            switch_bot(bot, model, code_processor.communicator_manager)
 
-            response = code_processor.process_folder_or_file(config['source_path'], config['output_path'])
+            response = code_processor.process_folder_or_file()
             if not response.is_valid:
-                failed_files = response.content
+                failed_files = response.content or []
                 for file in failed_files:
-                    print(f"Failed to process {file.file_name}")
-                    print(f"Error message: {file.response}")
+                    print(f"Failed to process {file['file_name']}")
+                    print(f"Error message: {file['response'].error_message}")
             index += 1
 
 if __name__ == '__main__':
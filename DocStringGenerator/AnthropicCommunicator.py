@@ -21,10 +21,18 @@ class AnthropicCommunicator(BaseBotCommunicator):
         self.config = ConfigManager().config
         super().__init__()
         self.logger : Logger = dependencies.resolve(Logger)
-        self.anthropic_url = 'https://api.anthropic.com/v1/complete'
-        self.prompt = ''
+        base_url: str = self.config.get('anthropic_base_url') or 'https://api.anthropic.com'
+        self.anthropic_url = f"{base_url.rstrip('/')}/v1/complete"
 
-    def ask(self, prompt: str, replacements: dict[str, str]) -> APIResponse:
+    @property
+    def prompt(self) -> str:
+        return self.conversation(str)
+
+    @prompt.setter
+    def prompt(self, prompt: str):
+        self.set_conversation(prompt)
+
+    def ask(self, prompt: str, replacements: dict[str, str], keep_history: bool = True) -> APIResponse:
 
         prompt_response = self.format_prompt(prompt, replacements)
         if not prompt_response.is_valid:
@@ -34,7 +42,9 @@ class AnthropicCommunicator(BaseBotCommunicator):
             new_prompt = '\n\nHuman: ' + prompt_response.content + '\n\nAssistant:'
             self.logger.log_line("sending prompt: " + new_prompt)
             
-            self.prompt += new_prompt
+            if keep_history:
+                self.prompt += new_prompt
+            full_prompt = self.prompt if keep_history else new_prompt
             api_key = self.config.get('ANTHROPIC_API_KEY')
             if not api_key:
                 return APIResponse(None, is_valid=False, error_message="No api key found")
@@ -43,9 +53,13 @@ class AnthropicCommunicator(BaseBotCommunicator):
             models: list[str] = BOTS[self.config.get('bot', '')]
             if model not in models:
                 return APIResponse('', False, f'Invalid bot: {model}')
-            data = {'model': model, 'prompt': self.prompt, 'max_tokens_to_sample': 4000, 'stream': True}
+            # Prefilling the answer with '{' constrains the completion to continue a JSON object
+            prefill = '{' if self.config.get('structured_output', True) else ''
+            data = {'model': model, 'prompt': full_prompt + prefill, 'max_tokens_to_sample': 4000, 'stream': True}
             response: Response = requests.post(self.anthropic_url, headers=headers, data=json.dumps(data), stream=True)
             response_handled: APIResponse = self.handle_response(response)
+            if response_handled.is_valid and prefill:
+                response_handled.content = prefill + response_handled.content
             return response_handled
         except Exception as e:
             return APIResponse(None, is_valid=False, error_message=str(e))
@@ -55,6 +69,8 @@ class AnthropicCommunicator(BaseBotCommunicator):
         full_completion = ''
         try:
             self.logger.log_line("Receiving response from Anthropic API...")
+            if response.status_code != 200:
+                return APIResponse(None, is_valid=False, error_message=f'Anthropic API returned status {response.status_code}: {response.text}')
             for line in response.iter_lines():
                 if line:
                     current_time: float = time.time()
@@ -1,9 +1,16 @@
 import json
 import os
+import threading
+from typing import Callable
 from bots import *
 from dotenv import load_dotenv
 from DocStringGenerator.Utility import *
 from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.DependencyContainer import DependencyContainer
+from DocStringGenerator.Instrumentation import Instrumentation, instrumented, utf8_size
+from DocStringGenerator.Logger import Logger
+from DocStringGenerator.ResponseArchive import ResponseArchive, DEFAULT_ARCHIVE_PATH
+dependencies = DependencyContainer()
 
 class BaseBotCommunicator:
 
@@ -15,31 +22,111 @@ class BaseBotCommunicator:
         configManager.set_config('OPENAI_API_KEY', os.getenv('OPENAI_API_KEY'))
         configManager.set_config('ANTHROPIC_API_KEY', os.getenv('ANTHROPIC_API_KEY'))
         configManager.set_config('GOOGLE_API_KEY', os.getenv('GOOGLE_API_KEY'))
+        self.instrumentation: Instrumentation = dependencies.resolve(Instrumentation)
+        self._conversations: dict[str, Any] = {}
+        self._conversations_lock = threading.Lock()
 
-    def ask(self, prompt: str, replacements: dict[str, str]) -> APIResponse:
+    def conversation(self, create: Callable[[], Any]) -> Any:
         """
-        Sends a request to the respective bot API or file system. This method should be implemented by subclasses.
+        Returns the conversation history of the file being processed (the file of Logger.context),
+        created on first use. Each file has its own history, so files processed at the same time
+        never see each other's messages.
+        """
+        key = Logger.current_context().get('file', '')
+        with self._conversations_lock:
+            if key not in self._conversations:
+                self._conversations[key] = create()
+            return self._conversations[key]
+
+    def set_conversation(self, history: Any):
+        with self._conversations_lock:
+            self._conversations[Logger.current_context().get('file', '')] = history
+
+    def end_conversation(self):
+        """Forgets the history of the file being processed once it is done."""
+        with self._conversations_lock:
+            self._conversations.pop(Logger.current_context().get('file', ''), None)
+
+    def ask(self, prompt: str, replacements: dict[str, str], keep_history: bool = True) -> APIResponse:
+        """
+        Sends a request to the respective bot API or file system. With keep_history False the request
+        is sent without the conversation so far and is not added to it. This method should be implemented by subclasses.
         """
         raise NotImplementedError('This method should be implemented by subclasses')
 
+    @instrumented('format_prompt')
     def format_prompt(self, prompt_template: str, replacements: dict[str, str]) -> APIResponse:
         """
         Formats the prompt by replacing placeholders with actual values provided in 'replacements'.
         """
         try:
-            for key, value in replacements.items():
-                prompt_template = prompt_template.replace(f'{{{key}}}', value)
-            return APIResponse(prompt_template, True)
+            return APIResponse(self._fill_prompt(prompt_template, replacements), True)
         except Exception as e:
             return APIResponse('', False, str(e))
 
+    @staticmethod
+    def _fill_prompt(prompt_template: str, replacements: dict[str, str]) -> str:
+        for key, value in replacements.items():
+            prompt_template = prompt_template.replace(f'{{{key}}}', value)
+        return prompt_template
+
+    def response_archive(self) -> ResponseArchive | None:
+        """
+        Returns the archive every request and response is recorded in when keep_responses is set.
+        """
+        if not self.config.get('keep_responses', False):
+            return None
+        return ResponseArchive.shared(self.config.get('response_archive_path', '') or DEFAULT_ARCHIVE_PATH)
+
+    def archive_response(self, prompt_template: str, replacements: dict[str, str], response: APIResponse):
+        archive = self.response_archive()
+        if archive is None:
+            return
+        context = Logger.current_context()
+        content = response.content if isinstance(response.content, str) else json.dumps(response.content, default=str)
+        archive.record(self._fill_prompt(prompt_template, replacements), content, response.is_valid, response.error_message,
+                       file=context.get('file', ''), bot=self.config.get('bot', ''), model=self.config.get('model', ''),
+                       job=context.get('job', ''))
+
+    def ask_instrumented(self, prompt_template: str, replacements: dict[str, str], keep_history: bool = True) -> APIResponse:
+        """
+        Calls ask() inside an 'ask' instrumentation span recording latency, bytes and estimated tokens,
+        and records the request and response in the response archive.
+        """
+        prompt_parts = [prompt_template, *replacements.values()]
+        prompt_size = sum(utf8_size(part) for part in prompt_parts)
+        prompt_tokens = sum(Instrumentation.estimate_tokens(part) for part in prompt_parts)
+        with self.instrumentation.span('ask', bytes_in=prompt_size, tokens_in=prompt_tokens) as span:
+            response = self.ask(prompt_template, replacements, keep_history)
+            self.archive_response(prompt_template, replacements, response)
+            span.ok = response.is_valid
+            if response.is_valid and isinstance(response.content, str):
+                span.set_output(response.content, count_tokens=True)
+            return response
+
+    @instrumented('ask_retry')
     def ask_retry(self, last_error_message: str, retry_count: int) -> APIResponse:
         prompt_template = Utility.load_prompt('prompts/prompt_retry')
         replacements: dict[str, str] = {
             'last_error_message': last_error_message,
             'retry_count': str(retry_count)
         }
-        return self.ask(prompt_template, replacements)
+        return self.ask_instrumented(prompt_template, replacements)
+
+    @instrumented('ask_retry_part')
+    def ask_retry_part(self, source_code: str, last_error_message: str, retry_count: int) -> APIResponse:
+        """
+        Asks again for the docstrings of one part of the code whose response was invalid. The request
+        carries the part's source and is sent without conversation history, so it stands on its own.
+        """
+        prompt_template = Utility.load_prompt('prompts/prompt_retry_part')
+        replacements: dict[str, str] = {
+            'source_code': source_code,
+            'last_error_message': last_error_message,
+            'max_line_length': str(self.config.get('max_line_length', 79)),
+            'retry_count': str(retry_count)
+        }
+        return self.ask_instrumented(prompt_template, replacements, keep_history=False)
 
     def _format_class_errors(self, class_errors: list[dict[str, str]]) -> str:
         error_string = ''
@@ -47,13 +134,14 @@ class BaseBotCommunicator:
             error_string += f'{class_error["class"]}: {class_error["error"]}\n'
         return error_string
     
+    @instrumented('ask_retry_examples')
     def ask_retry_examples(self, class_errors: list[dict[str, str]]) -> APIResponse:
         prompt_template = Utility.load_prompt('prompts/prompt_retry_example')
         replacements = {
             'class_errors': self._format_class_errors(class_errors),
             'example_retry': 'True'
         }
-        return self.ask(prompt_template, replacements)
+        return self.ask_instrumented(prompt_template, replacements)
 
     def ask_for_docstrings(self, source_code: str, retry_count: int=1) -> APIResponse:
         prompt_template = Utility.load_prompt('prompts/prompt_docStrings')
@@ -66,14 +154,20 @@ class BaseBotCommunicator:
             'retry_count': str(retry_count)
         }
 
-        return self.ask(prompt_template, replacements)
+        return self.ask_instrumented(prompt_template, replacements)
 
-    def ask_missing_docstrings(self, class_names: str, retry_count: int=1) -> APIResponse:
+    @instrumented('ask_missing_docstrings')
+    def ask_missing_docstrings(self, class_names: list[str], retry_count: int=1, source_snippets: str='') -> APIResponse:
+        """
+        Asks for the docstrings of the given definitions. The request carries the source of those
+        definitions and is sent without conversation history, so it stands on its own.
+        """
         prompt_template = Utility.load_prompt('prompts/prompt_missingDocStrings')
         replacements: dict[str, str] = {
             'function_names': json.dumps(class_names),
+            'source_snippets': source_snippets,
             'retry_count': str(retry_count),
             'ask_missing': 'True'
         }
-        return self.ask(prompt_template, replacements)
+        return self.ask_instrumented(prompt_template, replacements, keep_history=False)
 
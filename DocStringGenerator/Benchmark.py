@@ -0,0 +1,274 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.DependencyContainer import DependencyContainer
+dependencies = DependencyContainer()
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.CodeProcessor import CodeProcessor
+from DocStringGenerator.CommunicatorManager import CommunicatorManager
+from DocStringGenerator.DocstringProcessor import DocstringProcessor
+from DocStringGenerator.FileCommunicator import FileCommunicator
+from DocStringGenerator.Instrumentation import Instrumentation
+from DocStringGenerator.Utility import APIResponse
+
+DEFAULT_SIZES = [100, 1000, 10000, 50000]
+DEFAULT_RESULTS_PATH = 'benchmark_results.json'
+FIXTURE_SUFFIXES = ['.response.json', '.response2.json', '.response3.json', '.example.json', '.missing.json']
+
+class SyntheticModuleGenerator:
+    """Builds deterministic, undocumented Python modules together with a matching bot response."""
+
+    def __init__(self, seed: int = 0, methods_per_class: int = 8):
+        self.seed = seed
+        self.methods_per_class = methods_per_class
+
+    def generate(self, num_lines: int) -> tuple[str, dict[str, Any]]:
+        """Returns (source_code, response) where source_code has at least num_lines lines."""
+        rng = random.Random(self.seed)
+        lines: list[str] = []
+        classes: dict[str, Any] = {}
+        global_functions: dict[str, str] = {}
+        index = 0
+        while len(lines) < num_lines:
+            class_name = f'Synthetic{index}'
+            methods: dict[str, str] = {}
+            lines.append(f'class {class_name}:')
+            for method_index in range(self.methods_per_class):
+                method_name = f'method_{method_index}'
+                factor = rng.randint(2, 9)
+                lines.extend([
+                    f'    def {method_name}(self, value):',
+                    f'        result = value * {factor}',
+                    f'        if result > {factor * 10}:',
+                    '            return result - 1',
+                    '        return result',
+                    ''
+                ])
+                methods[method_name] = f'Multiplies value by {factor} and trims large results.'
+            classes[class_name] = {
+                'docstring': f'Synthetic class number {index}.',
+                'example': f'instance = {class_name}()\nprint(instance.method_0(1))',
+                'methods': methods
+            }
+            function_name = f'helper_{index}'
+            lines.extend([
+                f'def {function_name}(items):',
+                '    total = 0',
+                '    for item in items:',
+                '        total += item',
+                '    return total',
+                ''
+            ])
+            global_functions[function_name] = 'Sums the given items.'
+            index += 1
+        response = {'docstrings': {**classes, 'global_functions': global_functions}}
+        return '\n'.join(lines) + '\n', response
+
+    def write_fixtures(self, directory: Path, name: str, num_lines: int) -> tuple[Path, Path]:
+        """Writes name.py and the FileCommunicator response files; returns (source_path, model_path)."""
+        source_code, response = self.generate(num_lines)
+        source_path = Path(directory, f'{name}.py')
+        source_path.write_text(source_code)
+        model_path = Path(directory, name)
+        response_text = json.dumps(response)
+        for suffix in FIXTURE_SUFFIXES:
+            Path(f'{model_path}{suffix}').write_text(response_text)
+        return source_path, model_path
+
+class BenchmarkRunner:
+    """
+    Runs CodeProcessor end to end against canned FileCommunicator responses with simulated
+    network latency, collecting wall time, CPU time, peak memory and per-phase statistics.
+    """
+
+    def __init__(self, latency: float = 0, jitter: float = 0, failure_rate: float = 0, seed: int = 0, measure_memory: bool = True):
+        self.settings: dict[str, Any] = {
+            'simulated_latency': latency,
+            'simulated_jitter': jitter,
+            'simulated_failure_rate': failure_rate,
+            'simulated_seed': seed,
+            'verbose': False,
+            'wipe_docstrings': False,
+            'dry_run': True,
+            'bot': 'File',
+            'instrumentation_report': ''
+        }
+        self.generator = SyntheticModuleGenerator(seed)
+        self.measure_memory = measure_memory
+        self.code_processor: CodeProcessor = dependencies.resolve(CodeProcessor)
+        self.instrumentation: Instrumentation = dependencies.resolve(Instrumentation)
+
+    @contextmanager
+    def _configured(self, model_path: Path, path: Path | None = None) -> Iterator[None]:
+        config = ConfigManager().config
+        saved_config = dict(config)
+        communicator_manager: CommunicatorManager = self.code_processor.communicator_manager
+        saved_communicator = communicator_manager.bot_communicator
+        # Built before the settings are applied, which then override the verbose flag it sets
+        communicator = FileCommunicator()
+        config.update(self.settings)
+        config['model'] = str(model_path)
+        config['path'] = str(path) if path else ''
+        communicator.random.seed(config.get('simulated_seed'))
+        communicator_manager.bot_communicator = communicator
+        try:
+            yield
+        finally:
+            config.clear()
+            config.update(saved_config)
+            communicator_manager.bot_communicator = saved_communicator
+
+    def _measure(self, run: Callable[[], APIResponse]) -> dict[str, Any]:
+        self.instrumentation.reset()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        response = run()
+        result: dict[str, Any] = {
+            'valid': response.is_valid,
+            'wall_time': time.perf_counter() - wall_start,
+            'cpu_time': time.process_time() - cpu_start,
+            'phases': self.instrumentation.summary()['phases']
+        }
+        if self.measure_memory:
+            # Separate pass: tracemalloc slows allocation-heavy code too much to time it in the same run
+            tracemalloc.start()
+            try:
+                run()
+                result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        return result
+
+    def run_process_code(self, num_lines: int) -> dict[str, Any]:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source_path, model_path = self.generator.write_fixtures(Path(tmpdir), f'bench_{num_lines}', num_lines)
+            source_code = source_path.read_text()
+            with self._configured(model_path):
+                result = self._measure(lambda: self.code_processor.process_code(source_code))
+        result.update({'name': f'process_code[{num_lines}]', 'lines': source_code.count('\n')})
+        result['lines_per_second'] = result['lines'] / result['wall_time'] if result['wall_time'] else 0
+        return result
+
+    def run_process_folder(self, num_files: int, lines_per_file: int) -> dict[str, Any]:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fixtures_path = Path(tmpdir, 'fixtures')
+            source_folder = Path(tmpdir, 'source')
+            fixtures_path.mkdir()
+            source_folder.mkdir()
+            source_path, model_path = self.generator.write_fixtures(fixtures_path, 'bench_folder', lines_per_file)
+            source_code = source_path.read_text()
+            for index in range(num_files):
+                Path(source_folder, f'module_{index}.py').write_text(source_code)
+            with self._configured(model_path, source_folder):
+                result = self._measure(self.code_processor.process_folder_or_file)
+        result.update({'name': f'process_folder_or_file[{num_files}x{lines_per_file}]', 'lines': source_code.count('\n') * num_files})
+        result['files_per_second'] = num_files / result['wall_time'] if result['wall_time'] else 0
+        return result
+
+    def run_validate_response(self, num_lines: int, repeat: int = 20) -> dict[str, Any]:
+        """Times validate_response on the synthetic response for a module of num_lines lines."""
+        _, response = self.generator.generate(num_lines)
+        docstring_processor: DocstringProcessor = dependencies.resolve(DocstringProcessor)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        valid = all(docstring_processor.validate_response(response, max_length=79).is_valid for _ in range(repeat))
+        return {
+            'name': f'validate_response[{num_lines}]',
+            'valid': valid,
+            'wall_time': (time.perf_counter() - wall_start) / repeat,
+            'cpu_time': (time.process_time() - cpu_start) / repeat,
+            'lines': num_lines
+        }
+
+    def run_merge_responses(self, num_lines: int, num_parts: int = 64, repeat: int = 20) -> dict[str, Any]:
+        """Times merge_json_objects on the synthetic response for a module of num_lines lines split into num_parts parts."""
+        _, response = self.generator.generate(num_lines)
+        names = list(response['docstrings'])
+        parts = [{'docstrings': {name: response['docstrings'][name] for name in names[index::num_parts]}} for index in range(num_parts)]
+        docstring_processor: DocstringProcessor = dependencies.resolve(DocstringProcessor)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        valid = all(docstring_processor.merge_json_objects(parts) == response for _ in range(repeat))
+        return {
+            'name': f'merge_json_objects[{num_lines}x{num_parts}]',
+            'valid': valid,
+            'wall_time': (time.perf_counter() - wall_start) / repeat,
+            'cpu_time': (time.process_time() - cpu_start) / repeat,
+            'lines': num_lines
+        }
+
+    def run(self, sizes: list[int], num_files: int, lines_per_file: int) -> list[dict[str, Any]]:
+        results = [self.run_process_code(size) for size in sizes]
+        results.extend(self.run_validate_response(size) for size in sizes)
+        results.extend(self.run_merge_responses(size) for size in sizes)
+        if num_files:
+            results.append(self.run_process_folder(num_files, lines_per_file))
+        return results
+
+def save_results(results: list[dict[str, Any]], results_path: str | Path, settings: dict[str, Any]):
+    """Appends one run to the JSON history stored at results_path."""
+    results_path = Path(results_path)
+    history: list[dict[str, Any]] = json.loads(results_path.read_text()) if results_path.exists() else []
+    history.append({'timestamp': time.time(), 'python': platform.python_version(), 'settings': settings, 'results': results})
+    results_path.write_text(json.dumps(history, indent=4))
+
+def compare_results(results: list[dict[str, Any]], baseline: list[dict[str, Any]], threshold: float = 0.2) -> list[str]:
+    """Returns a message for every benchmark whose wall time grew by more than threshold over baseline."""
+    baseline_by_name = {result['name']: result for result in baseline}
+    regressions: list[str] = []
+    for result in results:
+        previous = baseline_by_name.get(result['name'])
+        if previous and previous['wall_time'] and result['wall_time'] > previous['wall_time'] * (1 + threshold):
+            regressions.append(f"{result['name']}: {previous['wall_time']:.3f}s -> {result['wall_time']:.3f}s")
+    return regressions
+
+def format_results(results: list[dict[str, Any]]) -> str:
+    lines = [f"{'benchmark':<40}{'valid':>7}{'wall s':>10}{'cpu s':>10}{'peak MB':>10}"]
+    for result in results:
+        peak = result.get('peak_memory')
+        peak_text = f'{peak / 2 ** 20:.1f}' if peak is not None else '-'
+        lines.append(f"{result['name']:<40}{str(result['valid']):>7}{result['wall_time']:>10.3f}{result['cpu_time']:>10.3f}{peak_text:>10}")
+    return '\n'.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline DocString Generator benchmarks')
+    parser.add_argument('--lines', type=int, nargs='*', default=DEFAULT_SIZES, help='Synthetic module sizes for process_code')
+    parser.add_argument('--files', type=int, default=20, help='Number of files for the process_folder_or_file run (0 to skip)')
+    parser.add_argument('--lines_per_file', type=int, default=500, help='Size of each file in the folder run')
+    parser.add_argument('--latency', type=float, default=0, help='Simulated bot latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0, help='Simulated latency jitter in seconds')
+    parser.add_argument('--failure_rate', type=float, default=0, help='Fraction of simulated bot calls that fail')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no_memory', action='store_true', help='Skip the tracemalloc peak memory pass')
+    parser.add_argument('--output', type=str, default=DEFAULT_RESULTS_PATH, help='JSON file the results are appended to')
+    parser.add_argument('--baseline', type=str, help='Results file to compare against (its last run is used)')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed wall time increase before reporting a regression')
+    args = parser.parse_args()
+
+    runner = BenchmarkRunner(args.latency, args.jitter, args.failure_rate, args.seed, not args.no_memory)
+    results = runner.run(args.lines, args.files, args.lines_per_file)
+    print(format_results(results))
+    save_results(results, args.output, runner.settings)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())[-1]['results']
+        regressions = compare_results(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f'Regression: {regression}')
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
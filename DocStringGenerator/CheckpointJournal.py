@@ -0,0 +1,125 @@
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, TextIO
+from DocStringGenerator.DependencyContainer import DependencyContainer, Scope
+dependencies = DependencyContainer()
+from DocStringGenerator.ConfigManager import ConfigManager
+
+class CheckpointJournal:
+    """
+    Append-only JSONL journal of a run over a folder: the raw response of every part as it arrives and
+    every file once its output is on disk. Entries are keyed by a hash of the bot, model and source, so
+    a resumed run skips finished files and reuses paid-for parts however the code gets split again.
+    The journal is removed once a run finishes without failures.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(CheckpointJournal, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, '_initialized'):
+            self.config: dict[str, Any] = ConfigManager().config
+            self.path: Path | None = None
+            self.parts: dict[str, str] = {}
+            self.done: set[str] = set()
+            self._file: TextIO | None = None
+            self._lock = threading.Lock()
+            self._initialized = True
+
+    @property
+    def enabled(self) -> bool:
+        return self._file is not None
+
+    def open(self, path: str | Path) -> int:
+        """Loads the entries of an existing journal at path and appends to it; returns how many were loaded."""
+        self.close()
+        self.path = Path(path)
+        self.parts, self.done = {}, set()
+        loaded = 0
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as journal:
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # The last line of an interrupted run may be cut short
+                        continue
+                    self._apply(entry)
+                    loaded += 1
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        return loaded
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def clear(self):
+        """Closes and deletes the journal, for runs that finished without failures."""
+        self.close()
+        if self.path and self.path.exists():
+            self.path.unlink()
+        self.parts, self.done = {}, set()
+
+    @contextmanager
+    def session(self) -> Iterator['CheckpointJournal']:
+        """Opens the configured checkpoint_path for the duration of a run; without one the journal stays disabled."""
+        checkpoint_path = self.config.get('checkpoint_path', '')
+        if not checkpoint_path or self.enabled:
+            yield self
+            return
+        self.open(checkpoint_path)
+        try:
+            yield self
+        finally:
+            self.close()
+
+    def _apply(self, entry: dict[str, Any]):
+        if entry.get('type') == 'part':
+            self.parts[entry['key']] = entry['content']
+        elif entry.get('type') == 'discard':
+            self.parts.pop(entry['key'], None)
+        elif entry.get('type') == 'file':
+            self.done.add(entry['key'])
+
+    def _append(self, entry: dict[str, Any]):
+        with self._lock:
+            if not self._file:
+                return
+            self._apply(entry)
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+
+    def _key(self, *values: str) -> str:
+        digest = hashlib.sha1()
+        for value in (self.config.get('bot', ''), self.config.get('model', ''), *values):
+            digest.update(str(value).encode('utf-8', 'surrogatepass') + b'\0')
+        return digest.hexdigest()
+
+    def cached_part(self, part_source: str) -> str | None:
+        """Returns the recorded response for this part of the code, if a previous run received one."""
+        return self.parts.get(self._key(part_source)) if self.enabled else None
+
+    def record_part(self, part_source: str, content: str):
+        self._append({'type': 'part', 'key': self._key(part_source), 'content': content})
+
+    def discard_part(self, part_source: str):
+        """Forgets a recorded response that turned out to be invalid, so a resumed run asks again."""
+        if self.enabled and self._key(part_source) in self.parts:
+            self._append({'type': 'discard', 'key': self._key(part_source)})
+
+    def is_file_done(self, file_path: str | Path, source_code: str) -> bool:
+        return self.enabled and self._key(str(Path(file_path).absolute()), source_code) in self.done
+
+    def record_file_done(self, file_path: str | Path, source_code: str):
+        self._append({'type': 'file', 'key': self._key(str(Path(file_path).absolute()), source_code), 'file': str(file_path)})
+
+dependencies.register(CheckpointJournal, CheckpointJournal, Scope.SINGLETON)
@@ -1,43 +1,75 @@
 
 import os
-import io
+import queue
+import subprocess
 import sys
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import ContextManager, Iterable, List
 import ast
 import json
+import re
+import textwrap
+import uuid
 from DocStringGenerator.DependencyContainer import DependencyContainer, Scope
 dependencies = DependencyContainer()
 from DocStringGenerator.GlobalConfig import GlobalConfig
 global_config = dependencies.resolve(GlobalConfig)
 
-from DocStringGenerator.CommunicatorManager import CommunicatorManager
+from DocStringGenerator.CommunicatorManager import CommunicatorManager, CONTEXT_LENGTH_EXCEEDED
 from DocStringGenerator.BaseBotCommunicator import BaseBotCommunicator
 from DocStringGenerator.DocstringProcessor import DocstringProcessor
+from DocStringGenerator.DocstringModel import DocstringSet
 from DocStringGenerator.Utility import *
 from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.Logger import Logger, WARNING
+from DocStringGenerator.Instrumentation import Instrumentation, instrumented
+from DocStringGenerator.SourcePatcher import SourcePatcher
+from DocStringGenerator.SourceBuffer import SourceBuffer
+from DocStringGenerator.CoverageScanner import CoverageScanner, DocstringChecker, scan_source
+from DocStringGenerator.FileDiscovery import FileDiscovery
+from DocStringGenerator.OutputWriter import OutputWriter
+from DocStringGenerator.CheckpointJournal import CheckpointJournal
+from DocStringGenerator.ResponseArchive import ResponseArchive
+from DocStringGenerator.PostProcessPool import PostProcessPool
+from DocStringGenerator.Pipeline import Pipeline, Stage
+from DocStringGenerator.Scheduler import Scheduler
+from DocStringGenerator.DiffScope import changed_definitions, changed_line_ranges, diff_hunks, is_tracked
+from DocStringGenerator.SourceWatcher import SourceWatcher, DEFAULT_WATCH_DEBOUNCE, DEFAULT_WATCH_INTERVAL
 
 FILES_PROCESSED_LOG = "files_processed.log"
 MAX_RETRY_LIMIT = 3
+MAX_SNIPPET_LINES = 40
+# Worker threads per pipeline stage; the stages waiting on the bot get more than the others
+DEFAULT_PIPELINE_WORKERS = {'read': 2, 'request': 1, 'parse': 2, 'insert': 2, 'examples': 2, 'verify': 2}
 
 class ChunkData:
     def __init__(self, bot_name: str, chunk: str):
         self.bot_name = bot_name
         self.chunk = chunk
 
-class DocstringChecker(ast.NodeVisitor):
-    """AST visitor that checks for the presence of docstrings in functions."""
-
-    def __init__(self):
-        self.missing_docstrings: list[str] = []
-
-    def visit_FunctionDef(self, node:ast.AST):
-        """Visit a function definition and check if it has a docstring."""
-        if isinstance(node, (ast.AsyncFunctionDef, ast.FunctionDef, ast.ClassDef)):
-            # These node types have a 'name' attribute
-            if not ast.get_docstring(node) and not "example_" in node.name:
-                self.missing_docstrings.append(node.name)
-            self.generic_visit(node)  # Continue traversing child nodes
+@dataclass
+class FileJob:
+    """A file moving through the processing stages, with what each stage has found out about it."""
+    path: Path | None = None
+    source_code: str = ''
+    code: str = ''
+    split_level: int = 0
+    parts: list[str] = field(default_factory=list)
+    attempt: int = 0
+    last_error_message: str = ''
+    part_responses: list[dict[str, Any]] = field(default_factory=list)
+    docstrings: DocstringSet | None = None
+    post_processed: dict[str, Any] = field(default_factory=dict)
+    response: APIResponse | None = None
+    scheduler: Scheduler | None = None
+    # The undocumented definitions of a partly documented file, when only those are asked for
+    missing: list[dict[str, Any]] | None = None
+
+    def finish(self, response: APIResponse) -> None:
+        self.response = response
+        return None
 
 class CodeProcessor:
     _instance = None
@@ -52,6 +84,12 @@ class CodeProcessor:
             self.communicator_manager: CommunicatorManager = dependencies.resolve(CommunicatorManager)
             self.docstring_processor: DocstringProcessor = dependencies.resolve(DocstringProcessor)
             self.config: dict[str, Any]  = ConfigManager().config
+            self.logger: Logger = dependencies.resolve(Logger)
+            self.instrumentation: Instrumentation = dependencies.resolve(Instrumentation)
+            self.coverage_scanner: CoverageScanner = dependencies.resolve(CoverageScanner)
+            self.output_writer: OutputWriter = dependencies.resolve(OutputWriter)
+            self.checkpoint_journal: CheckpointJournal = dependencies.resolve(CheckpointJournal)
+            self.post_process_pool: PostProcessPool = dependencies.resolve(PostProcessPool)
             self._initialized = True
 
 
@@ -113,31 +151,34 @@ class CodeProcessor:
         return child_split_point
 
 
+    @instrumented('split_source_code')
     def split_source_code(self, source_code: str, num_parts: int) -> list[str]:
         """Splits the source code into a specified number of parts."""
         if num_parts == 0:
             return []
-        lines = source_code.splitlines(True)
-        if source_code.endswith("\n"):
-            lines.append("")
-        num_lines = len(lines)
+        source = SourceBuffer(source_code)
+        num_lines = len(source)
         lines_per_part = num_lines // num_parts
         lines_per_part = max(lines_per_part, 1)
+        try:
+            # One tree serves every split point
+            tree: ast.AST | None = ast.parse(source_code)
+        except SyntaxError:
+            tree = None
         current_line = 0
         output_parts: list[str] = []
 
         for i in range(num_parts):
             next_split_line = (i+1) * lines_per_part
-            next_split_line = self.find_split_point(source_code, next_split_line)
+            if tree is not None:
+                next_split_line = self.find_split_point(source_code, next_split_line, tree)
+            else:
+                # If invalid code, split the plain text
+                next_split_line = min(next_split_line, num_lines - 1)
             if i == num_parts - 1 or next_split_line == -1:
                 next_split_line = num_lines
 
-            part_builder = io.StringIO()
-            for line in lines[current_line:next_split_line]:
-                part_builder.write(line)
-            current_part = part_builder.getvalue()
-
-            output_parts.append(current_part)
+            output_parts.append(source.lines(current_line, next_split_line))
             current_line = min(next_split_line, num_lines)
         return output_parts
 
@@ -166,193 +207,452 @@ class CodeProcessor:
             return False
 
     def process_folder_or_file(self) -> APIResponse:
+        self.instrumentation.reset()
+        try:
+            scheduler = Scheduler.from_config(self.config, self.instrumentation.total_tokens)
+        except ValueError as e:
+            return APIResponse([], False, str(e))
+        with Logger.context(job=uuid.uuid4().hex[:8]), self.checkpoint_journal.session():
+            with self.output_writer.background(), self.post_process_pool.session():
+                response = self._process_folder_or_file(scheduler)
+            write_errors = self.output_writer.take_errors()
+            if write_errors:
+                failed_files = (response.content or []) + [{"file_name": target.name, "response": APIResponse("", False, error)} for target, error in write_errors]
+                response = APIResponse(failed_files, False, "Some files failed to process.")
+            # A run stopped by its budget keeps the journal, so the next run carries on where it stopped
+            if response.is_valid and self.checkpoint_journal.enabled and not scheduler.exhausted:
+                self.checkpoint_journal.clear()
+        ResponseArchive.close_all()
+        self.report_instrumentation()
+        self.logger.flush()
+        return response
+
+    def report_instrumentation(self):
+        """Logs the per-phase timing summary and writes the JSON report if one is configured."""
+        self.logger.log_line(self.instrumentation.format_summary())
+        report_path = self.config.get('instrumentation_report', '')
+        if report_path:
+            self.instrumentation.dump_report(report_path)
+
+    def _process_folder_or_file(self, scheduler: Scheduler) -> APIResponse:
         path = Path(self.config.get('path', ""))
-        include_subfolders = self.config.get('include_subfolders', False)
-        ignore_list: list[str] = self.config.get('ignore', [])
+        discovery = FileDiscovery.from_config(self.config)
 
         failed_files: list[Any] = []
+        rev_range = self.config.get('diff', '')
+        if rev_range and (os.path.isdir(path) or os.path.isfile(path)):
+            return self._process_diff(path, rev_range, discovery, scheduler)
         if os.path.isdir(path):
-            for root, dirs, files in os.walk(path):
-                if not include_subfolders and root != str(path):
-                    continue
-
-                # Filter out ignored directories
-                dirs[:] = [d for d in dirs if d not in ignore_list]
-
-                for file in files:
-                    # Check if the file is in the ignore list
-                    if file in ignore_list:
-                        continue
-
-                    full_file_path = Path(root, file)
-                    if file.endswith('.py'):
-                        response = self.process_file(full_file_path.absolute())
-                        if not response.is_valid:
-                            failed_files.append({"file_name":full_file_path.name, "response":response})
+            missing: dict[Path, list[dict[str, Any]]] = {}
+            if self.config.get('skip_documented_files', False) and not self.config.get('wipe_docstrings', False):
+                files_needing_work = self.coverage_scanner.scan(path).files_needing_work()
+                # A partly documented file only needs its missing definitions, not a whole new set of docstrings
+                missing = {Path(file.path).absolute(): file.missing for file in files_needing_work
+                           if not file.error and len(file.missing) < file.total_definitions}
+                source_files: Iterable[Path] = [Path(file.path) for file in files_needing_work]
+            else:
+                # The walk runs ahead on its own thread, so the first file is processed before it finishes
+                work_queue: queue.Queue[Path | None] = queue.Queue()
+                discovery.feed(path, work_queue)
+                source_files = iter(work_queue.get, None)
+            # Files overlap in the pipeline: one waits on the bot while another is parsed or written
+            scheduled_files = scheduler.schedule(source_files, path)
+            jobs = self.build_pipeline().run((FileJob(full_file_path.absolute(), scheduler=scheduler, missing=missing.get(full_file_path.absolute()))
+                                              for full_file_path in scheduled_files), 'read')
+            for job in jobs:
+                if not job.response.is_valid:
+                    failed_files.append({"file_name":job.path.name, "response":job.response})
+            for skipped_path, reason in discovery.skipped:
+                self.logger.log_line(f"Skipped {skipped_path}: {reason}")
+            if scheduler.exhausted:
+                self.logger.log_line(f"Stopped after {scheduler.started} files: {scheduler.exhausted}.", WARNING)
 
         elif os.path.isfile(path) and str(path).endswith('.py'):
-            if path.name not in ignore_list:
-                success = self.process_file(path.absolute())
-                if not success:
-                    failed_files.append(str(path))
+            if not discovery.is_ignored(path.name):
+                response = self.process_file(path.absolute())
+                if not response.is_valid:
+                    failed_files.append({"file_name":path.name, "response":response})
         else:
             return APIResponse([], False, 'Invalid path or file type. Please provide a Python file or directory.')
 
         return APIResponse(failed_files, not failed_files, "" if not failed_files else "Some files failed to process.")
 
+    def _process_diff(self, path: Path, rev_range: str, discovery: FileDiscovery, scheduler: Scheduler) -> APIResponse:
+        folder = path if os.path.isdir(path) else path.parent
+        try:
+            hunks = diff_hunks(rev_range, folder)
+        except (OSError, subprocess.CalledProcessError) as e:
+            return APIResponse([], False, f"Could not read the changes of {rev_range}: {getattr(e, 'stderr', '') or e}".strip())
+        resolved_folder = folder.resolve()
+        changed_files = [file for file in hunks if not discovery.is_ignored(file.name)
+                         and (file == path.resolve() if os.path.isfile(path) else self.config.get('include_subfolders', False) or file.parent == resolved_folder)]
+        self.logger.log_line(f"{len(changed_files)} files changed in {rev_range}.")
 
-    def process_file(self, file_path: Path) -> APIResponse:
-        file_name = os.path.basename(file_path)
-        processed = self.is_file_processed(file_name)
-        if processed:
-            message = f'File {file_name} already processed. Skipping.'
-            return APIResponse("", False, message)
-                # Read the source code from the file
-        with open(file_path, 'r') as file:
-            source_code = file.read() 
-            
-        process_code_response = self.process_code(source_code)
-        if process_code_response.is_valid:
-            if not ConfigManager().config.get('dry_run', False):
-                self.write_new_code(file_path, process_code_response)
-
-        return process_code_response
+        failed_files: list[Any] = []
+        for file_path in scheduler.schedule(changed_files, folder):
+            with Logger.context(file=str(file_path)):
+                response = self.process_changes(file_path, hunks[file_path])
+            if not response.is_valid:
+                failed_files.append({"file_name":file_path.name, "response":response})
+        if scheduler.exhausted:
+            self.logger.log_line(f"Stopped after {scheduler.scheduled} files: {scheduler.exhausted}.", WARNING)
+        return APIResponse(failed_files, not failed_files, "" if not failed_files else "Some files failed to process.")
 
-        
-    def process_code(self, source_code: str) -> APIResponse:
-        ask_count = 0
+    def process_changes(self, file_path: Path, line_ranges: list[tuple[int, int]], source_code: str | None = None) -> APIResponse:
+        """
+        Documents only the definitions of file_path enclosing the changed line_ranges, sending just their
+        source to the bot, and writes the file with the new docstrings merged in. With wipe_docstrings the
+        existing docstrings of those definitions are replaced; without it only the undocumented ones are filled in.
+        source_code is the text line_ranges refer to, when it was already read. Nothing is written when the
+        bot fails or leaves a definition whose docstring was wiped without one.
+        """
+        if not self.communicator_manager.bot_communicator:
+            return APIResponse("", False, "Bot communicator not initialized.")
+        if source_code is None:
+            source_code = self._read_source(file_path)
+        try:
+            definitions = changed_definitions(source_code, line_ranges)
+        except SyntaxError as e:
+            return APIResponse("", False, f"Invalid Python code: {e}")
+        if not definitions:
+            return APIResponse(source_code, True)
+        code = source_code
+        wiped: set[tuple[str, str]] = set()
         if self.config.get('wipe_docstrings', False):
-            wipe_docstrings_response = self.wipe_docstrings(source_code)
-            if wipe_docstrings_response.is_valid:
-                source_code = wipe_docstrings_response.content
-            else:
-                return wipe_docstrings_response
-
-
-
-        last_error_message = ""
-        while True:
-            ask_count += 1
-            response_docstrings: APIResponse = self.try_generate_docstrings(source_code, ask_count, last_error_message)
-            if response_docstrings.is_valid:
-                source_code = self.docstring_processor.insert_docstrings(source_code, response_docstrings.content)
-                break
-            else:
-                last_error_message = response_docstrings.error_message
-                if ask_count == MAX_RETRY_LIMIT:
-                    break
-            
-
-        if response_docstrings.is_valid:
-            final_code_response = self.process_examples(source_code, response_docstrings)
-        else:
-            return response_docstrings
-        
-        if final_code_response.is_valid:
-            source_code = final_code_response.content
-            verify_response = self.verify_code_docstrings(source_code)
-            if verify_response.is_valid:
-                return final_code_response
-            else:
-                missing_docstrings_response: APIResponse = self.communicator_manager.bot_communicator.ask_missing_docstrings(verify_response.content, 1)
-                if missing_docstrings_response.is_valid:
-                    extract_docstrings_response : APIResponse = self.docstring_processor.extract_docstrings(missing_docstrings_response.content, ask_missing=True)
-                    if extract_docstrings_response.is_valid:
-                        source_code = self.docstring_processor.insert_docstrings(source_code, extract_docstrings_response.content)
-                    return APIResponse(source_code, True)
-
-                else:
-                    return final_code_response
-        else:
-            return final_code_response
-        
-    def write_new_code(self, file_path: Path, final_code_response: APIResponse):
-        file_name = Path(file_path).name
-        bot_path = Path(Path(file_path).parent, self.config.get("bot", ""))
-        if not bot_path.exists():
-            bot_path.mkdir(exist_ok=True)
-        bot_path = Path(bot_path, file_name)
-        if final_code_response.is_valid:
-            with open(bot_path, 'w') as file:
-                file.write(final_code_response.content)
-            if not ConfigManager().config.get('disable_log_processed_file', False):                
-                self.log_processed_file(bot_path)
-
-    def process_examples(self, source_code: str, response_docstrings: APIResponse) -> APIResponse:
-        if response_docstrings.is_valid:
-            parsed_examples = self.parse_examples_from_docstrings(response_docstrings.content)
-            if parsed_examples.is_valid:
-                response = self.add_example_functions_to_classes(source_code, parsed_examples.content)
-
-                if response.is_valid:
-                    return APIResponse(response.content, True)
-                else:
-                    ask_count = 0
-                    bot_communicator = self.communicator_manager.bot_communicator 
-                    while True:
-                        if bot_communicator:
-                            response = bot_communicator.ask_retry_examples(response.content)
-                            if response.is_valid:
-                                response: APIResponse = self.docstring_processor.extract_docstrings(response.content, True)
-                                if response.is_valid:
-                                    response = self.parse_examples_from_docstrings(response.content)
-                                    if response.is_valid:
-                                        response = self.add_example_functions_to_classes(source_code, response.content)
-                                        if response.is_valid:
-                                            return APIResponse(response.content, True)
-                                        else:
-                                            ask_count += 1
-                                    else:
-                                        ask_count += 1
-                                else:
-                                    ask_count += 1
-                            else:
-                                ask_count += 1
-
-                            if ask_count == MAX_RETRY_LIMIT:
-                                break
-
-                    return response                      
-            else:
-                return parsed_examples                    
+            undocumented = {(definition['class'], definition['name']) for definition in scan_source(source_code).missing}
+            wiped = {(definition['class'], definition['name']) for definition in definitions} - undocumented
+            code = self.wipe_docstrings(code, definitions).content
+        self.logger.log_line(f"Documenting {len(definitions)} changed definitions.")
+        response = self.add_missing_docstrings(code, {(definition['class'], definition['name']) for definition in definitions})
+        if not response.is_valid:
+            return response
+        still_missing = {(definition['class'], definition['name']) for definition in scan_source(response.content).missing}
+        unanswered = sorted(f"{class_name}.{name}" if class_name else name for class_name, name in wiped & still_missing)
+        if unanswered:
+            # Writing now would leave these without the docstrings they had
+            return APIResponse(response.content, False, f"No docstrings were received for {', '.join(unanswered)}.")
+        if self.output_writer.target_path(file_path) == Path(file_path).absolute() and self._read_source(file_path) != source_code:
+            # Written in place, the answer would overwrite an edit made while the bot was asked
+            return APIResponse("", False, f'{Path(file_path).name} changed while it was being documented.')
+        if not self.config.get('dry_run', False):
+            self.write_new_code(file_path, response, source_code)
+        return response
+
+    def _read_source(self, file_path: Path) -> str:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            return file.read()
+
+    def watch(self, stop: threading.Event | None = None):
+        """
+        Documents the files under path as they are saved, until stop is set. Each change is compared with
+        the text of the file when it was last handled and only the edited definitions are sent to the bot;
+        a file seen for the first time is compared with its last git commit. The communicators, caches and
+        file list stay loaded between changes.
+        """
+        stop = stop or threading.Event()
+        path = Path(self.config.get('path', ""))
+        watcher = SourceWatcher(path, FileDiscovery.from_config(self.config), self.config.get('watch_interval', DEFAULT_WATCH_INTERVAL),
+                                self.config.get('watch_debounce', DEFAULT_WATCH_DEBOUNCE))
+        # The text each file had when it was last documented
+        known_sources: dict[Path, str] = {}
+        self.logger.log_line(f"Watching {watcher.path} for changes.")
+        for changed_files in watcher.changes(stop):
+            with Logger.context(job=uuid.uuid4().hex[:8]):
+                for file_path in changed_files:
+                    with Logger.context(file=str(file_path)):
+                        self._document_edit(file_path, watcher, known_sources)
+
+    def _document_edit(self, file_path: Path, watcher: SourceWatcher, known_sources: dict[Path, str]):
+        try:
+            source_code = self._read_source(file_path)
+        except OSError as e:
+            self.logger.log_line(f"Could not read {file_path}: {e}", WARNING)
+            return
+        previous = known_sources.get(file_path)
+        if previous is not None:
+            line_ranges = changed_line_ranges(previous, source_code)
+        elif is_tracked(file_path):
+            try:
+                line_ranges = diff_hunks('HEAD', file_path.parent, [file_path]).get(file_path.resolve(), [])
+            except (OSError, subprocess.CalledProcessError):
+                line_ranges = []
         else:
-            return response_docstrings
+            # A new file: every definition in it is an edit
+            line_ranges = [(1, source_code.count('\n') + 1)]
+        known_sources[file_path] = source_code
+        if not line_ranges:
+            return
+        response = self.process_changes(file_path, line_ranges, source_code)
+        if not response.is_valid:
+            self.logger.log_line(f"Failed to document {file_path.name}: {response.error_message}", WARNING)
+            return
+        target = self.output_writer.target_path(file_path)
+        watcher.refresh(target)
+        if target == file_path.absolute():
+            known_sources[file_path] = self._read_source(file_path)
 
 
-    def try_generate_docstrings(self, source_code: str, retry_count: int=1, last_error_message:str="") -> APIResponse:
-        """Attempts to generate docstrings, retrying if necessary."""
-        bot_communicator: BaseBotCommunicator | None = self.communicator_manager.bot_communicator        
-        if not bot_communicator:
-            return APIResponse("", False, "Bot communicator not initialized.")
-
-        if retry_count == 1:
-            result = self.communicator_manager.send_code_in_parts(source_code, retry_count)
-        else:
-            if self.communicator_manager.bot_communicator:
-                result = self.communicator_manager.bot_communicator.ask_retry(last_error_message, retry_count)                
-            else:
-                return APIResponse("", False)
+    def process_file(self, file_path: Path) -> APIResponse:
+        job = self.build_pipeline().run_inline(FileJob(Path(file_path)), 'read')
+        return job.response
 
-        if result.is_valid:
-            docstring_response: APIResponse = self.docstring_processor.extract_docstrings(result.content)
-            return docstring_response
+    @instrumented('process_code')
+    def process_code(self, source_code: str) -> APIResponse:
+        job = self.build_pipeline().run_inline(FileJob(source_code=source_code, code=source_code), 'wipe', stop_before='write')
+        return job.response
+
+    def build_pipeline(self) -> Pipeline[FileJob]:
+        """Returns the stages processing a file, with the worker threads per stage set in pipeline_workers."""
+        workers: dict[str, int] = {**DEFAULT_PIPELINE_WORKERS, **self.config.get('pipeline_workers', {})}
+        stages = [Stage(name, process, workers.get(name, 1)) for name, process in (
+            ('read', self._read_stage), ('missing', self._missing_stage), ('wipe', self._wipe_stage), ('chunk', self._chunk_stage),
+            ('request', self._request_stage), ('parse', self._parse_stage), ('insert', self._insert_stage),
+            ('examples', self._examples_stage), ('verify', self._verify_stage), ('write', self._write_stage))]
+        return Pipeline(stages, self.config.get('pipeline_queue_size', 8), item_context=self._job_context, on_finish=self._end_job)
+
+    def _job_context(self, job: FileJob) -> ContextManager[None]:
+        return Logger.context(file=str(job.path)) if job.path else Logger.context()
+
+    def _end_job(self, job: FileJob):
+        bot_communicator = self.communicator_manager.bot_communicator
+        if isinstance(bot_communicator, BaseBotCommunicator):
+            bot_communicator.end_conversation()
+
+    def _read_stage(self, job: FileJob) -> str | None:
+        file_name = job.path.name
+        if self.is_file_processed(file_name):
+            return job.finish(APIResponse("", False, f'File {file_name} already processed. Skipping.'))
+        with open(job.path, 'r', encoding='utf-8') as file:
+            job.source_code = job.code = file.read()
+        if self.checkpoint_journal.is_file_done(job.path, job.source_code):
+            return job.finish(APIResponse("", True, f'File {file_name} was finished by an interrupted run. Skipping.'))
+        return 'missing' if job.missing is not None else 'wipe'
+
+    def _missing_stage(self, job: FileJob) -> str | None:
+        """Asks only for the definitions the coverage scan found undocumented, keeping the docstrings the file has."""
+        if not self.communicator_manager.bot_communicator:
+            return job.finish(APIResponse("", False, "Bot communicator not initialized."))
+        estimated_tokens = Instrumentation.estimate_tokens(self.format_missing_definitions(job.code, job.missing))
+        if job.scheduler and not job.scheduler.admit(estimated_tokens):
+            return job.finish(APIResponse("", True, f'File {job.path.name} not started: {job.scheduler.exhausted}.'))
+        try:
+            response = self.add_missing_docstrings(job.code, {(definition['class'], definition['name']) for definition in job.missing})
+        finally:
+            if job.scheduler:
+                job.scheduler.release(estimated_tokens)
+        if not response.is_valid:
+            return job.finish(response)
+        job.code = response.content
+        return self._documented(job)
+
+    def _wipe_stage(self, job: FileJob) -> str | None:
+        if self.config.get('wipe_docstrings', False):
+            wipe_docstrings_response = self.wipe_docstrings(job.code)
+            if not wipe_docstrings_response.is_valid:
+                return job.finish(wipe_docstrings_response)
+            job.code = wipe_docstrings_response.content
+        return 'chunk'
+
+    def _chunk_stage(self, job: FileJob) -> str | None:
+        self.logger.log_line(f'Sending code in {2 ** job.split_level} parts.')
+        job.parts = self.split_source_code(job.code, 2 ** job.split_level)
+        return 'request'
+
+    def _request_stage(self, job: FileJob) -> str | None:
+        """Sends the parts on the first attempt; later attempts only ask again for the parts that failed."""
+        if not self.communicator_manager.bot_communicator:
+            return job.finish(APIResponse("", False, "Bot communicator not initialized."))
+        attempt = job.attempt + 1
+        # The file waited in the queues since it was scheduled; the budget may have run out meanwhile
+        scheduler = job.scheduler if attempt == 1 and job.split_level == 0 else None
+        estimated_tokens = Instrumentation.estimate_tokens(job.code)
+        if scheduler and not scheduler.admit(estimated_tokens):
+            return job.finish(APIResponse("", True, f'File {job.path.name} not started: {scheduler.exhausted}.'))
+        if attempt == 1 or not job.part_responses:
+            try:
+                result = self.communicator_manager.send_parts(job.parts, attempt)
+            finally:
+                if scheduler:
+                    scheduler.release(estimated_tokens)
+            if not result.is_valid and result.error_message == CONTEXT_LENGTH_EXCEEDED:
+                job.split_level += 1
+                return 'chunk'
+            if result.is_valid:
+                job.part_responses[:] = result.content
         else:
+            result = self.retry_failed_parts(job.part_responses, attempt)
+        job.attempt = attempt
+        if not result.is_valid:
+            return self._retry_or_finish(job, result)
+        return 'parse'
+
+    def _parse_stage(self, job: FileJob) -> str | None:
+        docstring_response: APIResponse = self.post_process_pool.extract_docstrings(job.part_responses)
+        if not docstring_response.is_valid:
+            self.mark_failed_parts(job.part_responses, docstring_response)
+            return self._retry_or_finish(job, docstring_response)
+        job.docstrings = self.docstring_processor.to_docstring_set(docstring_response.content)
+        return 'insert'
+
+    def _retry_or_finish(self, job: FileJob, response: APIResponse) -> str | None:
+        job.last_error_message = response.error_message
+        if job.attempt >= MAX_RETRY_LIMIT:
+            return job.finish(response)
+        return 'request'
+
+    def _insert_stage(self, job: FileJob) -> str | None:
+        """Inserts the docstrings and examples and verifies the result, in a worker process when the pool runs."""
+        job.post_processed = self.post_process_pool.post_process(job.code, job.docstrings)
+        job.code = job.post_processed['source_code']
+        if job.post_processed['example_errors'] is not None:
+            return 'examples'
+        if job.post_processed['error']:
+            return job.finish(APIResponse("", False, job.post_processed['error']))
+        return self._documented(job) if job.post_processed['verified'] else 'verify'
+
+    def _examples_stage(self, job: FileJob) -> str | None:
+        response = self.retry_examples(job.code, APIResponse(job.post_processed['example_errors'], False, job.post_processed['error']))
+        if not response.is_valid:
+            return job.finish(response)
+        job.code = response.content
+        return self._documented(job) if self.verify_code_docstrings(job.code).is_valid else 'verify'
+
+    def _verify_stage(self, job: FileJob) -> str | None:
+        job.code = self.add_missing_docstrings(job.code).content
+        return self._documented(job)
+
+    def _documented(self, job: FileJob) -> str:
+        job.response = APIResponse(job.code, True)
+        return 'write'
+
+    def _write_stage(self, job: FileJob) -> str | None:
+        if not self.config.get('dry_run', False):
+            self.write_new_code(job.path, job.response, job.source_code)
+        return None
+
+    def post_process(self, source_code: str, docstrings: dict[str, Any] | DocstringSet) -> dict[str, Any]:
+        """
+        Inserts the docstrings and examples of a response and verifies the result. This is the CPU-bound
+        part of process_code, so it returns plain data that can come back from a worker process: the
+        source, the classes whose examples could not be added (or None) and whether every definition is documented.
+        """
+        source_code = self.docstring_processor.insert_docstrings(source_code, docstrings)
+        result: dict[str, Any] = {'source_code': source_code, 'example_errors': None, 'error': '', 'verified': False}
+        parsed_examples = self.parse_examples_from_docstrings(docstrings)
+        if not parsed_examples.is_valid:
+            result['error'] = parsed_examples.error_message
             return result
+        response = self.add_example_functions_to_classes(source_code, parsed_examples.content)
+        if not response.is_valid:
+            result.update(example_errors=response.content, error=response.error_message)
+            return result
+        result['source_code'] = response.content
+        result['verified'] = self.verify_code_docstrings(response.content).is_valid
+        return result
 
-
-    def save_response(self, file_path: Path,  docstrings: dict[str, Any]):
+    def add_missing_docstrings(self, source_code: str, definitions: set[tuple[str, str]] | None = None) -> APIResponse:
         """
-        Saves the response for a processed file in a separate JSON file.
+        Asks for the docstrings that are still missing, sending only the source of those definitions,
+        until all are documented or the retries run out. definitions, as (class, name) pairs, limits it to those.
+        Invalid when the bot fails; the content then holds what was documented before.
         """
-        response_file_path = file_path.with_suffix('.response.json')
-        folder_path = Path("./responses")
-        folder_path.mkdir(parents=True, exist_ok=True)
-        stem = Path(file_path).stem
-        response_file_path = Path(folder_path, stem + '.response.json')
-        with open(response_file_path, 'w') as f:
-            json.dump(docstrings, f, indent=4)
-
-
+        bot_communicator = self.communicator_manager.bot_communicator
+        for retry_count in range(1, MAX_RETRY_LIMIT + 1):
+            missing_definitions = scan_source(source_code).missing
+            if definitions is not None:
+                missing_definitions = [definition for definition in missing_definitions if (definition['class'], definition['name']) in definitions]
+            if not missing_definitions:
+                break
+            class_names = [f"{definition['class']}.{definition['name']}" if definition['class'] else definition['name'] for definition in missing_definitions]
+            source_snippets = self.format_missing_definitions(source_code, missing_definitions)
+            missing_docstrings_response: APIResponse = bot_communicator.ask_missing_docstrings(class_names, retry_count, source_snippets)
+            if not missing_docstrings_response.is_valid:
+                # The content keeps the docstrings inserted by earlier answers
+                return APIResponse(source_code, False, missing_docstrings_response.error_message)
+            extract_docstrings_response : APIResponse = self.docstring_processor.extract_docstrings(missing_docstrings_response.content, ask_missing=True)
+            if extract_docstrings_response.is_valid:
+                docstrings = self.docstring_processor.filter_docstrings(extract_docstrings_response.content, missing_definitions)
+                documented_code = self.docstring_processor.insert_docstrings(source_code, docstrings)
+                if documented_code == source_code:
+                    # Asking again would get the same answer for definitions it cannot be inserted into
+                    break
+                source_code = documented_code
+        return APIResponse(source_code, True)
+
+    def format_missing_definitions(self, source_code: str, missing_definitions: list[dict[str, Any]]) -> str:
+        """Returns the source of each definition; classes are reduced to their header and long functions are cut."""
+        lines = source_code.splitlines()
+        snippets: list[str] = []
+        for definition in missing_definitions:
+            start = definition['line'] - 1
+            if definition['kind'] == 'ClassDef':
+                snippet_lines = lines[start:max(definition['body_line'] - 1, start + 1)] + ['    ...']
+            else:
+                snippet_lines = lines[start:definition['end_line']]
+                if len(snippet_lines) > MAX_SNIPPET_LINES:
+                    snippet_lines = snippet_lines[:MAX_SNIPPET_LINES] + ['    ...']
+            title = f"{definition['class']}.{definition['name']}" if definition['class'] else definition['name']
+            snippets.append(f"# {title}\n" + textwrap.dedent('\n'.join(snippet_lines)))
+        return '\n\n'.join(snippets)
+        
+    def write_new_code(self, file_path: Path, final_code_response: APIResponse, source_code: str = ''):
+        if final_code_response.is_valid:
+            log_processed_file = not ConfigManager().config.get('disable_log_processed_file', False)
+
+            def on_written(target: Path):
+                if log_processed_file:
+                    self.log_processed_file(target)
+                # Only a file whose output is on disk counts as finished when the run is resumed
+                self.checkpoint_journal.record_file_done(file_path, source_code)
+                if Path(target).absolute() == Path(file_path).absolute():
+                    # Written in place, a resumed run reads the documented code back
+                    self.checkpoint_journal.record_file_done(file_path, final_code_response.content)
+            self.output_writer.write(Path(file_path), final_code_response.content, on_written)
+
+    def retry_examples(self, source_code: str, response: APIResponse) -> APIResponse:
+        """Asks again for the examples named in a failed add_example_functions_to_classes response."""
+        bot_communicator = self.communicator_manager.bot_communicator 
+        if not bot_communicator:
+            return response
+        for _ in range(MAX_RETRY_LIMIT):
+            response = bot_communicator.ask_retry_examples(response.content)
+            if response.is_valid:
+                response: APIResponse = self.docstring_processor.extract_docstrings(response.content, True)
+                if response.is_valid:
+                    response = self.parse_examples_from_docstrings(response.content)
+                    if response.is_valid:
+                        response = self.add_example_functions_to_classes(source_code, response.content)
+                        if response.is_valid:
+                            return APIResponse(response.content, True)
+        return response
+
+
+    def mark_failed_parts(self, part_responses: list[dict[str, Any]], docstring_response: APIResponse):
+        """Records the extraction error on each failed part; every part is retried when the error names none."""
+        failed_parts = docstring_response.content if isinstance(docstring_response.content, list) else []
+        errors = {failed_part['part_index']: failed_part['error'] for failed_part in failed_parts}
+        for part_response in part_responses:
+            part_response['error'] = errors.get(part_response['part_index'], '') if errors else docstring_response.error_message
+            if part_response['error']:
+                self.checkpoint_journal.discard_part(part_response['source_code'])
+
+    def retry_failed_parts(self, part_responses: list[dict[str, Any]], retry_count: int) -> APIResponse:
+        """Asks again for every part with an error, replacing only the responses of those parts."""
+        bot_communicator = self.communicator_manager.bot_communicator
+        for part_response in part_responses:
+            if not part_response.get('error'):
+                continue
+            self.logger.log_line(f"Retrying part {part_response['part_index'] + 1} of {len(part_responses)}")
+            response = bot_communicator.ask_retry_part(part_response['source_code'], part_response['error'], retry_count)
+            if not response.is_valid:
+                return response
+            self.checkpoint_journal.record_part(part_response['source_code'], response.content)
+            part_response['content'] = response.content
+            part_response['error'] = ''
+        return APIResponse(part_responses, True)
+
+
+    @instrumented('verify_code_docstrings')
     def verify_code_docstrings(self, source: str) -> APIResponse:
         """Checks all functions in a Python source file for docstrings."""
 
@@ -371,8 +671,9 @@ class CodeProcessor:
             return APIResponse([], True, "All functions have docstrings.")
 
 
-    def wipe_docstrings(self, source: str) -> APIResponse:
-        """Removes all docstrings from a Python source file."""
+    @instrumented('wipe_docstrings')
+    def wipe_docstrings(self, source: str, definitions: list[dict[str, Any]] | None = None) -> APIResponse:
+        """Removes all docstrings from a Python source file, or only those of definitions as CoverageScanner reports them."""
 
         try:
             tree = ast.parse(source)
@@ -380,16 +681,50 @@ class CodeProcessor:
             return APIResponse("", False, f"Invalid Python code: {e}")
             
 
-        tree = DocstringRemover().visit(tree)
-        new_source = ast.unparse(tree)
-
-        return APIResponse(new_source, True)
+        selected = None if definitions is None else {(definition['name'], definition['body_line']) for definition in definitions}
+        patcher = SourcePatcher(source)
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and ast.get_docstring(node, clean=False) is not None:
+                if selected is None or (node.name, node.body[0].lineno) in selected:
+                    self._delete_docstring(patcher, node)
+
+        return patcher.apply()
+
+    def _delete_docstring(self, patcher: SourcePatcher, node: ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef):
+        """Queues the removal of the docstring of node, leaving `pass` behind when it is the only statement."""
+        docstring = node.body[0]
+        start_line, end_line = docstring.lineno, docstring.end_lineno or docstring.lineno
+        start_col = patcher.char_column(start_line, docstring.col_offset)
+        end_col = patcher.char_column(end_line, docstring.end_col_offset or 0)
+        first_line, last_line = patcher.line(start_line), patcher.line(end_line)
+
+        if len(node.body) == 1:
+            patcher.replace(start_line, start_col, end_line, end_col, "pass")
+            return
+
+        rest = last_line[end_col:]
+        separator = re.match(r'\s*;\s*', rest)
+        comment = re.match(r'\s*(?=#)', rest)
+        if separator:
+            # Another statement follows on the same line: drop the docstring and its semicolon only
+            patcher.delete(start_line, start_col, end_line, end_col + separator.end())
+        elif comment:
+            # A comment follows the docstring: it stays, in the docstring's place
+            patcher.delete(start_line, start_col, end_line, end_col + comment.end())
+        elif first_line[:start_col].strip():
+            patcher.delete(start_line, len(first_line[:start_col].rstrip()), end_line, len(last_line))
+        elif end_line < patcher.line_count:
+            patcher.delete(start_line, 0, end_line + 1, 0)
+        else:
+            patcher.delete(start_line, 0, end_line, len(last_line))
 
     def list_files(self, directory: Path, extension: str) -> List[Path]:
         """Lists all files in a directory with a given file extension."""
         return [f for f in directory.iterdir() if f.suffix == extension]  
     
-    def parse_examples_from_docstrings(self, docstrings: dict[str, Any]) -> APIResponse:
+    def parse_examples_from_docstrings(self, docstrings: dict[str, Any] | DocstringSet) -> APIResponse:
+        if isinstance(docstrings, DocstringSet):
+            return APIResponse(docstrings.examples(), True)
         parsed_examples = {}
         try:
             for class_or_func_name, content in docstrings.items():
@@ -406,74 +741,68 @@ class CodeProcessor:
             return APIResponse("", False, f"Failed to parse examples from response: {e}")
 
 
+    @instrumented('add_example_functions_to_classes')
     def add_example_functions_to_classes(self, code_source: str, examples:dict[str, str]) -> APIResponse:
-        success = True
+        """Appends an example_function_<Class> method to every class in examples with a single parse and rebuild."""
         failed_class_names: list[Any] = []
 
-        for class_name, example_code in examples.items():
-            try:
-                tree = ast.parse(code_source)
-                end_line_number = None
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.ClassDef) and node.name == class_name:
-                        end_line_number = node.end_lineno if hasattr(node, 'end_lineno') else node.body[-1].lineno
-                        break
-
-                if end_line_number is not None:
-                    content_lines = code_source.splitlines()
-                    example_code = example_code.replace("\\n", "\n")
-                    validation_code = f"def example_function_{class_name}(self):\n{self.add_indentation(example_code, 1)}"
-                    is_valid_response = Utility.is_valid_python(validation_code)
-                    if not is_valid_response.is_valid:
-                        success = False
-                        failed_class_names.append({"class": class_name, "error": is_valid_response.error_message})
-                        continue  # Keep processing other classes
-
-                    function_def_str = f"\n    def example_function_{class_name}(self):\n{self.add_indentation(example_code, 2)}"
-                    content_lines.insert(end_line_number, function_def_str)
-                    code_source = "\n".join(content_lines)
-                else:
-                    error_message = f"Class {class_name} not found."
-                    success = False
-                    failed_class_names.append({"class": class_name, "error": error_message})
-
-            except Exception as e:
-                error_message = f"Failed to append example to class {class_name}: {e}"
-                success = False
-                failed_class_names.append({"class": class_name, "error": error_message})  
-                      
-        if not success:
+        try:
+            tree = ast.parse(code_source)
+        except Exception as e:
+            failed_class_names = [{"class": class_name, "error": f"Failed to append example to class {class_name}: {e}"} for class_name in examples]
             return APIResponse(failed_class_names, False, "Failed to add example functions to some classes.")
-        return APIResponse(code_source, True)
 
+        class_nodes: dict[str, ast.ClassDef] = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ClassDef) and node.name in examples:
+                class_nodes.setdefault(node.name, node)
+
+        example_codes: dict[str, str] = {class_name: example_code.replace("\\n", "\n") for class_name, example_code in examples.items()}
+        invalid_examples = self.validate_examples(example_codes)
+
+        patcher = SourcePatcher(code_source)
+        for class_name, example_code in example_codes.items():
+            node = class_nodes.get(class_name)
+            if node is None:
+                failed_class_names.append({"class": class_name, "error": f"Class {class_name} not found."})
+            elif class_name in invalid_examples:
+                failed_class_names.append({"class": class_name, "error": invalid_examples[class_name]})
+            else:
+                end_line_number = node.end_lineno if node.end_lineno is not None else node.body[-1].lineno
+                method_indentation = " " * (node.col_offset + 4)
+                function_def_str = f"\n{method_indentation}def example_function_{class_name}(self):\n{self.add_indentation(example_code, 1, method_indentation)}"
+                patcher.insert_lines_after(end_line_number, function_def_str)
+
+        if failed_class_names:
+            return APIResponse(failed_class_names, False, "Failed to add example functions to some classes.")
 
+        return patcher.apply()
 
-    def add_indentation(self, source_code: str, indent: int) -> str:
+    def validate_examples(self, example_codes: dict[str, str]) -> dict[str, str]:
+        """Returns the syntax error of every invalid example, compiling all of them at once when they are valid."""
+        validation_codes = {class_name: f"def example_function_{class_name}(self):\n{self.add_indentation(example_code, 1)}"
+                            for class_name, example_code in example_codes.items()}
+        try:
+            # One compile for the common case; the def names guard against a string literal spanning two examples
+            combined_tree = ast.parse("\n".join(validation_codes.values()))
+            compile(combined_tree, '<string>', 'exec')
+            if [getattr(node, 'name', None) for node in combined_tree.body] == [f"example_function_{class_name}" for class_name in validation_codes]:
+                return {}
+        except SyntaxError:
+            pass
+        invalid_examples: dict[str, str] = {}
+        for class_name, validation_code in validation_codes.items():
+            is_valid_response = Utility.is_valid_python(validation_code)
+            if not is_valid_response.is_valid:
+                invalid_examples[class_name] = is_valid_response.error_message
+        return invalid_examples
+
+    def add_indentation(self, source_code: str, indent: int, base_indentation: str = "") -> str:
         """Adds indentation to a source code string."""
-        indentation = "    " * indent
+        indentation = base_indentation + "    " * indent
         return "\n".join([indentation + line for line in source_code.splitlines()])
 
-class DocstringRemover(ast.NodeTransformer):
-    """An AST node transformer that removes docstrings from function and class definitions."""
-    def visit_FunctionDef(self, node: ast.AST):
-        if hasattr(node, "body"):
-            body: list[ast.stmt] = getattr(node, "body", [])            
-            if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
-                body.pop(0)
-            self.generic_visit(node)  # Visit children nodes
-            return node
-
-    def visit_ClassDef(self, node: ast.AST):
-        if hasattr(node, "body"):
-            body: list[ast.stmt] = getattr(node, "body", [])         
-            if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, (ast.Constant)):
-                body.pop(0)
-            self.generic_visit(node)  # Visit children nodes
-            return node
-    
 if global_config.mode == "web":
-    dependencies.register(DocstringRemover, DocstringRemover, Scope.SCOPED)
     dependencies.register(CodeProcessor, CodeProcessor,Scope.SCOPED)
 else:
-    dependencies.register(DocstringRemover, DocstringRemover, Scope.SINGLETON)
     dependencies.register(CodeProcessor, CodeProcessor, Scope.SINGLETON)
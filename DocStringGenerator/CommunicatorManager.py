@@ -13,12 +13,16 @@ from DocStringGenerator.OpenAICommunicator import OpenAICommunicator
 from DocStringGenerator.FileCommunicator import FileCommunicator
 from DocStringGenerator.BaseBotCommunicator import BaseBotCommunicator
 from DocStringGenerator.Logger import Logger
+from DocStringGenerator.CheckpointJournal import CheckpointJournal
+
+CONTEXT_LENGTH_EXCEEDED = 'Context length exceeded.'
 
 class CommunicatorManager:
 
     def __init__(self):
         self.logger : Logger = dependencies.resolve(Logger)        
         self.config = ConfigManager().config
+        self.checkpoint_journal: CheckpointJournal = dependencies.resolve(CheckpointJournal)
         self.initialize_bot_communicator()
         self.bot_communicator = EmptyCommunicator()
 
@@ -55,35 +59,36 @@ class CommunicatorManager:
             dependencies.register(GoogleCommunicator, GoogleCommunicator, Scope.SINGLETON)
             dependencies.register(FileCommunicator, FileCommunicator, Scope.SINGLETON)
 
-        communicator = self.resolve_bot_communicator(bot)
-        self.bot_communicator: BaseBotCommunicator = dependencies.resolve(communicator)
+        self.bot_communicator: BaseBotCommunicator = self.resolve_bot_communicator(bot)
         if not self.bot_communicator:
             raise ValueError(f"Error initializing bot communicator for '{bot}'")
 
-    def send_code_in_parts(self, source_code: str, retry_count: int=1) -> APIResponse:
-        from DocStringGenerator.CodeProcessor import CodeProcessor
-
-        def attempt_send(code: str, iteration:int=0) -> APIResponse:
-            self.logger.log_line(f'Sending code in {2 ** iteration} parts.')
-            num_parts = 2 ** iteration
-            code_processor: CodeProcessor = dependencies.resolve(CodeProcessor)
-            parts = code_processor.split_source_code(code, num_parts)
-            responses: list[Any] = []
-            response = None
-            for part in parts:
-                self.logger.log_line(f'Sending part {parts.index(part) + 1} of {len(parts)}')
+    def send_parts(self, parts: list[str], retry_count: int=1) -> APIResponse:
+        """
+        Asks for the docstrings of every part, reusing checkpointed responses. Fails with
+        CONTEXT_LENGTH_EXCEEDED when a part is too long for the bot, so the code can be split further.
+        """
+        responses: list[Any] = []
+        for part_index, part in enumerate(parts):
+            cached_content = self.checkpoint_journal.cached_part(part)
+            if cached_content is not None:
+                self.logger.log_line(f'Reusing the checkpointed response of part {part_index + 1} of {len(parts)}')
+                response = APIResponse(cached_content, True)
+            else:
+                self.logger.log_line(f'Sending part {part_index + 1} of {len(parts)}')
                 response = self.bot_communicator.ask_for_docstrings(part, retry_count)
-                if response:
-                    if response.is_valid:
-                        content = response.content
-                        if 'length' in content and 'exceed' in content:
-                            self.logger.log_line('Context length exceeded. Trying again with more parts.')
-                            return attempt_send(code, iteration + 1)
-                        responses.append({'content': content, 'source_code': part})
-                    else:
-                        return response
-            return APIResponse(responses, True)
-        return attempt_send(source_code)
+            if response:
+                if response.is_valid:
+                    content = response.content
+                    if 'length' in content and 'exceed' in content:
+                        self.logger.log_line('Context length exceeded. Trying again with more parts.')
+                        return APIResponse('', False, CONTEXT_LENGTH_EXCEEDED)
+                    if cached_content is None:
+                        self.checkpoint_journal.record_part(part, content)
+                    responses.append({'content': content, 'source_code': part, 'part_index': part_index})
+                else:
+                    return response
+        return APIResponse(responses, True)
         
 if global_config.mode == "web":
     dependencies.register(CommunicatorManager, CommunicatorManager, Scope.SCOPED)
@@ -0,0 +1,141 @@
+import ast
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from DocStringGenerator.DependencyContainer import DependencyContainer, Scope
+dependencies = DependencyContainer()
+from DocStringGenerator.GlobalConfig import GlobalConfig
+global_config = dependencies.resolve(GlobalConfig)
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.Utility import APIResponse
+from DocStringGenerator.FileDiscovery import FileDiscovery
+
+# Below this many files the cost of starting worker processes outweighs the parsing
+MIN_FILES_FOR_POOL = 32
+
+class DocstringChecker(ast.NodeVisitor):
+    """AST visitor that checks for the presence of docstrings in functions and classes."""
+
+    def __init__(self):
+        self.missing_docstrings: list[str] = []
+        self.missing_definitions: list[dict[str, Any]] = []
+        self.total_definitions = 0
+        self.class_names: list[str] = []
+
+    def visit_FunctionDef(self, node: ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef):
+        """Visit a function or class definition and check if it has a docstring."""
+        if not "example_" in node.name:
+            self.total_definitions += 1
+            if not ast.get_docstring(node):
+                self.missing_docstrings.append(node.name)
+                self.missing_definitions.append({
+                    "name": node.name,
+                    "kind": type(node).__name__,
+                    "class": self.class_names[-1] if self.class_names else "",
+                    "line": min([node.lineno, *(decorator.lineno for decorator in node.decorator_list)]),
+                    "body_line": node.body[0].lineno,
+                    "end_line": node.end_lineno or node.lineno
+                })
+        if isinstance(node, ast.ClassDef):
+            self.class_names.append(node.name)
+            self.generic_visit(node)  # Continue traversing child nodes
+            self.class_names.pop()
+        else:
+            self.generic_visit(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+    visit_ClassDef = visit_FunctionDef
+
+@dataclass
+class FileCoverage:
+    path: str
+    total_definitions: int = 0
+    missing: list[dict[str, Any]] = field(default_factory=list)
+    error: str = ''
+
+    @property
+    def needs_work(self) -> bool:
+        return bool(self.missing) or bool(self.error)
+
+def scan_source(source: str, path: str = '') -> FileCoverage:
+    """Reports the definitions of source that have no docstring."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        return FileCoverage(path, error=f"Invalid Python code: {e}")
+    checker = DocstringChecker()
+    checker.visit(tree)
+    return FileCoverage(path, checker.total_definitions, checker.missing_definitions)
+
+def scan_file(path: str) -> FileCoverage:
+    try:
+        source = Path(path).read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError) as e:
+        return FileCoverage(path, error=str(e))
+    return scan_source(source, path)
+
+@dataclass
+class CoverageReport:
+    files: list[FileCoverage]
+
+    @property
+    def total_definitions(self) -> int:
+        return sum(file.total_definitions for file in self.files)
+
+    @property
+    def missing_definitions(self) -> int:
+        return sum(len(file.missing) for file in self.files)
+
+    @property
+    def coverage(self) -> float:
+        total = self.total_definitions
+        return (total - self.missing_definitions) / total if total else 1.0
+
+    def files_needing_work(self) -> list[FileCoverage]:
+        return [file for file in self.files if file.needs_work]
+
+    def format(self) -> str:
+        lines = [f"{'file':<60}{'defs':>7}{'missing':>9}"]
+        for file in self.files_needing_work():
+            lines.append(f"{file.path:<60}{file.total_definitions:>7}{len(file.missing):>9}" + (f"  {file.error}" if file.error else ''))
+            lines.extend(f"    {definition['line']:>5}  {definition['kind']} {definition['name']}" for definition in file.missing)
+        lines.append(f"{len(self.files)} files, {len(self.files_needing_work())} need work, "
+                     f"{self.total_definitions - self.missing_definitions}/{self.total_definitions} definitions documented ({self.coverage:.1%})")
+        return '\n'.join(lines)
+
+class CoverageScanner:
+    """
+    Reports missing docstrings over a file or folder without contacting any bot, using the same
+    file discovery rules as CodeProcessor.process_folder_or_file. Large trees are
+    parsed in worker processes.
+    """
+
+    def __init__(self):
+        self.config: dict[str, Any] = ConfigManager().config
+
+    def list_files(self, path: str | Path | None = None) -> list[Path]:
+        return list(FileDiscovery.from_config(self.config).discover(path if path is not None else self.config.get('path', '')))
+
+    def scan(self, path: str | Path | None = None, workers: int | None = None) -> CoverageReport:
+        files = [str(file) for file in self.list_files(path)]
+        workers = workers if workers is not None else self.config.get('coverage_workers', 0) or os.cpu_count() or 1
+        if workers > 1 and len(files) >= MIN_FILES_FOR_POOL:
+            # Spawned, not forked: the logger and writer threads may hold locks a forked child would inherit
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+                results = list(executor.map(scan_file, files, chunksize=max(1, len(files) // (workers * 4))))
+        else:
+            results = [scan_file(file) for file in files]
+        return CoverageReport(results)
+
+    def verify(self, path: str | Path | None = None) -> APIResponse:
+        """Returns the report, valid only when every definition is documented."""
+        report = self.scan(path)
+        return APIResponse(report, not report.files_needing_work(), report.format())
+
+if global_config.mode == "web":
+    dependencies.register(CoverageScanner, CoverageScanner, Scope.SCOPED)
+else:
+    dependencies.register(CoverageScanner, CoverageScanner, Scope.SINGLETON)
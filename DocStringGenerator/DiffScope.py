@@ -0,0 +1,92 @@
+import ast
+import difflib
+import re
+import subprocess
+from pathlib import Path
+from typing import Any
+
+_FILE_HEADER = re.compile(r'^\+\+\+ (?:b/)?(.*)$')
+_HUNK_HEADER = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+def diff_hunks(rev_range: str, folder: Path, paths: list[Path] | None = None) -> dict[Path, list[tuple[int, int]]]:
+    """
+    Returns the lines of each Python file under folder changed by rev_range, as (first, last) line
+    ranges in the file as it is now. rev_range takes anything git diff does ('HEAD~1', 'main...HEAD',
+    '--cached'); it should end at the checked-out state, since the files on disk are what gets documented.
+    paths narrows the diff to those files. Raises subprocess.CalledProcessError when git fails.
+    """
+    top = Path(subprocess.run(['git', 'rev-parse', '--show-toplevel'], cwd=folder, capture_output=True, text=True, check=True).stdout.strip())
+    diff = subprocess.run(['git', '-c', 'core.quotepath=off', 'diff', '-U0', '--no-color', '--no-ext-diff', '--no-renames', '--diff-filter=AM',
+                           *rev_range.split(), '--', *(str(path) for path in paths or ['*.py'])], cwd=folder, capture_output=True, text=True, check=True).stdout
+    folder = folder.resolve()
+    hunks: dict[Path, list[tuple[int, int]]] = {}
+    ranges: list[tuple[int, int]] | None = None
+    for line in diff.splitlines():
+        file_header = _FILE_HEADER.match(line)
+        if file_header:
+            path = Path(top, file_header.group(1)).resolve()
+            ranges = hunks.setdefault(path, []) if path.is_relative_to(folder) else None
+            continue
+        hunk_header = _HUNK_HEADER.match(line)
+        if hunk_header and ranges is not None:
+            start, count = int(hunk_header.group(1)), int(hunk_header.group(2) or 1)
+            # A hunk that only removes lines is placed after line start; the definition around it changed
+            ranges.append((start, start + count - 1) if count else (max(start, 1), max(start, 1)))
+    return hunks
+
+def is_tracked(path: Path) -> bool:
+    """Tells whether git tracks path; False outside a work tree or when git is missing."""
+    try:
+        subprocess.run(['git', 'ls-files', '--error-unmatch', '--', path.name], cwd=path.parent, capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return True
+
+def changed_line_ranges(old: str, new: str) -> list[tuple[int, int]]:
+    """Returns the lines of new that differ from old, as (first, last) ranges like diff_hunks."""
+    matcher = difflib.SequenceMatcher(None, old.splitlines(), new.splitlines(), autojunk=False)
+    ranges: list[tuple[int, int]] = []
+    for tag, _, _, start, end in matcher.get_opcodes():
+        if tag != 'equal':
+            ranges.append((start + 1, end) if end > start else (max(start, 1), max(start, 1)))
+    return ranges
+
+def changed_definitions(source: str, line_ranges: list[tuple[int, int]]) -> list[dict[str, Any]]:
+    """
+    Maps changed lines to the innermost class, method or module-level function enclosing them, in the
+    form CoverageScanner reports definitions. A class only counts as changed when a changed line is in
+    the class outside its methods; functions nested in functions count as their enclosing function.
+    Blank lines are ignored.
+    """
+    tree = ast.parse(source)
+    lines = source.splitlines()
+    definitions: list[dict[str, Any]] = []
+    owner: list[int] = [-1] * (len(lines) + 2)
+
+    def visit(node: ast.AST, class_name: str):
+        for child in ast.iter_child_nodes(node):
+            if not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue
+            start = min([child.lineno, *(decorator.lineno for decorator in child.decorator_list)])
+            end = child.end_lineno or child.lineno
+            if "example_" not in child.name:
+                definitions.append({
+                    "name": child.name,
+                    "kind": type(child).__name__,
+                    "class": class_name,
+                    "line": start,
+                    "body_line": child.body[0].lineno,
+                    "end_line": end
+                })
+                # Parents are painted before their children, so each line ends up owned by the innermost definition
+                owner[start:end + 1] = [len(definitions) - 1] * (end - start + 1)
+            if isinstance(child, ast.ClassDef):
+                visit(child, child.name)
+
+    visit(tree, "")
+    changed: set[int] = set()
+    for first, last in line_ranges:
+        for line_number in range(max(first, 1), min(last, len(lines)) + 1):
+            if lines[line_number - 1].strip() and owner[line_number] >= 0:
+                changed.add(owner[line_number])
+    return [definitions[index] for index in sorted(changed)]
@@ -0,0 +1,93 @@
+import sys
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+@dataclass(slots=True, frozen=True)
+class FunctionDocstring:
+    name: str
+    docstring: str
+
+@dataclass(slots=True, frozen=True)
+class FunctionDocstrings:
+    """
+    Functions stored as two parallel tuples; a record per function would take more memory than
+    the dict entry it replaces, so FunctionDocstring records are only built while iterating.
+    """
+    names: tuple[str, ...] = ()
+    docstrings: tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, functions: Any) -> 'FunctionDocstrings':
+        if not isinstance(functions, dict):
+            return cls()
+        items = [(sys.intern(name), docstring) for name, docstring in functions.items() if isinstance(docstring, str)]
+        return cls(tuple(name for name, _ in items), tuple(docstring for _, docstring in items))
+
+    def __iter__(self) -> Iterator[FunctionDocstring]:
+        return (FunctionDocstring(name, docstring) for name, docstring in zip(self.names, self.docstrings))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def get(self, name: str) -> str | None:
+        try:
+            return self.docstrings[self.names.index(name)]
+        except ValueError:
+            return None
+
+    def to_dict(self) -> dict[str, str]:
+        return dict(zip(self.names, self.docstrings))
+
+@dataclass(slots=True, frozen=True)
+class ClassDocstring:
+    name: str
+    docstring: str | None = None
+    example: str | None = None
+    methods: FunctionDocstrings = FunctionDocstrings()
+
+@dataclass(slots=True, frozen=True)
+class DocstringSet:
+    """
+    Compact, read-only form of the 'docstrings' object of a response. Names are interned so the
+    results of thousands of files share one copy of each class and function name.
+    """
+    classes: tuple[ClassDocstring, ...] = ()
+    global_functions: FunctionDocstrings = FunctionDocstrings()
+
+    @classmethod
+    def from_dict(cls, docstrings: dict[str, Any]) -> 'DocstringSet':
+        """Builds the set from a validated 'docstrings' object; unexpected entries are skipped."""
+        classes: list[ClassDocstring] = []
+        global_functions = FunctionDocstrings()
+        for name, value in docstrings.items():
+            if not isinstance(value, dict):
+                continue
+            if name == 'global_functions':
+                global_functions = FunctionDocstrings.from_dict(value)
+                continue
+            methods = FunctionDocstrings.from_dict(value.get('methods'))
+            classes.append(ClassDocstring(sys.intern(name), value.get('docstring'), value.get('example'), methods))
+        return cls(tuple(classes), global_functions)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the 'docstrings' object this set was built from."""
+        docstrings: dict[str, Any] = {}
+        for class_docstring in self.classes:
+            class_dict: dict[str, Any] = {}
+            if class_docstring.docstring is not None:
+                class_dict['docstring'] = class_docstring.docstring
+            if class_docstring.example is not None:
+                class_dict['example'] = class_docstring.example
+            if class_docstring.methods:
+                class_dict['methods'] = class_docstring.methods.to_dict()
+            docstrings[class_docstring.name] = class_dict
+        if self.global_functions:
+            docstrings['global_functions'] = self.global_functions.to_dict()
+        return docstrings
+
+    def class_docstrings(self) -> dict[str, ClassDocstring]:
+        return {class_docstring.name: class_docstring for class_docstring in self.classes}
+
+    def examples(self) -> dict[str, str]:
+        """Returns the example of every class that has one, by class name."""
+        return {class_docstring.name: class_docstring.example for class_docstring in self.classes if class_docstring.example}
@@ -1,7 +1,7 @@
 from unittest.mock import MagicMock, patch, ANY
 
 import re
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Sequence, Tuple
 import ast
 import logging
 import json
@@ -14,6 +14,12 @@ from DocStringGenerator.DependencyContainer import DependencyContainer, Scope
 dependencies = DependencyContainer()
 from DocStringGenerator.GlobalConfig import GlobalConfig
 global_config = dependencies.resolve(GlobalConfig)
+from DocStringGenerator.Instrumentation import instrumented
+from DocStringGenerator.SourcePatcher import SourcePatcher
+from DocStringGenerator import ResponseSchema
+from DocStringGenerator.ResponseMerger import ResponseMerger
+from DocStringGenerator.DocstringModel import DocstringSet
+from DocStringGenerator.Logger import Logger
 
 class DocstringProcessor:
     """The `DocstringProcessor` class is a singleton that provides functionality to insert docstrings into a Python source file.
@@ -33,51 +39,84 @@ class DocstringProcessor:
 
     def __init__(self):
         self.config = ConfigManager().config
+        self.logger: Logger = dependencies.resolve(Logger)
 
-    def insert_docstrings(self, content: str, docstrings: Dict[str, Dict[str, str]]):
+    @instrumented('insert_docstrings')
+    def insert_docstrings(self, content: str, docstrings: Dict[str, Dict[str, str]] | DocstringSet):
 
-        content_lines = content.splitlines()
+        patcher = SourcePatcher(content)
         tree = ast.parse(content)
 
-        insertions = self._prepare_insertions(tree, content_lines, docstrings)
+        # The buffer reads lines on demand instead of holding a list of every line
+        insertions = self._prepare_insertions(tree, patcher.buffer, docstrings)
+        del tree
+        for i, docstring in insertions.items():
+            patcher.insert_lines_after(i + 1, docstring)
 
-        new_content: list[str] = []
-        for i, line in enumerate(content_lines):
-            new_content.append(line)
-            if i in insertions:
-                new_content.append(insertions[i])  # Properly extend the list with the docstring lines
+        return patcher.apply().content
 
-        new_content_str: str = '\n'.join(new_content)
-        return new_content_str
-
-    def _prepare_insertions(self, tree: ast.AST, content_lines: list[str], docstrings: dict[str, Any]) -> dict[int, str]:
+    def _prepare_insertions(self, tree: ast.AST, content_lines: Sequence[str], docstrings: dict[str, Any] | DocstringSet) -> dict[int, str]:
+        docstring_set = docstrings if isinstance(docstrings, DocstringSet) else DocstringSet.from_dict(docstrings)
+        class_docstrings = docstring_set.class_docstrings()
+        global_functions = docstring_set.global_functions.to_dict()
         insertions: dict[int, str] = {}
         for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
                 start_line = node.lineno - 1
                 indent_level = 4 + self._get_indent(content_lines[start_line])
                 class_or_func_name = node.name
 
-                if isinstance(node, ast.ClassDef) and class_or_func_name in docstrings:
-                    class_doc = docstrings[class_or_func_name]
-                    if "docstring" in class_doc:
-                        insertions[start_line] = self._format_docstring(class_doc["docstring"], indent_level)
+                if isinstance(node, ast.ClassDef) and class_or_func_name in class_docstrings:
+                    class_doc = class_docstrings[class_or_func_name]
+                    if class_doc.docstring is not None:
+                        insertions[start_line] = self._format_docstring(class_doc.docstring, indent_level)
 
-                    if "methods" in class_doc:
-                        for method_name, method_doc in class_doc["methods"].items():
-                            for inner_node in node.body:
-                                if isinstance(inner_node, ast.FunctionDef) and inner_node.name == method_name:
-                                    inner_start_line = inner_node.lineno - 1
-                                    inner_indent_level = 4 + self._get_indent(content_lines[inner_start_line])
-                                    insertions[inner_start_line] = self._format_docstring(method_doc, inner_indent_level)
+                    for method in class_doc.methods:
+                        for inner_node in node.body:
+                            if isinstance(inner_node, (ast.FunctionDef, ast.AsyncFunctionDef)) and inner_node.name == method.name:
+                                inner_start_line = inner_node.lineno - 1
+                                inner_indent_level = 4 + self._get_indent(content_lines[inner_start_line])
+                                insertions[inner_start_line] = self._format_docstring(method.docstring, inner_indent_level)
 
-                elif isinstance(node, ast.FunctionDef) and 'global_functions' in docstrings:
-                    if class_or_func_name in docstrings['global_functions']:
-                        func_doc = docstrings['global_functions'][class_or_func_name]
-                        insertions[start_line] = self._format_docstring(func_doc, indent_level)
+                elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and class_or_func_name in global_functions:
+                    insertions[start_line] = self._format_docstring(global_functions[class_or_func_name], indent_level)
 
         return insertions
 
+    def to_docstring_set(self, docstrings: dict[str, Any] | DocstringSet) -> DocstringSet:
+        """Returns the compact form of a 'docstrings' object, for results that are kept after processing."""
+        return docstrings if isinstance(docstrings, DocstringSet) else DocstringSet.from_dict(docstrings)
+
+    def merge_docstring_sets(self, docstring_sets: list[DocstringSet]) -> DocstringSet:
+        """Merges docstring sets, for example those of several bots, with the same rules as merge_json_objects."""
+        merger = ResponseMerger()
+        for docstring_set in docstring_sets:
+            merger.add(docstring_set.to_dict())
+        return DocstringSet.from_dict(merger.result())
+
+    def filter_docstrings(self, docstrings: dict[str, Any], missing_definitions: list[dict[str, Any]]) -> dict[str, Any]:
+        """Keeps only the docstrings of the given missing definitions so documented ones are not inserted twice."""
+        missing_classes = {definition['name'] for definition in missing_definitions if definition['kind'] == 'ClassDef'}
+        missing_functions = {(definition['class'], definition['name']) for definition in missing_definitions if definition['kind'] != 'ClassDef'}
+        filtered: dict[str, Any] = {}
+        for key, value in docstrings.items():
+            if not isinstance(value, dict):
+                continue
+            if key == 'global_functions':
+                functions = {name: doc for name, doc in value.items() if ('', name) in missing_functions}
+                if functions:
+                    filtered[key] = functions
+                continue
+            class_doc: dict[str, Any] = {}
+            if 'docstring' in value and key in missing_classes:
+                class_doc['docstring'] = value['docstring']
+            methods = {name: doc for name, doc in value.get('methods', {}).items() if (key, name) in missing_functions}
+            if methods:
+                class_doc['methods'] = methods
+            if class_doc:
+                filtered[key] = class_doc
+        return filtered
+
     def _get_indent(self, line: str) -> int:
         return len(line) - len(line.lstrip())
 
@@ -102,58 +141,13 @@ class DocstringProcessor:
 
         return '\n'.join(formatted_docstring)
 
-    def _validate_function_docstring(self, methods: dict[str, str], max_length: int=999) -> APIResponse:
-        for method_name, method_doc in methods.items():
-            for line in method_doc.splitlines():
-                if len(line) > max_length:
-                    return APIResponse(None, False, f"Docstring line in '{method_name}' exceeds maximum length of {max_length} characters.")
-
-        return APIResponse(None, True)
-        
-
+    @instrumented('validate_response')
     def validate_response(self, json_object: Any, example_only: bool=False, ask_missing: bool=False, max_length: int=999) -> APIResponse:
-        try:            
-            docstrings: dict[str, Any] = {}
-            # Validate docstrings
-            if not ask_missing:
-                docstrings = json_object.get("docstrings", {})
-                if not isinstance(docstrings, dict):
-                    return APIResponse(json_object, False, "Invalid format: 'docstrings' should be a dictionary.")
-            
-            if not example_only:
-                # Validate each class and global functions
-                for key, value in docstrings.items():
-                    if key == "global_functions":
-                        if not isinstance(value, dict):
-                            return APIResponse(json_object, False, f"Invalid format: Global functions under '{key}' should be a dictionary.")
-                        else:
-                            response = self._validate_function_docstring(value)
-                            if not response.is_valid:
-                                return response
-                        
-                    else:
-                        if not isinstance(value, dict) or "docstring" not in value:
-                            return APIResponse(json_object, False, f"Invalid format: Class '{key}' should contain a 'docstring'.")
-                        methods: str = value["methods"]
-                        if "methods" in value and not isinstance(methods, dict):
-                            return APIResponse(json_object, False, f"Invalid format: Methods under class '{key}' should be a dictionary.")
-                        response = self._validate_function_docstring(value.get("methods", {}))
-                        if not response.is_valid:
-                            return response
-                    # Check docstring length
-                    docstring = value.get('docstring', "")
-                    for line in docstring.splitlines():
-                        if len(line) > max_length:
-                            return APIResponse(json_object, False, f"Docstring line in '{key}' exceeds maximum length of {max_length} characters.")
-
-
-            # Validate examples
-            if "examples" in json_object and not isinstance(json_object["examples"], dict):
-                return APIResponse(json_object, False, "Invalid format: 'examples' should be a dictionary.")
-
-        except json.JSONDecodeError as e:
-            return APIResponse(json_object, False, f"JSON decoding error encountered. {e}")
-
+        """Validates a bot response against the compiled response schema, reporting every error at once."""
+        mode = 'ask_missing' if ask_missing else 'example_only' if example_only else 'full'
+        errors = ResponseSchema.validate(json_object, mode, max_length)
+        if errors:
+            return APIResponse(json_object, False, '\n'.join(errors))
         return APIResponse(json_object, True, "Response validated successfully.")
 
     
@@ -173,48 +167,91 @@ class DocstringProcessor:
         """
         Merge a list of JSON objects, deeply merging nested dictionaries.
         """
-        merged_data = {}
-
+        merger = ResponseMerger()
         for obj in json_objects:
-            merged_data = self.deep_merge_dict(merged_data, obj)
-
-        return merged_data
-
+            merger.add(obj)
+        return merger.result()
+
+    @instrumented('parse_json')
+    def parse_json(self, content: str) -> APIResponse:
+        """Parses structured-output responses directly and falls back to extracting JSON from free text."""
+        try:
+            json_object = json.loads(content)
+            if isinstance(json_object, dict):
+                return APIResponse(json_object, True)
+        except (json.JSONDecodeError, TypeError):
+            pass
+        return Utility.parse_json(content)
+
+    @instrumented('extract_docstrings')
     def extract_docstrings(self, responses: list[dict[str, Any]] | str, example_only: bool = False, ask_missing: bool=False) -> APIResponse:
-        # Merge responses before validity check
-        json_responses = []
-        if isinstance(responses, list):
-            for response in responses:
-                content = response["content"]
-                parse_json_response: APIResponse = Utility.parse_json(content)
-                json_object = parse_json_response.content
-                if not parse_json_response.is_valid:
-                    return parse_json_response
-
-                json_responses.append(json_object)
-        elif isinstance(responses, str):
-            content = responses
-            parse_json_response: APIResponse = Utility.parse_json(content)
-            json_object = parse_json_response.content
-            if not parse_json_response.is_valid:
-                return parse_json_response
-
-            json_responses.append(json_object)
+        """
+        Parses, merges and validates the responses. When it fails, the content lists the parts to ask again
+        as {'part_index', 'source_code', 'error'} so the valid parts can be kept.
+        """
+        if isinstance(responses, str):
+            responses = [{'content': responses}]
+        max_length=self.config.get('max_line_length', 999)
 
-        merged_response = self.merge_json_objects(json_responses)
+        json_responses: list[dict[str, Any]] = []
+        failed_parts: list[dict[str, Any]] = []
+        for index, response in enumerate(responses):
+            part = {'part_index': response.get('part_index', index), 'source_code': response.get('source_code', '')}
+            parse_json_response: APIResponse = self.parse_json(response["content"])
+            if not parse_json_response.is_valid:
+                failed_parts.append({**part, 'error': parse_json_response.error_message})
+                continue
+            # Parts only hold some of the methods of a split class, so the class docstring is checked after merging
+            part_response = self.validate_response(parse_json_response.content, example_only, ask_missing or not example_only, max_length)
+            if not part_response.is_valid:
+                failed_parts.append({**part, 'error': part_response.error_message})
+                continue
+            json_responses.append({**part, 'json_object': parse_json_response.content})
+        if failed_parts:
+            return self._failed_parts_response(failed_parts, len(responses))
+
+        merger = ResponseMerger()
+        for json_response in json_responses:
+            merger.add(json_response['json_object'], json_response['part_index'])
+        merged_response = merger.result()
+        if merger.conflicts:
+            self.logger.log_line(f"Parts disagree on {', '.join(merger.conflicts)}; keeping the later part.")
 
         # Check the validity of the merged response
-        max_length=self.config.get('max_line_length', 999)
         response = self.validate_response(merged_response, example_only, ask_missing, max_length)
         if not response.is_valid:
-            return response           
+            for json_response in json_responses:
+                part_response = self.validate_response(self._merged_view(json_response['json_object'], merged_response), example_only, ask_missing, max_length)
+                if not part_response.is_valid:
+                    failed_parts.append({'part_index': json_response['part_index'], 'source_code': json_response['source_code'], 'error': part_response.error_message})
+            if failed_parts:
+                return self._failed_parts_response(failed_parts, len(responses))
+            return APIResponse(self._all_parts_failed(json_responses, response.error_message), False, response.error_message)
 
         # Extract docstrings from merged data
         docstrings = merged_response.get("docstrings", {})
         if docstrings:
             return APIResponse(docstrings, True)
-        
-        return APIResponse("", False, "No docstrings found in response.")               
+
+        error_message = "No docstrings found in response."
+        return APIResponse(self._all_parts_failed(json_responses, error_message), False, error_message)
+
+    def _merged_view(self, json_object: dict[str, Any], merged_response: dict[str, Any]) -> dict[str, Any]:
+        """Returns the merged entries of the classes a part documents, so a part is only blamed for what no part supplied."""
+        part_docstrings = json_object.get('docstrings')
+        merged_docstrings = merged_response.get('docstrings')
+        if not isinstance(part_docstrings, dict) or not isinstance(merged_docstrings, dict):
+            return json_object
+        return {**json_object, 'docstrings': {name: merged_docstrings[name] for name in part_docstrings}}
+
+    def _all_parts_failed(self, json_responses: list[dict[str, Any]], error_message: str) -> list[dict[str, Any]]:
+        return [{'part_index': response['part_index'], 'source_code': response['source_code'], 'error': error_message} for response in json_responses]
+
+    def _failed_parts_response(self, failed_parts: list[dict[str, Any]], part_count: int) -> APIResponse:
+        if part_count == 1:
+            return APIResponse(failed_parts, False, failed_parts[0]['error'])
+        error_message = '\n'.join(f"Part {part['part_index'] + 1} of {part_count}: {part['error']}" for part in failed_parts)
+        return APIResponse(failed_parts, False, error_message)
 
 
 if global_config.mode == "web":
@@ -20,5 +20,5 @@ class EmptyCommunicator(BaseBotCommunicator):
         self.config = ConfigManager().config
         super().__init__()
 
-    def ask(self, prompt, replacements) -> APIResponse:
+    def ask(self, prompt, replacements, keep_history: bool = True) -> APIResponse:
         return APIResponse('Ok', True)
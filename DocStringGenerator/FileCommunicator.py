@@ -2,6 +2,7 @@ from typing import Optional
 import google.generativeai as genai
 import json
 import os
+import random
 import time
 import requests
 from bots import *
@@ -15,6 +16,7 @@ from DocStringGenerator.ConfigManager import ConfigManager
 from DocStringGenerator.ResultThread import ResultThread
 from DocStringGenerator.BaseBotCommunicator import BaseBotCommunicator
 from DocStringGenerator.Logger import Logger
+from DocStringGenerator.ResponseArchive import ResponseArchive
 
 class FileCommunicator(BaseBotCommunicator):
 
@@ -22,12 +24,45 @@ class FileCommunicator(BaseBotCommunicator):
         self.config = ConfigManager().config
         self.logger : Logger = dependencies.resolve(Logger)        
         super().__init__()
+        self.random = random.Random(self.config.get('simulated_seed'))
 
-    def ask(self, prompt, replacements) -> APIResponse:
+    def simulate_network(self) -> APIResponse:
+        """
+        Sleeps for the configured simulated latency (plus or minus jitter) and fails at the configured rate.
+        """
+        latency = float(self.config.get('simulated_latency', 0))
+        jitter = float(self.config.get('simulated_jitter', 0))
+        if latency or jitter:
+            time.sleep(max(latency + self.random.uniform(-jitter, jitter), 0))
+        failure_rate = float(self.config.get('simulated_failure_rate', 0))
+        if failure_rate and self.random.random() < failure_rate:
+            return APIResponse('', False, 'Simulated failure')
+        return APIResponse('', True)
+
+    def response_archive(self) -> ResponseArchive | None:
+        # Replayed responses are already in an archive
+        return None if self.config.get('replay_archive', '') else super().response_archive()
+
+    def replay(self, prompt: str) -> APIResponse:
+        """
+        Answers with the latest successful response recorded in the replay_archive for exactly this prompt.
+        """
+        record = ResponseArchive.shared(self.config['replay_archive']).replay(prompt)
+        if record is None:
+            return APIResponse('', False, 'No archived response for this prompt')
+        self.logger.log_line(f"Replaying response from {record['bot'] or 'unknown bot'} {record['model']}".rstrip())
+        return APIResponse(record['response'], True)
+
+    def ask(self, prompt, replacements, keep_history: bool = True) -> APIResponse:
         prompt_response = self.format_prompt(prompt, replacements)
         if not prompt_response.is_valid:
             return prompt_response
         self.logger.log_line("sending prompt: " + prompt_response.content)
+        simulate_response = self.simulate_network()
+        if not simulate_response.is_valid:
+            return simulate_response
+        if self.config.get('replay_archive', ''):
+            return self.replay(prompt_response.content)
 
         try:
             working_directory = os.getcwd()
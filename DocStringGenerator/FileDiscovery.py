@@ -0,0 +1,169 @@
+import fnmatch
+import os
+import queue
+import re
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+
+# Folders that never hold source to document; they are pruned before being opened
+DEFAULT_PRUNED_DIRS = frozenset({'.git', '.hg', '.svn', '__pycache__', 'node_modules', '.venv', 'venv', '.tox', '.nox', '.mypy_cache', '.pytest_cache', 'site-packages'})
+# 0 disables the size limit; large modules are split into parts before they are sent
+DEFAULT_MAX_FILE_SIZE = 0
+HEADER_SIZE = 8192
+GENERATED_HEADER_LINES = 5
+# Only comments count: a docstring saying "reports generated by CI" does not make a module generated
+_GENERATED_MARKER = re.compile(r'^[ \t]*#.*(?:@generated|do not edit|auto-?generated|generated by)', re.IGNORECASE | re.MULTILINE)
+
+class GitignorePattern:
+    """One line of a .gitignore file, matched against paths relative to the folder of that file."""
+
+    def __init__(self, line: str):
+        self.negated = line.startswith('!')
+        pattern = line[1:] if self.negated else line
+        self.directory_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        # A slash anywhere but at the end anchors the pattern to the .gitignore folder
+        self.anchored = '/' in pattern
+        self.regex = _translate(pattern.lstrip('/'))
+
+    def matches(self, relative_path: str, is_dir: bool) -> bool:
+        if self.directory_only and not is_dir:
+            return False
+        return bool(self.regex.match(relative_path if self.anchored else relative_path.rsplit('/', 1)[-1]))
+
+def _translate(pattern: str) -> re.Pattern[str]:
+    """Compiles a gitignore glob: '*' and '?' stay within one folder and '**/' matches any number of folders."""
+    parts: list[str] = []
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith('**/', index):
+            parts.append('(?:.*/)?')
+            index += 3
+        elif pattern.startswith('**', index):
+            parts.append('.*')
+            index += 2
+        elif pattern[index] == '*':
+            parts.append('[^/]*')
+            index += 1
+        elif pattern[index] == '?':
+            parts.append('[^/]')
+            index += 1
+        elif pattern[index] == '[' and ']' in pattern[index + 2:]:
+            end = pattern.index(']', index + 2)
+            characters = pattern[index + 1:end]
+            parts.append('[' + ('^' + characters[1:] if characters.startswith('!') else characters).replace('\\', '\\\\') + ']')
+            index = end + 1
+        else:
+            parts.append(re.escape(pattern[index]))
+            index += 1
+    return re.compile(''.join(parts) + r'\Z')
+
+def read_gitignore(folder: Path) -> list[GitignorePattern]:
+    try:
+        lines = Path(folder, '.gitignore').read_text(encoding='utf-8', errors='replace').splitlines()
+    except OSError:
+        return []
+    return [GitignorePattern(line.strip()) for line in lines if line.strip() and not line.startswith('#')]
+
+class FileDiscovery:
+    """
+    Lazily lists the Python files under a folder with os.scandir. Ignored and well-known dependency
+    folders are pruned without being opened, .gitignore files are honoured, and binary, huge or
+    generated files are skipped. feed() runs the walk on a thread so processing can start at once.
+    """
+
+    def __init__(self, include_subfolders: bool = False, ignore: list[str] | str = [], use_gitignore: bool = True,
+                 max_file_size: int = DEFAULT_MAX_FILE_SIZE, skip_generated: bool = True):
+        self.include_subfolders = include_subfolders
+        self.ignore: list[str] = [ignore] if isinstance(ignore, str) else list(ignore)
+        self.use_gitignore = use_gitignore
+        self.max_file_size = max_file_size
+        self.skip_generated = skip_generated
+        self.skipped: list[tuple[str, str]] = []
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> 'FileDiscovery':
+        return cls(config.get('include_subfolders', False), config.get('ignore', []), config.get('use_gitignore', True),
+                   config.get('max_file_size', DEFAULT_MAX_FILE_SIZE), config.get('skip_generated_files', True))
+
+    def is_ignored(self, name: str) -> bool:
+        """Matches a file or folder name against the ignore list, which takes exact names or glob patterns."""
+        return any(name == pattern or fnmatch.fnmatchcase(name, pattern) for pattern in self.ignore)
+
+    def discover(self, path: str | Path, check_contents: bool = True) -> Iterator[Path]:
+        """
+        Yields the source files under path (or path itself) as the walk reaches them. Without
+        check_contents files are not opened, so binary and generated files are not filtered out.
+        """
+        path = Path(path)
+        if path.is_file():
+            if path.suffix == '.py' and not self.is_ignored(path.name) and (not check_contents or self.is_source_file(path, path.stat().st_size)):
+                yield path
+            return
+        if path.is_dir():
+            yield from self._walk(path, [(path, read_gitignore(path))] if self.use_gitignore else [], check_contents)
+
+    def _walk(self, folder: Path, gitignores: list[tuple[Path, list[GitignorePattern]]], check_contents: bool = True) -> Iterator[Path]:
+        try:
+            with os.scandir(folder) as scanner:
+                entries = sorted(scanner, key=lambda entry: entry.name)
+        except OSError as e:
+            self.skipped.append((str(folder), str(e)))
+            return
+        subfolders: list[os.DirEntry[str]] = []
+        for entry in entries:
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if self.is_ignored(entry.name) or self._gitignored(Path(entry.path), is_dir, gitignores):
+                continue
+            if is_dir:
+                if self.include_subfolders and entry.name not in DEFAULT_PRUNED_DIRS:
+                    subfolders.append(entry)
+            elif entry.name.endswith('.py') and entry.is_file():
+                if not check_contents or self.is_source_file(Path(entry.path), entry.stat().st_size):
+                    yield Path(entry.path)
+        for entry in subfolders:
+            subfolder = Path(entry.path)
+            patterns = read_gitignore(subfolder) if self.use_gitignore else []
+            yield from self._walk(subfolder, gitignores + [(subfolder, patterns)] if patterns else gitignores, check_contents)
+
+    def _gitignored(self, path: Path, is_dir: bool, gitignores: list[tuple[Path, list[GitignorePattern]]]) -> bool:
+        ignored = False
+        # Later (deeper) files and later lines override earlier ones, as in git
+        for folder, patterns in gitignores:
+            relative_path = path.relative_to(folder).as_posix()
+            for pattern in patterns:
+                if pattern.negated == ignored and pattern.matches(relative_path, is_dir):
+                    ignored = not pattern.negated
+        return ignored
+
+    def is_source_file(self, path: Path, size: int) -> bool:
+        """Rejects files over max_file_size, binary files and files marked as generated in their first lines."""
+        if self.max_file_size and size > self.max_file_size:
+            self.skipped.append((str(path), f'larger than {self.max_file_size} bytes'))
+            return False
+        try:
+            with open(path, 'rb') as file:
+                header = file.read(HEADER_SIZE)
+        except OSError as e:
+            self.skipped.append((str(path), str(e)))
+            return False
+        if b'\0' in header:
+            self.skipped.append((str(path), 'binary'))
+            return False
+        if self.skip_generated and _GENERATED_MARKER.search(b'\n'.join(header.splitlines()[:GENERATED_HEADER_LINES]).decode('utf-8', 'replace')):
+            self.skipped.append((str(path), 'generated'))
+            return False
+        return True
+
+    def feed(self, path: str | Path, work_queue: 'queue.Queue[Path | None]') -> threading.Thread:
+        """Walks on a daemon thread, putting every file on work_queue and None once the walk is done."""
+        def produce():
+            try:
+                for file in self.discover(path):
+                    work_queue.put(file)
+            finally:
+                work_queue.put(None)
+        thread = threading.Thread(target=produce, name='file-discovery', daemon=True)
+        thread.start()
+        return thread
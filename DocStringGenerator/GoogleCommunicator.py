@@ -31,7 +31,7 @@ class GoogleCommunicator(BaseBotCommunicator):
         self.google = genai.GenerativeModel('gemini-pro')
         self.logger : Logger = dependencies.resolve(Logger)         
 
-    def ask(self, prompt, replacements) -> APIResponse:
+    def ask(self, prompt, replacements, keep_history: bool = True) -> APIResponse:
         formatted_prompt_response = self.format_prompt(prompt, replacements)
         if not formatted_prompt_response.is_valid:
             return formatted_prompt_response
@@ -0,0 +1,195 @@
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, Iterator
+from DocStringGenerator.DependencyContainer import DependencyContainer, Scope
+dependencies = DependencyContainer()
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.Logger import Logger
+from DocStringGenerator.Utility import APIResponse
+
+def utf8_size(text: str) -> int:
+    """Size of text in bytes once encoded as UTF-8, as it is sent to the bot or written to disk."""
+    return len(text.encode('utf-8', 'surrogatepass'))
+
+class Span:
+    """Handle yielded by Instrumentation.span; the instrumented code fills in sizes and outcome."""
+
+    def __init__(self, phase: str, file: str, bot: str, bytes_in: int = 0, tokens_in: int = 0):
+        self.phase = phase
+        self.file = file
+        self.bot = bot
+        self.bytes_in = bytes_in
+        self.bytes_out = 0
+        self.tokens_in = tokens_in
+        self.tokens_out = 0
+        self.ok = True
+        self.start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.duration = 0.0
+        self.cpu_time = 0.0
+
+    def set_output(self, text: str, count_tokens: bool = False):
+        self.bytes_out = utf8_size(text)
+        if count_tokens:
+            self.tokens_out = Instrumentation.estimate_tokens(text)
+
+@dataclass
+class PhaseStats:
+    count: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    cpu_time: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    tokens_in: int = 0
+    tokens_out: int = 0
+
+    def add(self, span: Span):
+        self.count += 1
+        self.errors += 0 if span.ok else 1
+        self.total_time += span.duration
+        self.max_time = max(self.max_time, span.duration)
+        self.cpu_time += span.cpu_time
+        self.bytes_in += span.bytes_in
+        self.bytes_out += span.bytes_out
+        self.tokens_in += span.tokens_in
+        self.tokens_out += span.tokens_out
+
+    def merge(self, other: 'PhaseStats'):
+        self.count += other.count
+        self.errors += other.errors
+        self.total_time += other.total_time
+        self.max_time = max(self.max_time, other.max_time)
+        self.cpu_time += other.cpu_time
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        self.tokens_in += other.tokens_in
+        self.tokens_out += other.tokens_out
+
+    def to_dict(self) -> dict[str, Any]:
+        result = asdict(self)
+        result['mean_time'] = self.total_time / self.count if self.count else 0.0
+        return result
+
+class Instrumentation:
+    """Collects per-phase timing, byte and token counts for every file and bot processed."""
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Instrumentation, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, '_initialized'):
+            self.config: dict[str, Any] = ConfigManager().config
+            self.stats: dict[tuple[str, str, str], PhaseStats] = {}
+            self.listeners: list[Callable[[str, Span], None]] = []
+            self._lock = threading.Lock()
+            self._initialized = True
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Rough token count (about four characters per token) used when the API reports none."""
+        return (len(text) + 3) // 4
+
+    def add_listener(self, listener: Callable[[str, Span], None]):
+        """Registers a callback invoked with ('start' | 'end', span) around every span."""
+        self.listeners.append(listener)
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+
+    @contextmanager
+    def span(self, phase: str, bytes_in: int = 0, tokens_in: int = 0) -> Iterator[Span]:
+        fields = Logger.current_context()
+        span = Span(phase, fields.get('file', ''), fields.get('bot', '') or self.config.get('bot', ''), bytes_in, tokens_in)
+        self._notify('start', span)
+        try:
+            with Logger.context(phase=phase):
+                yield span
+        except BaseException:
+            span.ok = False
+            raise
+        finally:
+            span.duration = time.perf_counter() - span.start
+            span.cpu_time = time.process_time() - span.cpu_start
+            with self._lock:
+                key = (span.phase, span.file, span.bot)
+                if key not in self.stats:
+                    self.stats[key] = PhaseStats()
+                self.stats[key].add(span)
+            self._notify('end', span)
+
+    def _notify(self, event: str, span: Span):
+        for listener in self.listeners:
+            listener(event, span)
+
+    def total_tokens(self) -> int:
+        """Tokens sent and received since the last reset, across every phase, file and bot."""
+        with self._lock:
+            return sum(stats.tokens_in + stats.tokens_out for stats in self.stats.values())
+
+    def _group(self, index: int) -> dict[str, dict[str, PhaseStats]]:
+        grouped: dict[str, dict[str, PhaseStats]] = {}
+        with self._lock:
+            items = list(self.stats.items())
+        for key, stats in items:
+            group = grouped.setdefault(key[index], {})
+            group.setdefault(key[0], PhaseStats()).merge(stats)
+        return grouped
+
+    def summary(self) -> dict[str, Any]:
+        """Returns the collected statistics per phase, per file and per bot."""
+        phases: dict[str, PhaseStats] = {}
+        for per_phase in self._group(1).values():
+            for phase, stats in per_phase.items():
+                phases.setdefault(phase, PhaseStats()).merge(stats)
+        return {
+            'phases': {phase: stats.to_dict() for phase, stats in phases.items()},
+            'files': {file: {phase: stats.to_dict() for phase, stats in per_phase.items()} for file, per_phase in self._group(1).items()},
+            'bots': {bot: {phase: stats.to_dict() for phase, stats in per_phase.items()} for bot, per_phase in self._group(2).items()}
+        }
+
+    def format_summary(self) -> str:
+        phases: dict[str, dict[str, Any]] = self.summary()['phases']
+        lines = [f"{'phase':<32}{'count':>7}{'total s':>10}{'mean s':>10}{'max s':>10}{'bytes in':>11}{'bytes out':>11}{'tokens':>9}"]
+        for phase, stats in sorted(phases.items(), key=lambda item: -item[1]['total_time']):
+            lines.append(f"{phase:<32}{stats['count']:>7}{stats['total_time']:>10.3f}{stats['mean_time']:>10.3f}{stats['max_time']:>10.3f}"
+                         f"{stats['bytes_in']:>11}{stats['bytes_out']:>11}{stats['tokens_in'] + stats['tokens_out']:>9}")
+        return '\n'.join(lines)
+
+    def dump_report(self, report_path: str | Path):
+        """Writes the summary as JSON to report_path."""
+        Path(report_path).write_text(json.dumps(self.summary(), indent=4))
+
+def instrumented(phase: str):
+    """
+    Method decorator running the call inside a span named after phase. The first string argument
+    is counted as input bytes and the returned text (or APIResponse content) as output bytes.
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            source = next((arg for arg in args if isinstance(arg, str)), '')
+            with Instrumentation().span(phase, bytes_in=utf8_size(source)) as span:
+                result = func(*args, **kwargs)
+                if isinstance(result, APIResponse):
+                    span.ok = result.is_valid
+                    result_text = result.content
+                else:
+                    result_text = result
+                if isinstance(result_text, str):
+                    span.set_output(result_text)
+                return result
+        return wrapper
+    return decorator
+
+dependencies.register(Instrumentation, Instrumentation, Scope.SINGLETON)
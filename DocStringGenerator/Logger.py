@@ -1,37 +1,231 @@
-from typing import Any
+import atexit
+import json
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Iterator, TextIO
 from DocStringGenerator.DependencyContainer import DependencyContainer, Scope
 from DocStringGenerator.ConfigManager import ConfigManager
 dependencies = DependencyContainer()
 from DocStringGenerator.GlobalConfig import GlobalConfig
 global_config = dependencies.resolve(GlobalConfig)
 
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVELS: dict[str, int] = {'DEBUG': DEBUG, 'INFO': INFO, 'WARNING': WARNING, 'ERROR': ERROR}
+
 class ChunkData:
     def __init__(self, bot_name: str, chunk: str):
-        self.logger : Logger = dependencies.resolve(Logger)        
+        self.logger : Logger = dependencies.resolve(Logger)
         self.bot_name = bot_name
         self.chunk = chunk
 
+@dataclass
+class LogRecord:
+    """A single structured log entry with the job, file, bot and phase it belongs to."""
+    message: str
+    level: int = INFO
+    job: str = ''
+    file: str = ''
+    bot: str = ''
+    phase: str = ''
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+class LogSink:
+    """Base class for log destinations. Sinks receive records in batches."""
+
+    def __init__(self, level: int = DEBUG):
+        self.level = level
+
+    def accepts(self, record: LogRecord) -> bool:
+        return record.level >= self.level
+
+    def emit(self, records: list[LogRecord]) -> None:
+        raise NotImplementedError('This method should be implemented by subclasses')
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+class ConsoleSink(LogSink):
+    """Writes the raw messages of a batch to a text stream with a single write and flush."""
+
+    def __init__(self, level: int = DEBUG, stream: TextIO | None = None):
+        super().__init__(level)
+        self.stream = stream
+
+    def emit(self, records: list[LogRecord]) -> None:
+        stream = self.stream or sys.stdout
+        stream.write(''.join(record.message for record in records))
+        stream.flush()
+
+class JsonlFileSink(LogSink):
+    """Appends each record as one JSON object per line."""
+
+    def __init__(self, file_path: str, level: int = DEBUG):
+        super().__init__(level)
+        self.file_path = file_path
+        self._file: TextIO | None = None
+
+    def emit(self, records: list[LogRecord]) -> None:
+        if self._file is None:
+            self._file = open(self.file_path, 'a', encoding='utf-8')
+        self._file.write(''.join(json.dumps(record.to_dict()) + '\n' for record in records))
+
+    def flush(self) -> None:
+        if self._file:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+class CallbackSink(LogSink):
+    """Forwards every record to a callback as a ChunkData, as the web streams expect."""
+
+    def __init__(self, callback: Callable[[ChunkData], Any], level: int = DEBUG):
+        super().__init__(level)
+        self.callback = callback
+
+    def emit(self, records: list[LogRecord]) -> None:
+        for record in records:
+            self.callback(ChunkData(record.bot, record.message))
+
+class LogDispatcher:
+    """Background thread that drains queued records and hands them to sinks in batches."""
+
+    def __init__(self, flush_interval: float = 0.05, max_batch: int = 1024):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue: queue.Queue[tuple[LogSink, LogRecord]] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='LogDispatcher', daemon=True)
+                self._thread.start()
+
+    def submit(self, sinks: list[LogSink], record: LogRecord):
+        self._ensure_started()
+        for sink in sinks:
+            self._queue.put((sink, record))
+
+    def flush(self):
+        """Blocks until every record submitted so far has been written."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write(self, batch: list[tuple[LogSink, LogRecord]]):
+        grouped: dict[int, tuple[LogSink, list[LogRecord]]] = {}
+        for sink, record in batch:
+            grouped.setdefault(id(sink), (sink, []))[1].append(record)
+        for sink, records in grouped.values():
+            try:
+                sink.emit(records)
+                sink.flush()
+            except Exception as e:
+                sys.stderr.write(f'Logger sink {type(sink).__name__} failed: {e}\n')
+
+_dispatcher = LogDispatcher()
+atexit.register(_dispatcher.flush)
+
+_context = threading.local()
+
 class Logger:
     def __init__(self, chunk_received_callback=None):
         config_manager = dependencies.resolve(ConfigManager)
         config: dict[str, Any] = config_manager.config
         self.config: dict[str, Any] = config
         self.chunk_received_callback = chunk_received_callback
+        self.sinks: list[LogSink] = self._create_sinks()
+
+    def _create_sinks(self) -> list[LogSink]:
+        sinks: list[LogSink] = []
+        if self.chunk_received_callback:
+            # The web client renders the token stream, so it always gets every chunk
+            sinks.append(CallbackSink(self.chunk_received_callback))
+        else:
+            sinks.append(ConsoleSink(LEVELS.get(str(self.config.get('log_level', 'INFO')).upper(), INFO)))
+        log_file = self.config.get('log_file', '')
+        if log_file:
+            sinks.append(JsonlFileSink(log_file))
+        return sinks
+
+    def add_sink(self, sink: LogSink):
+        self.sinks.append(sink)
+
+    @staticmethod
+    @contextmanager
+    def context(**fields: str) -> Iterator[None]:
+        """Tags every record logged by the current thread with the given job/file/bot/phase."""
+        previous: dict[str, str] = dict(getattr(_context, 'fields', {}))
+        _context.fields = {**previous, **fields}
+        try:
+            yield
+        finally:
+            _context.fields = previous
+
+    @staticmethod
+    def current_context() -> dict[str, str]:
+        return dict(getattr(_context, 'fields', {}))
+
+    def log_line(self, message: str, level: int = INFO):
+        self.log(message + '\n', level)
 
-    def log_line(self, message: str):
-        self.log(message + '\n')
+    def log(self, message: str, level: int = DEBUG):
+        if not self.config.get('verbose', False) and level < WARNING:
+            return
+        fields: dict[str, str] = getattr(_context, 'fields', {})
+        record = LogRecord(message, level,
+                           job=fields.get('job', ''),
+                           file=fields.get('file', ''),
+                           bot=fields.get('bot', '') or self.config.get('bot', ''),
+                           phase=fields.get('phase', ''))
+        sinks = [sink for sink in self.sinks if sink.accepts(record)]
+        if not sinks:
+            return
+        if self.config.get('log_async', True):
+            _dispatcher.submit(sinks, record)
+        else:
+            for sink in sinks:
+                sink.emit([record])
 
-    def log(self, message: str):
-        if self.config.get('verbose', False):
-            bot = self.config.get('bot', '')
-            if self.chunk_received_callback:
-                # Send log to chunk_received_callback
-                self.chunk_received_callback(ChunkData(bot, message))
-            else:
-                # Default to terminal output
-                print(message)
+    def flush(self):
+        _dispatcher.flush()
+        for sink in self.sinks:
+            sink.flush()
 
 if global_config.mode == "web":
     dependencies.register(Logger, Logger, scope=Scope.SCOPED)
 else:
-    dependencies.register(Logger, Logger, scope=Scope.SINGLETON)
\ No newline at end of file
+    dependencies.register(Logger, Logger, scope=Scope.SINGLETON)
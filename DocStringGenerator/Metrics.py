@@ -0,0 +1,171 @@
+import bisect
+import threading
+from typing import Any, Callable
+from DocStringGenerator.DependencyContainer import DependencyContainer, Scope
+dependencies = DependencyContainer()
+from DocStringGenerator.Instrumentation import Instrumentation, Span
+
+DEFAULT_BUCKETS: tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+def _format_labels(label_names: tuple[str, ...], label_values: tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class Metric:
+    """Base class of a labelled metric rendered in the Prometheus text exposition format."""
+    metric_type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def render(self) -> list[str]:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.metric_type}', *self._render_samples()]
+
+    def _render_samples(self) -> list[str]:
+        raise NotImplementedError('This method should be implemented by subclasses')
+
+class Counter(Metric):
+    metric_type = 'counter'
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, documentation, label_names)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self.values.get(self._key(labels), 0)
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self.values.items())
+        return [f'{self.name}{_format_labels(self.label_names, key)} {value}' for key, value in items]
+
+class Gauge(Counter):
+    """A value that can go up and down, or be read from a callback at scrape time."""
+    metric_type = 'gauge'
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = (),
+                 callback: Callable[[], dict[tuple[str, ...], float]] | None = None):
+        super().__init__(name, documentation, label_names)
+        self.callback = callback
+
+    def dec(self, amount: float = 1, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str):
+        with self._lock:
+            self.values[self._key(labels)] = value
+
+    def _render_samples(self) -> list[str]:
+        if self.callback:
+            with self._lock:
+                self.values = dict(self.callback())
+        return super()._render_samples()
+
+class Histogram(Metric):
+    metric_type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts: dict[tuple[str, ...], list[int]] = {}
+        self.sums: dict[tuple[str, ...], float] = {}
+        self.counts: dict[tuple[str, ...], int] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            if key not in self.bucket_counts:
+                self.bucket_counts[key] = [0] * len(self.buckets)
+                self.sums[key] = 0.0
+                self.counts[key] = 0
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                self.bucket_counts[key][index] += 1
+            self.sums[key] += value
+            self.counts[key] += 1
+
+    def _render_samples(self) -> list[str]:
+        lines: list[str] = []
+        with self._lock:
+            keys = sorted(self.counts)
+            for key in keys:
+                cumulative = 0
+                for upper_bound, count in zip(self.buckets, self.bucket_counts[key]):
+                    cumulative += count
+                    bucket_labels = _format_labels(self.label_names, key, f'le="{upper_bound}"')
+                    lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+                bucket_labels = _format_labels(self.label_names, key, 'le="+Inf"')
+                lines.append(f'{self.name}_bucket{bucket_labels} {self.counts[key]}')
+                lines.append(f'{self.name}_sum{_format_labels(self.label_names, key)} {self.sums[key]}')
+                lines.append(f'{self.name}_count{_format_labels(self.label_names, key)} {self.counts[key]}')
+        return lines
+
+class Metrics:
+    """
+    Process-wide metrics registry. It listens to Instrumentation spans to track bot calls,
+    latencies, retries and tokens, and renders everything for a Prometheus scrape.
+    """
+    _instance = None
+    RETRY_PHASES: tuple[str, ...] = ('ask_retry', 'ask_retry_part', 'ask_retry_examples', 'ask_missing_docstrings')
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Metrics, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, '_initialized'):
+            self.metrics: list[Metric] = []
+            self.requests = self.register(Counter('docstring_http_requests_total', 'HTTP requests handled.', ('method', 'endpoint', 'status')))
+            self.in_flight = self.register(Gauge('docstring_llm_in_flight', 'Bot requests currently in progress.', ('bot',)))
+            self.ask_latency = self.register(Histogram('docstring_ask_duration_seconds', 'Latency of bot requests.', ('bot',)))
+            self.ask_errors = self.register(Counter('docstring_ask_errors_total', 'Bot requests that failed.', ('bot',)))
+            self.process_code_latency = self.register(Histogram('docstring_process_code_duration_seconds', 'Latency of process_code.', ('bot',)))
+            self.retries = self.register(Counter('docstring_retries_total', 'Retry requests sent to bots.', ('bot', 'kind')))
+            self.tokens = self.register(Counter('docstring_tokens_total', 'Estimated tokens exchanged with bots.', ('bot', 'direction')))
+            dependencies.resolve(Instrumentation).add_listener(self.on_span)
+            self._initialized = True
+
+    def register(self, metric: Any) -> Any:
+        self.metrics.append(metric)
+        return metric
+
+    def on_span(self, event: str, span: Span):
+        if span.phase == 'ask':
+            if event == 'start':
+                self.in_flight.inc(bot=span.bot)
+                return
+            self.in_flight.dec(bot=span.bot)
+            self.ask_latency.observe(span.duration, bot=span.bot)
+            self.tokens.inc(span.tokens_in, bot=span.bot, direction='in')
+            self.tokens.inc(span.tokens_out, bot=span.bot, direction='out')
+            if not span.ok:
+                self.ask_errors.inc(bot=span.bot)
+        elif event == 'end' and span.phase == 'process_code':
+            self.process_code_latency.observe(span.duration, bot=span.bot)
+        elif event == 'end' and span.phase in self.RETRY_PHASES:
+            self.retries.inc(bot=span.bot, kind=span.phase)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+dependencies.register(Metrics, Metrics, Scope.SINGLETON)
@@ -0,0 +1,211 @@
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+DEFAULT_PAYLOAD = json.dumps({
+    "docstrings": {
+        "MyClass": {
+            "docstring": "A class used for load testing.",
+            "example": "instance = MyClass()\nprint(instance)",
+            "methods": {
+                "my_method": "Does nothing in particular."
+            }
+        },
+        "global_functions": {}
+    }
+}, indent=4)
+
+class MockLLMSettings:
+    """Behaviour of the mock server: payload, streaming speed and injected failures."""
+
+    def __init__(self, payload: str = DEFAULT_PAYLOAD, token_rate: float = 0, time_to_first_token: float = 0,
+                 rate_limit_rate: float = 0, server_error_rate: float = 0, chars_per_token: int = 4, seed: int | None = None):
+        self.payload = payload
+        self.token_rate = token_rate
+        self.time_to_first_token = time_to_first_token
+        self.rate_limit_rate = rate_limit_rate
+        self.server_error_rate = server_error_rate
+        self.chars_per_token = chars_per_token
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def tokens(self) -> list[str]:
+        return [self.payload[i:i + self.chars_per_token] for i in range(0, len(self.payload), self.chars_per_token)]
+
+    def injected_error(self) -> int | None:
+        with self.lock:
+            roll = self.random.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.server_error_rate:
+            return 500
+        return None
+
+class MockLLMRequestHandler(BaseHTTPRequestHandler):
+    """
+    Emulates the OpenAI chat-completions SSE stream (/v1/chat/completions) and the
+    Anthropic text-completions event stream (/v1/complete).
+    """
+    protocol_version = 'HTTP/1.1'
+    server: 'MockLLMServer'
+
+    def log_message(self, format: str, *args: Any):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            body: dict[str, Any] = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            return self._send_json(400, {'error': {'type': 'invalid_request_error', 'message': 'Invalid JSON body'}})
+
+        self.server.record_request(body)
+        error_status = self.server.settings.injected_error()
+        if error_status:
+            error_type = 'rate_limit_error' if error_status == 429 else 'api_error'
+            return self._send_json(error_status, {'error': {'type': error_type, 'message': f'Injected {error_status}'}})
+
+        path = self.path.split('?')[0].rstrip('/')
+        if path.endswith('/chat/completions'):
+            self._openai_completion(body)
+        elif path.endswith('/complete'):
+            self._anthropic_completion(body)
+        else:
+            self._send_json(404, {'error': {'type': 'not_found_error', 'message': f'Unknown path {self.path}'}})
+
+    def _send_json(self, status: int, data: dict[str, Any]):
+        content = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _start_stream(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+    def _stream_tokens(self, write_token: Any, prefill: str = ''):
+        settings = self.server.settings
+        time.sleep(settings.time_to_first_token)
+        delay = 1 / settings.token_rate if settings.token_rate else 0
+        tokens = settings.tokens()
+        # Like the real API, a prefilled answer is continued rather than repeated
+        if prefill.strip() and settings.payload.startswith(prefill.strip()):
+            tokens = MockLLMSettings(settings.payload[len(prefill.strip()):], chars_per_token=settings.chars_per_token).tokens()
+        for index, token in enumerate(tokens):
+            if index and delay:
+                time.sleep(delay)
+            write_token(token)
+            self.wfile.flush()
+
+    def _openai_completion(self, body: dict[str, Any]):
+        completion_id = f'chatcmpl-{uuid.uuid4().hex}'
+        created = int(time.time())
+        model = body.get('model', '')
+
+        def chunk(delta: dict[str, str], finish_reason: str | None) -> dict[str, Any]:
+            return {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': model,
+                    'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]}
+
+        if not body.get('stream'):
+            time.sleep(self.server.settings.time_to_first_token)
+            return self._send_json(200, {
+                'id': completion_id, 'object': 'chat.completion', 'created': created, 'model': model,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': self.server.settings.payload}, 'finish_reason': 'stop'}],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': len(self.server.settings.tokens()), 'total_tokens': len(self.server.settings.tokens())}
+            })
+
+        self._start_stream()
+        self.wfile.write(f"data: {json.dumps(chunk({'role': 'assistant', 'content': ''}, None))}\n\n".encode('utf-8'))
+        self._stream_tokens(lambda token: self.wfile.write(f"data: {json.dumps(chunk({'content': token}, None))}\n\n".encode('utf-8')))
+        self.wfile.write(f"data: {json.dumps(chunk({}, 'stop'))}\n\n".encode('utf-8'))
+        self.wfile.write(b'data: [DONE]\n\n')
+        self.wfile.flush()
+
+    def _anthropic_completion(self, body: dict[str, Any]):
+        model = body.get('model', '')
+
+        def event(completion: str, stop_reason: str | None) -> bytes:
+            data = {'type': 'completion', 'completion': completion, 'stop_reason': stop_reason, 'model': model}
+            return f'event: completion\ndata: {json.dumps(data)}\n\n'.encode('utf-8')
+
+        if not body.get('stream'):
+            time.sleep(self.server.settings.time_to_first_token)
+            return self._send_json(200, {'type': 'completion', 'completion': self.server.settings.payload, 'stop_reason': 'stop_sequence', 'model': model})
+
+        self._start_stream()
+        self._stream_tokens(lambda token: self.wfile.write(event(token, None)), prefill=body.get('prompt', '').rsplit('Assistant:', 1)[-1])
+        self.wfile.write(event('', 'stop_sequence'))
+        self.wfile.flush()
+
+class MockLLMServer(ThreadingHTTPServer):
+    """Local stand-in for the OpenAI and Anthropic APIs used for offline load testing."""
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, settings: MockLLMSettings | None = None):
+        super().__init__((host, port), MockLLMRequestHandler)
+        self.settings = settings or MockLLMSettings()
+        self.request_count = 0
+        self.last_request: dict[str, Any] = {}
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def record_request(self, body: dict[str, Any]):
+        """Counts a request; handlers run on their own threads."""
+        with self._lock:
+            self.request_count += 1
+            self.last_request = body
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'MockLLMServer':
+        """Serves requests on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name='MockLLMServer', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock OpenAI/Anthropic streaming server for load testing')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--payload', type=str, help='File whose content is streamed back as the completion')
+    parser.add_argument('--token_rate', type=float, default=50, help='Tokens per second (0 for no delay)')
+    parser.add_argument('--time_to_first_token', type=float, default=0.5, help='Seconds before the first token')
+    parser.add_argument('--rate_limit_rate', type=float, default=0, help='Fraction of requests answered with 429')
+    parser.add_argument('--server_error_rate', type=float, default=0, help='Fraction of requests answered with 500')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    payload = Path(args.payload).read_text() if args.payload else DEFAULT_PAYLOAD
+    settings = MockLLMSettings(payload, args.token_rate, args.time_to_first_token, args.rate_limit_rate, args.server_error_rate, seed=args.seed)
+    server = MockLLMServer(args.host, args.port, settings)
+    print(f'Mock LLM server listening on {server.base_url} (set openai_base_url to {server.base_url}/v1 and anthropic_base_url to {server.base_url})')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Optional
 import json
 import os
 import time
@@ -15,6 +15,10 @@ from DocStringGenerator.ResultThread import ResultThread
 from DocStringGenerator.BaseBotCommunicator import BaseBotCommunicator
 from openai.types.chat import ChatCompletionSystemMessageParam, ChatCompletionUserMessageParam, ChatCompletionAssistantMessageParam
 from DocStringGenerator.Logger import Logger
+from DocStringGenerator import ResponseSchema
+
+# JSON mode is rejected unless the conversation mentions JSON, so structured requests use this system message
+JSON_SYSTEM_MESSAGE = 'You are a helpful assistant. Always answer with a single JSON object.'
 class ChunkData:
     def __init__(self, bot_name: str, chunk: str):
         self.logger : Logger = dependencies.resolve(Logger)        
@@ -28,12 +32,24 @@ class OpenAICommunicator(BaseBotCommunicator):
         super().__init__()
         api_key = self.config.get('OPENAI_API_KEY', '')
         if api_key:
-            self.client = OpenAI(api_key=api_key)
-        self.messages = []
-        self.messages.append(ChatCompletionSystemMessageParam({'role': 'system', 'content': 'You are a helpful assistant.'}))
+            self.client = OpenAI(api_key=api_key, base_url=self.config.get('openai_base_url') or None)
+
+    @property
+    def messages(self) -> list[Any]:
+        return self.conversation(lambda: [ChatCompletionSystemMessageParam({'role': 'system', 'content': 'You are a helpful assistant.'})])
+
 
+    def response_format(self, replacements: dict[str, str]) -> dict[str, Any] | None:
+        """Returns the response_format requesting JSON output, or None when structured output is disabled."""
+        if not self.config.get('structured_output', True):
+            return None
+        if self.config.get('openai_json_schema', False):
+            mode = 'ask_missing' if replacements.get('ask_missing') == 'True' else 'example_only' if replacements.get('example_retry') == 'True' else 'full'
+            schema = ResponseSchema.to_json_schema(ResponseSchema.SCHEMAS[mode])
+            return {'type': 'json_schema', 'json_schema': {'name': 'docstrings_response', 'schema': schema, 'strict': False}}
+        return {'type': 'json_object'}
 
-    def ask(self, prompt, replacements) -> APIResponse:
+    def ask(self, prompt, replacements, keep_history: bool = True) -> APIResponse:
         prompt_response = self.format_prompt(prompt, replacements)
         if not prompt_response.is_valid:
             return prompt_response
@@ -42,16 +58,23 @@ class OpenAICommunicator(BaseBotCommunicator):
             new_prompt= prompt_response.content
             self.logger.log_line("sending prompt: " + new_prompt) 
 
-            self.messages.append(ChatCompletionUserMessageParam(content=new_prompt,role='user'))
+            # Without history only the system message and this prompt are sent, and nothing is recorded
+            messages = self.messages if keep_history else self.messages[:1]
+            messages.append(ChatCompletionUserMessageParam(content=new_prompt,role='user'))
             model = self.config.get('model', '')
             models = BOTS[self.config.get('bot', '')]
             if model not in models:
                 self.logger.log_line(f'Invalid bot: {model}')
                 return APIResponse('', False, 'Invalid bot')
             
-            stream = self.client.chat.completions.create(model=model, messages=self.messages, temperature=0, stream=True)
+            response_format = self.response_format(replacements)
+            if response_format:
+                request_messages = [ChatCompletionSystemMessageParam({'role': 'system', 'content': JSON_SYSTEM_MESSAGE}), *messages[1:]]
+                stream = self.client.chat.completions.create(model=model, messages=request_messages, temperature=0, stream=True, response_format=response_format)
+            else:
+                stream = self.client.chat.completions.create(model=model, messages=messages, temperature=0, stream=True)
             response = self.handle_response(stream)
-            if response.is_valid:
+            if response.is_valid and keep_history:
                 self.messages.append(ChatCompletionAssistantMessageParam(content=response.content,role='assistant'))
             return response
         except Exception as e:
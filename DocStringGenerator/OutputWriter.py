@@ -0,0 +1,132 @@
+import os
+import queue
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+from DocStringGenerator.DependencyContainer import DependencyContainer, Scope
+dependencies = DependencyContainer()
+from DocStringGenerator.GlobalConfig import GlobalConfig
+global_config = dependencies.resolve(GlobalConfig)
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.Utility import APIResponse
+
+class OutputWriter:
+    """
+    Writes processed files through a temporary file and an atomic rename, so an interrupted run never
+    leaves a truncated file. Files go next to the source in a folder named after the bot (the default),
+    back over the source with in_place, or into a mirror of the source tree under output_path.
+    Inside background() writes are queued to one writer thread so bot workers never wait on the disk.
+    """
+
+    def __init__(self):
+        self.config: dict[str, Any] = ConfigManager().config
+        self.errors: list[tuple[Path, str]] = []
+        self._created_folders: set[Path] = set()
+        self._queue: queue.Queue[tuple[Path, str, Callable[[Path], None] | None] | None] | None = None
+        self._thread: threading.Thread | None = None
+
+    def target_path(self, file_path: Path) -> Path:
+        """Returns where the processed version of file_path is written."""
+        file_path = Path(file_path).absolute()
+        if self.config.get('in_place', False):
+            return file_path
+        output_path = self.config.get('output_path', '')
+        if output_path:
+            source_root = Path(self.config.get('path', '') or file_path.parent).absolute()
+            if source_root.is_file():
+                source_root = source_root.parent
+            try:
+                return Path(output_path, file_path.relative_to(source_root))
+            except ValueError:
+                return Path(output_path, file_path.name)
+        return Path(file_path.parent, self.config.get('bot', ''), file_path.name)
+
+    def write(self, file_path: Path, content: str, on_written: Callable[[Path], None] | None = None) -> Path:
+        """Writes content for file_path, or queues it inside background(); on_written gets the target once it is on disk."""
+        target = self.target_path(file_path)
+        if self._queue is not None:
+            self._queue.put((target, content, on_written))
+        else:
+            self._write_and_notify(target, content, on_written)
+        return target
+
+    def _write_and_notify(self, target: Path, content: str, on_written: Callable[[Path], None] | None):
+        response = self.write_atomic(target, content)
+        if not response.is_valid:
+            self.errors.append((target, response.error_message))
+        elif on_written:
+            on_written(target)
+
+    def write_atomic(self, target: Path, content: str) -> APIResponse:
+        """
+        Writes a temporary file in the target folder and renames it over target, keeping the mode of an
+        existing target and giving a new one the mode open() would. The temporary file never outlives a failed write.
+        """
+        folder = target.parent
+        temp_name = ''
+        try:
+            if folder not in self._created_folders:
+                folder.mkdir(parents=True, exist_ok=True)
+                self._created_folders.add(folder)
+            name = str(Path(folder, f'.{target.name}.{uuid.uuid4().hex[:8]}.tmp'))
+            # Created like open() does, so the umask applies; tempfile would make it owner-only
+            flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
+            try:
+                descriptor = os.open(name, flags, 0o666)
+            except FileNotFoundError:
+                # The folder was removed since it was created
+                folder.mkdir(parents=True, exist_ok=True)
+                descriptor = os.open(name, flags, 0o666)
+            temp_name = name
+            with open(descriptor, 'w', encoding='utf-8', newline='') as temp_file:
+                temp_file.write(content)
+            if target.exists():
+                os.chmod(temp_name, target.stat().st_mode & 0o7777)
+            os.replace(temp_name, target)
+            temp_name = ''
+            return APIResponse(str(target), True)
+        except (OSError, UnicodeError) as e:
+            return APIResponse('', False, f"Failed to write {target}: {e}")
+        finally:
+            if temp_name and os.path.exists(temp_name):
+                os.remove(temp_name)
+
+    @contextmanager
+    def background(self) -> Iterator['OutputWriter']:
+        """Runs writes on a background thread until the block ends, then waits for the queued writes."""
+        if self._queue is not None or not self.config.get('background_writes', True):
+            yield self
+            return
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, args=(self._queue,), name='output-writer', daemon=True)
+        self._thread.start()
+        try:
+            yield self
+        finally:
+            work_queue, self._queue = self._queue, None
+            work_queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, work_queue: 'queue.Queue[tuple[Path, str, Callable[[Path], None] | None] | None]'):
+        while True:
+            item = work_queue.get()
+            if item is None:
+                return
+            target, content, on_written = item
+            try:
+                self._write_and_notify(target, content, on_written)
+            except Exception as e:
+                self.errors.append((target, str(e)))
+
+    def take_errors(self) -> list[tuple[Path, str]]:
+        """Returns and clears the writes that failed so far."""
+        errors, self.errors = self.errors, []
+        return errors
+
+if global_config.mode == "web":
+    dependencies.register(OutputWriter, OutputWriter, Scope.SCOPED)
+else:
+    dependencies.register(OutputWriter, OutputWriter, Scope.SINGLETON)
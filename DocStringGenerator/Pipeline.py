@@ -0,0 +1,163 @@
+import threading
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any, Callable, ContextManager, Generic, Iterable, TypeVar
+
+T = TypeVar('T')
+
+class StageQueue(Generic[T]):
+    """
+    Queue in front of a stage. put() blocks while maxsize items are waiting, which holds back the
+    stages feeding it; put_feedback() never blocks, so a later stage sending an item back (a retry)
+    cannot deadlock against an earlier stage waiting for it. get() returns None once closed and empty.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self.maxsize = maxsize
+        self._items: deque[T] = deque()
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: T):
+        with self._condition:
+            while self.maxsize and len(self._items) >= self.maxsize and not self._closed:
+                self._condition.wait()
+            self._items.append(item)
+            self._condition.notify_all()
+
+    def put_feedback(self, item: T):
+        with self._condition:
+            self._items.append(item)
+            self._condition.notify_all()
+
+    def get(self) -> T | None:
+        with self._condition:
+            while not self._items and not self._closed:
+                self._condition.wait()
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._condition.notify_all()
+            return item
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+@dataclass
+class Stage(Generic[T]):
+    """
+    A step of a pipeline: process is called with each item and returns the name of the stage the
+    item goes to next, or None when the item is finished. workers threads run the stage.
+    """
+    name: str
+    process: Callable[[T], str | None]
+    workers: int = 1
+
+class Pipeline(Generic[T]):
+    """
+    Runs items through named stages connected by bounded queues, each stage on its own worker
+    threads, so the stages waiting on the network and those using the CPU work on different items at
+    the same time. An item may be sent back to an earlier stage; the run ends once the source is
+    exhausted and every item is finished. When a stage raises, no further items are taken from the
+    source, the items already in the pipeline are finished and run() raises the exception.
+    """
+
+    def __init__(self, stages: list[Stage[T]], queue_size: int = 8, item_context: Callable[[T], ContextManager[Any]] | None = None,
+                 on_finish: Callable[[T], None] | None = None):
+        self.stages = stages
+        self.queue_size = queue_size
+        # Entered around every stage call and on_finish, e.g. to tag log records with the item
+        self.item_context = item_context or (lambda item: nullcontext())
+        self.on_finish = on_finish
+        self._order = {stage.name: index for index, stage in enumerate(stages)}
+        self._queues: dict[str, StageQueue[T]] = {}
+        self._active = 0
+        self._source_done = False
+        self._lock = threading.Lock()
+        self.finished: list[T] = []
+        self._failure: BaseException | None = None
+
+    def run(self, source: Iterable[T], first_stage: str | None = None) -> list[T]:
+        """Feeds every item of source to first_stage (the first stage by default) and returns the finished items."""
+        first_stage = first_stage or self.stages[0].name
+        self._queues = {stage.name: StageQueue(self.queue_size) for stage in self.stages}
+        self._active, self._source_done = 0, False
+        self.finished, self._failure = [], None
+        threads = [threading.Thread(target=self._work, args=(stage,), name=f'pipeline-{stage.name}-{index}', daemon=True)
+                   for stage in self.stages for index in range(max(stage.workers, 1))]
+        for thread in threads:
+            thread.start()
+        try:
+            for item in source:
+                with self._lock:
+                    if self._failure is not None:
+                        break
+                    self._active += 1
+                self._queues[first_stage].put(item)
+        finally:
+            with self._lock:
+                self._source_done = True
+                done = self._active == 0
+            if done:
+                self._close()
+            for thread in threads:
+                thread.join()
+        if self._failure is not None:
+            raise self._failure
+        return self.finished
+
+    def _work(self, stage: Stage[T]):
+        queue = self._queues[stage.name]
+        while True:
+            item = queue.get()
+            if item is None:
+                return
+            try:
+                with self.item_context(item):
+                    next_stage = stage.process(item)
+            except BaseException as e:
+                with self._lock:
+                    self._failure = self._failure or e
+                self._finish(item, failed=True)
+                continue
+            if next_stage is None:
+                self._finish(item)
+            elif self._order[next_stage] <= self._order[stage.name]:
+                self._queues[next_stage].put_feedback(item)
+            else:
+                self._queues[next_stage].put(item)
+
+    def _finish(self, item: T, failed: bool = False):
+        if self.on_finish and not failed:
+            with self.item_context(item):
+                self.on_finish(item)
+        with self._lock:
+            if not failed:
+                self.finished.append(item)
+            self._active -= 1
+            done = self._source_done and self._active == 0
+        if done:
+            self._close()
+
+    def _close(self):
+        for queue in self._queues.values():
+            queue.close()
+
+    def run_inline(self, item: T, first_stage: str | None = None, stop_before: str | None = None) -> T:
+        """Takes one item through the stages on the calling thread, stopping when it is routed to stop_before."""
+        stages = {stage.name: stage for stage in self.stages}
+        next_stage: str | None = first_stage or self.stages[0].name
+        while next_stage is not None and next_stage != stop_before:
+            stage = stages[next_stage]
+            with self.item_context(item):
+                next_stage = stage.process(item)
+        if self.on_finish:
+            with self.item_context(item):
+                self.on_finish(item)
+        return item
@@ -0,0 +1,106 @@
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+from DocStringGenerator.DependencyContainer import DependencyContainer, Scope
+dependencies = DependencyContainer()
+from DocStringGenerator.GlobalConfig import GlobalConfig
+global_config = dependencies.resolve(GlobalConfig)
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.DocstringModel import DocstringSet
+from DocStringGenerator.Instrumentation import instrumented
+from DocStringGenerator.Logger import Logger, WARNING
+from DocStringGenerator.Utility import APIResponse
+
+# Below this many characters the round trip to a worker costs more than the work it moves
+MIN_SIZE_FOR_POOL = 20_000
+
+def _initialize_worker(config: dict[str, Any]):
+    worker_config = ConfigManager().config
+    worker_config.update(config)
+    # Workers never talk to the bot, and their log lines would interleave with the main process
+    worker_config.pop('bot', None)
+    worker_config['verbose'] = False
+
+def _extract_docstrings(responses: list[dict[str, Any]] | str) -> APIResponse:
+    from DocStringGenerator.DocstringProcessor import DocstringProcessor
+    return DocstringProcessor().extract_docstrings(responses)
+
+def _post_process(source_code: str, docstrings_json: str) -> dict[str, Any]:
+    from DocStringGenerator.CodeProcessor import CodeProcessor
+    return CodeProcessor().post_process(source_code, DocstringSet.from_dict(json.loads(docstrings_json)))
+
+class PostProcessPool:
+    """
+    Runs the CPU-bound handling of a response (extracting the docstrings, inserting them and the
+    examples, verifying the result) in worker processes, so the threads waiting on the bot are not
+    serialized on the GIL. Only source text and response JSON cross the process boundary. Calls
+    block the calling thread; without a running pool, or for small inputs, they run in that thread.
+    """
+
+    def __init__(self):
+        self.config: dict[str, Any] = ConfigManager().config
+        self.logger: Logger = dependencies.resolve(Logger)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self) -> int:
+        return int(self.config.get('post_process_workers', 0) or 0)
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    @contextmanager
+    def session(self) -> Iterator['PostProcessPool']:
+        """Starts post_process_workers worker processes for the duration of a run; with fewer than two the work stays in process."""
+        if self.running or self.workers < 2:
+            yield self
+            return
+        config = {key: value for key, value in self.config.items() if isinstance(value, (str, int, float, bool, list, dict, type(None)))}
+        # Spawned workers do not inherit the locks held by the logger and writer threads of this process
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=_initialize_worker, initargs=(config,))
+        try:
+            yield self
+        finally:
+            with self._lock:
+                executor, self._executor = self._executor, None
+            executor.shutdown()
+
+    def _run(self, size: int, function: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            executor = self._executor if size >= MIN_SIZE_FOR_POOL else None
+        if executor is None:
+            return function(*args)
+        try:
+            return executor.submit(function, *args).result()
+        except BrokenProcessPool as e:
+            self.logger.log_line(f"Post-processing worker failed ({e}); continuing in process.", WARNING)
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False)
+            return function(*args)
+
+    def extract_docstrings(self, responses: list[dict[str, Any]] | str) -> APIResponse:
+        """DocstringProcessor.extract_docstrings for the responses of every part, run in a worker."""
+        size = len(responses) if isinstance(responses, str) else sum(len(str(response.get('content', ''))) for response in responses)
+        return self._run(size, _extract_docstrings, responses)
+
+    @instrumented('post_process')
+    def post_process(self, source_code: str, docstrings: DocstringSet) -> dict[str, Any]:
+        """CodeProcessor.post_process run in a worker; the docstrings travel as JSON."""
+        if self._executor is None or len(source_code) < MIN_SIZE_FOR_POOL:
+            from DocStringGenerator.CodeProcessor import CodeProcessor
+            return CodeProcessor().post_process(source_code, docstrings)
+        return self._run(len(source_code), _post_process, source_code, json.dumps(docstrings.to_dict()))
+
+if global_config.mode == "web":
+    dependencies.register(PostProcessPool, PostProcessPool, Scope.SCOPED)
+else:
+    dependencies.register(PostProcessPool, PostProcessPool, Scope.SINGLETON)
@@ -0,0 +1,172 @@
+import atexit
+import gzip
+import hashlib
+import json
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Iterator
+
+DEFAULT_ARCHIVE_PATH = 'responses/archive'
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+INDEX_NAME = 'index.jsonl'
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+
+class ResponseArchive:
+    """
+    Append-only archive of every prompt sent to a bot and the response it gave. Records are written
+    as gzip-compressed JSONL segments, flushed after each record so an interrupted run keeps all but
+    the record being written. Each session writes new segments of up to segment_bytes compressed bytes.
+    A plain JSONL index locates each record by file, bot, model and prompt hash, so a run can be
+    replayed (see FileCommunicator) or audited without decompressing every segment.
+    """
+    _shared: dict[Path, 'ResponseArchive'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str | Path, segment_bytes: int = DEFAULT_SEGMENT_BYTES):
+        self.path = Path(path)
+        self.segment_bytes = segment_bytes
+        self._index: list[dict[str, Any]] | None = None
+        self._by_prompt: dict[str, list[dict[str, Any]]] = {}
+        self._segment: gzip.GzipFile | None = None
+        self._segment_name = ''
+        self._segment_records = 0
+        self._index_file = None
+        self._cached_segment: tuple[str, list[str]] = ('', [])
+        self._lock = threading.RLock()
+        atexit.register(self.close)
+
+    @classmethod
+    def shared(cls, path: str | Path, segment_bytes: int = DEFAULT_SEGMENT_BYTES) -> 'ResponseArchive':
+        """Returns the one archive of this process for path, so recording and replay see the same index."""
+        key = Path(path).absolute()
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(key, segment_bytes)
+            return cls._shared[key]
+
+    @classmethod
+    def close_all(cls):
+        with cls._shared_lock:
+            for archive in cls._shared.values():
+                archive.close()
+
+    @property
+    def index(self) -> list[dict[str, Any]]:
+        with self._lock:
+            if self._index is None:
+                self._load_index()
+            return self._index
+
+    def _load_index(self):
+        self._index, self._by_prompt = [], {}
+        index_path = self.path / INDEX_NAME
+        if not index_path.exists():
+            return
+        with open(index_path, 'r', encoding='utf-8') as index_file:
+            for line in index_file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line of an interrupted run may be cut short
+                    continue
+                self._add_entry(entry)
+
+    def _add_entry(self, entry: dict[str, Any]):
+        self._index.append(entry)
+        self._by_prompt.setdefault(entry['prompt_hash'], []).append(entry)
+
+    def record(self, prompt: str, response: str, is_valid: bool = True, error: str = '',
+               file: str = '', bot: str = '', model: str = '', job: str = '') -> dict[str, Any]:
+        """Appends one request/response pair and returns its index entry."""
+        record = {'time': time.time(), 'file': file, 'bot': bot, 'model': model, 'job': job,
+                  'prompt': prompt, 'response': response, 'is_valid': is_valid, 'error': error}
+        line = (json.dumps(record) + '\n').encode('utf-8', 'surrogatepass')
+        with self._lock:
+            if self._index is None:
+                self._load_index()
+            self._open_segment()
+            self._segment.write(line)
+            # A sync flush makes everything written so far readable even if the run stops here
+            self._segment.flush()
+            entry = {'file': file, 'bot': bot, 'model': model, 'prompt_hash': hash_text(prompt),
+                     'response_hash': hash_text(response), 'is_valid': is_valid,
+                     'segment': self._segment_name, 'record': self._segment_records}
+            self._segment_records += 1
+            self._index_file.write(json.dumps(entry) + '\n')
+            self._index_file.flush()
+            self._add_entry(entry)
+            if self._cached_segment[0] == self._segment_name:
+                self._cached_segment = ('', [])
+            return entry
+
+    def _open_segment(self):
+        if self._segment and self._segment.fileobj.tell() < self.segment_bytes:
+            return
+        if self._segment:
+            self._segment.close()
+            self._segment = None
+        if self._index_file is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._index_file = open(self.path / INDEX_NAME, 'a', encoding='utf-8')
+        # Every session starts its own segment, so a record cut short by an earlier run never shifts record numbers
+        numbers = [int(segment.name.split('-')[1].split('.')[0]) for segment in self.path.glob('responses-*.jsonl.gz')]
+        self._segment_name = self._segment_file_name(max(numbers, default=0) + 1)
+        self._segment_records = 0
+        self._segment = gzip.GzipFile(self.path / self._segment_name, 'wb')
+
+    @staticmethod
+    def _segment_file_name(number: int) -> str:
+        return f'responses-{number:06d}.jsonl.gz'
+
+    def close(self):
+        with self._lock:
+            if self._segment:
+                self._segment.close()
+                self._segment = None
+            if self._index_file:
+                self._index_file.close()
+                self._index_file = None
+
+    def find(self, file: str | None = None, bot: str | None = None, model: str | None = None,
+             prompt_hash: str | None = None) -> list[dict[str, Any]]:
+        """Returns the index entries matching every given field, oldest first."""
+        entries = self.index
+        if prompt_hash is not None:
+            entries = self._by_prompt.get(prompt_hash, [])
+        return [entry for entry in entries
+                if (file is None or entry['file'] == file) and (bot is None or entry['bot'] == bot)
+                and (model is None or entry['model'] == model)]
+
+    def load(self, entry: dict[str, Any]) -> dict[str, Any]:
+        """Reads the full record of an index entry."""
+        with self._lock:
+            if self._cached_segment[0] != entry['segment']:
+                self._cached_segment = (entry['segment'], list(self._read_segment(self.path / entry['segment'])))
+            return json.loads(self._cached_segment[1][entry['record']])
+
+    @staticmethod
+    def _read_segment(segment_path: Path) -> Iterator[str]:
+        with gzip.open(segment_path, 'rt', encoding='utf-8', errors='surrogatepass') as segment:
+            try:
+                for line in segment:
+                    if line.endswith('\n'):
+                        yield line
+            except (EOFError, gzip.BadGzipFile, zlib.error):
+                # A segment still being written, or cut short by an interrupted run
+                return
+
+    def records(self, **fields: str) -> Iterator[dict[str, Any]]:
+        """Yields the full records matching the given index fields, oldest first."""
+        for entry in self.find(**fields):
+            yield self.load(entry)
+
+    def replay(self, prompt: str, bot: str | None = None, model: str | None = None) -> dict[str, Any] | None:
+        """Returns the latest successful record for exactly this prompt, optionally from one bot and model."""
+        for entry in reversed(self.find(bot=bot, model=model, prompt_hash=hash_text(prompt))):
+            if entry['is_valid']:
+                return self.load(entry)
+        return None
@@ -0,0 +1,63 @@
+import threading
+from typing import Any
+
+class ResponseMerger:
+    """
+    Merges part responses into one accumulated response in place, recording the paths that two parts
+    set to different values (the later part wins). Parts may arrive in any order from concurrent
+    requests; those given a part_index are merged in part order, so the result does not depend on timing.
+    The parts passed in are never modified, but the result shares the dicts no other part merged into.
+    """
+
+    def __init__(self):
+        # Ids of the dicts the merger created; the dicts are kept alive so their ids cannot be reused
+        self._owned: set[int] = set()
+        self._owned_dicts: list[dict[str, Any]] = []
+        self.merged: dict[str, Any] = self._own({})
+        self.conflicts: list[str] = []
+        self._pending: dict[int, dict[str, Any]] = {}
+        self._next_index = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending_count(self) -> int:
+        """Parts received but waiting for an earlier part."""
+        return len(self._pending)
+
+    def add(self, json_object: dict[str, Any], part_index: int | None = None):
+        """Merges json_object now, or once every part before part_index has been merged."""
+        with self._lock:
+            if part_index is None:
+                self._merge_into(self.merged, json_object, '')
+                return
+            self._pending[part_index] = json_object
+            while self._next_index in self._pending:
+                self._merge_into(self.merged, self._pending.pop(self._next_index), '')
+                self._next_index += 1
+
+    def result(self) -> dict[str, Any]:
+        """Merges the parts still held back (skipping missing ones) and returns the merged response."""
+        with self._lock:
+            for part_index in sorted(self._pending):
+                self._merge_into(self.merged, self._pending.pop(part_index), '')
+                self._next_index = part_index + 1
+            return self.merged
+
+    def _merge_into(self, target: dict[str, Any], source: dict[str, Any], path: str):
+        for key, value in source.items():
+            key_path = f'{path}.{key}' if path else str(key)
+            existing = target.get(key)
+            if isinstance(value, dict) and isinstance(existing, dict):
+                # Dicts taken from a part are shared until another part merges into them, then copied once
+                if id(existing) not in self._owned:
+                    existing = target[key] = self._own(dict(existing))
+                self._merge_into(existing, value, key_path)
+                continue
+            if key in target and existing != value:
+                self.conflicts.append(key_path)
+            target[key] = value
+
+    def _own(self, value: dict[str, Any]) -> dict[str, Any]:
+        self._owned.add(id(value))
+        self._owned_dicts.append(value)
+        return value
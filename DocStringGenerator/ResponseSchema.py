@@ -0,0 +1,116 @@
+import functools
+from typing import Any, Callable
+
+# (value, key, parent_key, errors) -> None; appends a message to errors for every violation found
+Validator = Callable[[Any, str, str, list[str]], None]
+
+TYPES: dict[str, type] = {'object': dict, 'string': str}
+
+FUNCTION_DOCSTRING: dict[str, Any] = {
+    'type': 'string',
+    'message': "Method '{key}' docstring should be a string.",
+    'line_message': "Docstring line in '{key}' exceeds maximum length of {max_length} characters."
+}
+
+def _class_schema(docstring_required: bool) -> dict[str, Any]:
+    return {
+        'type': 'object',
+        'message': "Invalid format: Class '{key}' should contain a 'docstring'.",
+        'required': ['docstring'] if docstring_required else [],
+        'properties': {
+            'docstring': {
+                'type': 'string',
+                'message': "Invalid format: Docstring of class '{parent}' should be a string.",
+                'line_message': "Docstring line in '{parent}' exceeds maximum length of {max_length} characters."
+            },
+            'methods': {
+                'type': 'object',
+                'message': "Invalid format: Methods under class '{parent}' should be a dictionary.",
+                'additionalProperties': FUNCTION_DOCSTRING
+            },
+            'example': {'type': 'string', 'message': "Invalid format: Example of class '{parent}' should be a string."}
+        }
+    }
+
+def _response_schema(classes: dict[str, Any] | None) -> dict[str, Any]:
+    docstrings: dict[str, Any] = {'type': 'object', 'message': "Invalid format: 'docstrings' should be a dictionary."}
+    if classes:
+        docstrings['properties'] = {
+            'global_functions': {
+                'type': 'object',
+                'message': "Invalid format: Global functions under '{key}' should be a dictionary.",
+                'additionalProperties': FUNCTION_DOCSTRING
+            }
+        }
+        docstrings['additionalProperties'] = classes
+    return {
+        'type': 'object',
+        'message': "Invalid format: The response should be a JSON object.",
+        'properties': {
+            'docstrings': docstrings,
+            'examples': {'type': 'object', 'message': "Invalid format: 'examples' should be a dictionary."}
+        }
+    }
+
+# Full responses need a docstring per class, example retries only need the structure, and answers
+# to ask_missing_docstrings may document methods without repeating the class docstring.
+SCHEMAS: dict[str, dict[str, Any]] = {
+    'full': _response_schema(_class_schema(docstring_required=True)),
+    'example_only': _response_schema(None),
+    'ask_missing': _response_schema(_class_schema(docstring_required=False))
+}
+
+def _compile(schema: dict[str, Any], max_length: int) -> Validator:
+    expected_type = TYPES[schema['type']]
+    message: str = schema['message']
+    line_message: str = schema.get('line_message', '')
+    required: list[str] = schema.get('required', [])
+    properties = {name: _compile(child, max_length) for name, child in schema.get('properties', {}).items()}
+    additional = _compile(schema['additionalProperties'], max_length) if 'additionalProperties' in schema else None
+
+    def validate_string(value: Any, key: str, parent: str, errors: list[str]):
+        if not isinstance(value, str):
+            errors.append(message.format(key=key, parent=parent))
+        # A string no longer than the limit cannot contain a line that is, so most docstrings are never split
+        elif line_message and len(value) > max_length and any(len(line) > max_length for line in value.splitlines()):
+            errors.append(line_message.format(key=key, parent=parent, max_length=max_length))
+
+    def validate_object(value: Any, key: str, parent: str, errors: list[str]):
+        if not isinstance(value, dict):
+            errors.append(message.format(key=key, parent=parent))
+            return
+        for name in required:
+            if name not in value:
+                errors.append(message.format(key=key, parent=parent))
+        for name, item in value.items():
+            validator = properties.get(name, additional)
+            if validator:
+                validator(item, name, key, errors)
+
+    return validate_string if expected_type is str else validate_object
+
+def to_json_schema(schema: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Converts a response schema (the full one by default) to JSON Schema for providers with structured output."""
+    schema = schema or SCHEMAS['full']
+    if schema['type'] == 'string':
+        return {'type': 'string'}
+    json_schema: dict[str, Any] = {
+        'type': 'object',
+        'properties': {name: to_json_schema(child) for name, child in schema.get('properties', {}).items()}
+    }
+    if schema.get('required'):
+        json_schema['required'] = list(schema['required'])
+    if 'additionalProperties' in schema:
+        json_schema['additionalProperties'] = to_json_schema(schema['additionalProperties'])
+    return json_schema
+
+@functools.lru_cache(maxsize=None)
+def compile_response_schema(mode: str = 'full', max_length: int = 999) -> Validator:
+    """Compiles the response schema for mode ('full', 'example_only' or 'ask_missing') once per line limit."""
+    return _compile(SCHEMAS[mode], max_length)
+
+def validate(json_object: Any, mode: str = 'full', max_length: int = 999) -> list[str]:
+    """Returns every schema violation of json_object, in document order."""
+    errors: list[str] = []
+    compile_response_schema(mode, max_length)(json_object, '', '', errors)
+    return errors
@@ -0,0 +1,154 @@
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+# 'walk' keeps the discovery order and streams files as they are found; the others sort the whole list first
+SCHEDULE_ORDERS = ('walk', 'recent', 'smallest', 'largest')
+
+def git_modified_times(folder: Path) -> dict[Path, float]:
+    """
+    Returns when each file under folder last changed according to git: the time of the last commit
+    touching it, or its file system time when it has uncommitted changes. Empty outside a git work tree.
+    """
+    def git(*args: str) -> str:
+        return subprocess.run(['git', '-c', 'core.quotepath=off', *args], cwd=folder, capture_output=True, text=True, check=True).stdout
+    try:
+        top = Path(git('rev-parse', '--show-toplevel').strip())
+        log = git('log', '--format=%x00%ct', '--name-only', '--no-renames', '--', '.')
+        status = git('status', '--porcelain', '--untracked-files=all', '--', '.')
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    times: dict[Path, float] = {}
+    commit_time = 0.0
+    # Commits are listed newest first, so the first time seen for a file is its latest
+    for line in log.splitlines():
+        if line.startswith('\0'):
+            commit_time = float(line[1:])
+        elif line:
+            times.setdefault(Path(top, line).resolve(), commit_time)
+    for line in status.splitlines():
+        path = Path(top, line[3:].split(' -> ')[-1]).resolve()
+        try:
+            times[path] = max(times.get(path, 0.0), path.stat().st_mtime)
+        except OSError:
+            pass
+    return times
+
+def read_priority_files(priority_files: list[str] | str, folder: Path) -> list[Path]:
+    """Resolves priority_files, a list of paths or the path of a file listing one per line, against folder and then the working directory."""
+    if isinstance(priority_files, str):
+        if not priority_files:
+            return []
+        priority_files = [line.strip() for line in Path(priority_files).read_text(encoding='utf-8').splitlines() if line.strip()]
+    resolved: list[Path] = []
+    for name in priority_files:
+        path = Path(folder, name)
+        resolved.append((path if path.exists() else Path(name)).resolve())
+    return resolved
+
+class Scheduler:
+    """
+    Decides the order files are handed to the pipeline and when to stop handing them out. Files
+    listed in priority_files come first, in the listed order, then the rest in the configured order.
+    Once time_budget seconds have passed or token_budget tokens have been used, no further files
+    are started: files already sent to the bot are finished and exhausted tells why the run stopped.
+    """
+
+    def __init__(self, order: str = 'walk', priority_files: list[str] | str = [], time_budget: float = 0, token_budget: int = 0,
+                 tokens_used: Callable[[], int] = lambda: 0):
+        if order not in SCHEDULE_ORDERS:
+            raise ValueError(f"Unknown schedule '{order}'; expected one of {', '.join(SCHEDULE_ORDERS)}.")
+        self.order = order
+        self.priority_files = priority_files
+        self.time_budget = time_budget
+        self.token_budget = token_budget
+        self.tokens_used = tokens_used
+        self.exhausted = ''
+        self.scheduled = 0
+        self.started = 0
+        self._start = time.monotonic()
+        self._in_flight = 0
+        self._reserved = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any], tokens_used: Callable[[], int] = lambda: 0) -> 'Scheduler':
+        return cls(config.get('schedule', 'walk') or 'walk', config.get('priority_files', []), config.get('time_budget', 0) or 0,
+                   config.get('token_budget', 0) or 0, tokens_used)
+
+    def schedule(self, files: Iterable[Path], folder: Path) -> Iterator[Path]:
+        """Yields files in scheduling order until they run out or a budget is used up."""
+        self._start = time.monotonic()
+        self.exhausted, self.scheduled, self.started = '', 0, 0
+        for file in self._ordered(files, folder):
+            self.exhausted = self.exhausted or self.check_budget()
+            if self.exhausted:
+                return
+            self.scheduled += 1
+            yield file
+
+    def admit(self, estimated_tokens: int = 0) -> bool:
+        """
+        Tells whether a scheduled file may be sent to the bot now, reserving its estimated_tokens until
+        release(). Scheduled files wait in the pipeline's queues and several requests run at once, so the
+        budgets are checked again when the request is due, and while other requests are in flight a file
+        only starts if its estimate fits in what is left of token_budget.
+        """
+        with self._lock:
+            if not self.exhausted:
+                self.exhausted = self.check_budget()
+            if not self.exhausted and self.token_budget and self._in_flight \
+                    and self.tokens_used() + self._reserved + estimated_tokens > self.token_budget:
+                self.exhausted = f'token budget of {self.token_budget} tokens used'
+            if self.exhausted:
+                return False
+            self._in_flight += 1
+            self._reserved += estimated_tokens
+            self.started += 1
+            return True
+
+    def release(self, estimated_tokens: int = 0):
+        """Drops the reservation of an admitted file once its request returned and its tokens are counted."""
+        with self._lock:
+            self._in_flight -= 1
+            self._reserved -= estimated_tokens
+
+    def check_budget(self) -> str:
+        """Returns why no more files should be started, or '' while the budgets allow it."""
+        if self.time_budget and time.monotonic() - self._start >= self.time_budget:
+            return f'time budget of {self.time_budget} s used'
+        if self.token_budget and self.tokens_used() >= self.token_budget:
+            return f'token budget of {self.token_budget} tokens used'
+        return ''
+
+    def _ordered(self, files: Iterable[Path], folder: Path) -> Iterable[Path]:
+        priority = {path: index for index, path in enumerate(read_priority_files(self.priority_files, folder))}
+        if self.order == 'walk' and not priority:
+            return files
+        files = list(files)
+        resolved = {file: file.resolve() for file in files}
+        if self.order == 'walk':
+            key: Callable[[Path], Any] = lambda file: 0
+        elif self.order == 'recent':
+            times = git_modified_times(folder)
+            key = lambda file: -times.get(resolved[file], _mtime(file))
+        else:
+            sizes = {file: _size(file) for file in files}
+            key = (lambda file: sizes[file]) if self.order == 'smallest' else (lambda file: -sizes[file])
+        # sorted is stable, so ties keep the discovery order
+        return sorted(files, key=lambda file: (priority.get(resolved[file], len(priority)), key(file)))
+
+def _mtime(file: Path) -> float:
+    try:
+        return os.stat(file).st_mtime
+    except OSError:
+        return 0.0
+
+def _size(file: Path) -> int:
+    try:
+        return os.stat(file).st_size
+    except OSError:
+        return 0
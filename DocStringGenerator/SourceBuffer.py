@@ -0,0 +1,39 @@
+import re
+from array import array
+
+_LINE_BREAK = re.compile(r'\r\n|\r|\n')
+
+class SourceBuffer:
+    """
+    Read-only source text with an index of the offset where each line starts, kept in an array
+    rather than a list of line strings, so lines and parts are sliced straight from the text.
+    Lines are 0-based when indexing the buffer and 1-based in line(), as in ast.
+    """
+
+    def __init__(self, text: str):
+        self._text = text
+        self.line_offsets = array('q', [0])
+        self.line_offsets.extend(match.end() for match in _LINE_BREAK.finditer(text))
+
+    def __len__(self) -> int:
+        return len(self.line_offsets)
+
+    def __getitem__(self, index: int) -> str:
+        """Returns the text of a 0-based line without its line break."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('line index out of range')
+        return self.lines(index, index + 1).rstrip('\r\n')
+
+    def line(self, line_number: int) -> str:
+        """Returns the text of a 1-based line without its line break."""
+        return self[line_number - 1]
+
+    def lines(self, start: int, end: int) -> str:
+        """Returns 0-based lines start to end (exclusive) with their line breaks."""
+        end = min(end, len(self))
+        if start >= end:
+            return ''
+        end_offset = self.line_offsets[end] if end < len(self) else len(self._text)
+        return self._text[self.line_offsets[start]:end_offset]
@@ -0,0 +1,111 @@
+import difflib
+from dataclasses import dataclass
+from DocStringGenerator.SourceBuffer import SourceBuffer
+from DocStringGenerator.Utility import APIResponse
+
+@dataclass(frozen=True)
+class Edit:
+    """Replaces the text between two (line, column) positions; lines are 1-based, columns 0-based characters."""
+    start_line: int
+    start_col: int
+    end_line: int
+    end_col: int
+    text: str = ''
+
+    @property
+    def kind(self) -> str:
+        if (self.start_line, self.start_col) == (self.end_line, self.end_col):
+            return 'insert'
+        return 'replace' if self.text else 'delete'
+
+class SourcePatcher:
+    """
+    Collects insert/delete/replace edits against one source text from any number of stages,
+    rejects overlapping edits and applies them all in a single pass.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.edits: list[Edit] = []
+        self.buffer = SourceBuffer(source)
+        self.line_offsets = self.buffer.line_offsets
+        self.newline = '\r\n' if '\r\n' in source else '\n'
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_offsets)
+
+    def line(self, line_number: int) -> str:
+        """Returns the text of a 1-based line without its line break."""
+        return self.buffer.line(line_number)
+
+    def char_column(self, line_number: int, byte_column: int) -> int:
+        """Converts an ast col_offset (UTF-8 bytes) to a character column."""
+        line = self.line(line_number)
+        if line.isascii():
+            return byte_column
+        return len(line.encode('utf-8')[:byte_column].decode('utf-8', errors='ignore'))
+
+    def offset(self, line_number: int, column: int) -> int:
+        return self.line_offsets[line_number - 1] + column
+
+    def add(self, edit: Edit) -> 'SourcePatcher':
+        self.edits.append(edit)
+        return self
+
+    def insert(self, line_number: int, column: int, text: str) -> 'SourcePatcher':
+        return self.add(Edit(line_number, column, line_number, column, text))
+
+    def delete(self, start_line: int, start_col: int, end_line: int, end_col: int) -> 'SourcePatcher':
+        return self.add(Edit(start_line, start_col, end_line, end_col))
+
+    def replace(self, start_line: int, start_col: int, end_line: int, end_col: int, text: str) -> 'SourcePatcher':
+        return self.add(Edit(start_line, start_col, end_line, end_col, text))
+
+    def insert_lines_after(self, line_number: int, text: str) -> 'SourcePatcher':
+        """Inserts text as new lines after line_number (0 inserts before the first line)."""
+        if line_number == 0:
+            return self.insert(1, 0, text + self.newline)
+        lines = text.split('\n')
+        return self.insert(line_number, len(self.line(line_number)), self.newline + self.newline.join(lines))
+
+    def _spans(self) -> list[tuple[int, int, int, Edit]]:
+        spans = [(self.offset(edit.start_line, edit.start_col), self.offset(edit.end_line, edit.end_col), index, edit)
+                 for index, edit in enumerate(self.edits)]
+        spans.sort(key=lambda span: (span[0], span[1], span[2]))
+        return spans
+
+    def conflicts(self) -> list[tuple[Edit, Edit]]:
+        """Returns the pairs of edits whose ranges overlap. Inserts at the boundary of a range do not conflict."""
+        conflicts: list[tuple[Edit, Edit]] = []
+        furthest_end = -1
+        furthest_edit: Edit | None = None
+        for start, end, _, edit in self._spans():
+            if furthest_edit is not None and start < furthest_end:
+                conflicts.append((furthest_edit, edit))
+            if end > furthest_end:
+                furthest_end, furthest_edit = end, edit
+        return conflicts
+
+    def apply(self) -> APIResponse:
+        """Returns the patched text, or the conflicting edits when ranges overlap."""
+        spans = self._spans()
+        pieces: list[str] = []
+        position = 0
+        for start, end, _, edit in spans:
+            if start < position:
+                return APIResponse(self.conflicts(), False, f"Conflicting edit at line {edit.start_line}, column {edit.start_col}.")
+            pieces.append(self.source[position:start])
+            pieces.append(edit.text)
+            position = end
+        pieces.append(self.source[position:])
+        return APIResponse(''.join(pieces), True)
+
+    def diff(self, file_name: str = 'source') -> APIResponse:
+        """Returns the pending edits as a unified diff."""
+        response = self.apply()
+        if not response.is_valid:
+            return response
+        diff_lines = difflib.unified_diff(self.source.splitlines(keepends=True), response.content.splitlines(keepends=True),
+                                          f'a/{file_name}', f'b/{file_name}')
+        return APIResponse(''.join(diff_lines), True)
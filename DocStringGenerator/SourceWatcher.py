@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+from DocStringGenerator.FileDiscovery import FileDiscovery
+
+DEFAULT_WATCH_INTERVAL = 0.5
+DEFAULT_WATCH_DEBOUNCE = 1.0
+
+Stamp = tuple[int, int]
+
+class SourceWatcher:
+    """
+    Polls a source tree for Python files that were added or modified, and reports each one once it
+    has stayed unchanged for debounce seconds, so a burst of saves becomes a single change. Polls only
+    list and stat the files; a file is opened (to skip binary and generated files) once its change settles.
+    """
+
+    def __init__(self, path: str | Path, discovery: FileDiscovery, interval: float = DEFAULT_WATCH_INTERVAL,
+                 debounce: float = DEFAULT_WATCH_DEBOUNCE, clock: Callable[[], float] = time.monotonic):
+        self.path = Path(path).absolute()
+        self.discovery = discovery
+        self.interval = interval
+        self.debounce = debounce
+        self.clock = clock
+        self._pending: dict[Path, tuple[Stamp, float]] = {}
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, Stamp]:
+        stamps: dict[Path, Stamp] = {}
+        for file in self.discovery.discover(self.path, check_contents=False):
+            stamp = _stamp(file)
+            if stamp:
+                stamps[file] = stamp
+        # The walk runs again on every poll; only the latest skips are worth keeping
+        self.discovery.skipped.clear()
+        return stamps
+
+    def poll(self) -> list[Path]:
+        """Returns the files whose latest change has settled since the previous poll."""
+        now = self.clock()
+        current = self._scan()
+        for file, stamp in current.items():
+            if self._snapshot.get(file) == stamp:
+                # Saved back to the state already handled
+                self._pending.pop(file, None)
+            elif self._pending.get(file, (None, 0.0))[0] != stamp:
+                self._pending[file] = (stamp, now)
+        for file in [file for file in self._snapshot if file not in current]:
+            del self._snapshot[file]
+        settled: list[Path] = []
+        for file, (stamp, since) in list(self._pending.items()):
+            if file not in current:
+                del self._pending[file]
+            elif now - since >= self.debounce:
+                del self._pending[file]
+                self._snapshot[file] = stamp
+                if self.discovery.is_source_file(file, stamp[1]):
+                    settled.append(file)
+        self.discovery.skipped.clear()
+        return settled
+
+    def refresh(self, file: Path):
+        """Takes the current state of file as handled, e.g. after writing it, so the write is not reported as a change."""
+        file = Path(file).absolute()
+        stamp = _stamp(file)
+        if stamp:
+            self._snapshot[file] = stamp
+        self._pending.pop(file, None)
+
+    def changes(self, stop: threading.Event) -> Iterator[list[Path]]:
+        """Yields each batch of settled changes, polling every interval seconds until stop is set."""
+        while not stop.is_set():
+            settled = self.poll()
+            if settled:
+                yield settled
+            stop.wait(self.interval)
+
+def _stamp(file: Path) -> Stamp | None:
+    try:
+        stat = os.stat(file)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
@@ -15,6 +15,7 @@ from DocStringGenerator.CodeProcessor import CodeProcessor, ChunkData
 from DocStringGenerator.CommunicatorManager import CommunicatorManager
 from DocStringGenerator.Utility import APIResponse
 from DocStringGenerator.Logger import Logger
+from DocStringGenerator.Metrics import Metrics, Gauge
 from flask import Flask, Response, request, jsonify, stream_with_context, render_template, session
 import queue
 
@@ -24,6 +25,8 @@ code_processor = CodeProcessor()
 
 app = Flask(__name__)
 data_queue: queue.Queue[str] = queue.Queue()
+metrics: Metrics = dependencies.resolve(Metrics)
+jobs_in_progress = metrics.register(Gauge('docstring_jobs_in_progress', 'process_code requests currently running.'))
 
 available_bots = [
     {"bot": "google", "model":"bard"},
@@ -66,12 +69,15 @@ def process_code():
     if not selected_chatbots:
         return jsonify(APIResponse('', False, 'No chatbots selected')), 400
 
+    jobs_in_progress.inc()
     try:
         final_response = start_bots(source_code, selected_chatbots)
         return jsonify(final_response)
 
     except Exception as e:
         return jsonify(APIResponse('', False, f'An error occurred: {str(e)}')), 500
+    finally:
+        jobs_in_progress.dec()
  
          
 data_queues: dict[str, queue.Queue[Any]] = {
@@ -80,6 +86,21 @@ data_queues: dict[str, queue.Queue[Any]] = {
     "anthropic": queue.Queue()
 }
 
+metrics.register(Gauge('docstring_stream_queue_depth', 'Chunks waiting to be streamed to the browser.', ('bot',),
+                       callback=lambda: {(bot,): bot_queue.qsize() for bot, bot_queue in data_queues.items()}))
+
+
+@app.after_request
+def count_request(response: Response) -> Response:
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.requests.inc(method=request.method, endpoint=endpoint, status=str(response.status_code))
+    return response
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 
 def on_chunk_received(data: ChunkData) -> None:
     bot_name = data.bot_name
@@ -0,0 +1,63 @@
+import ast
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.Benchmark import SyntheticModuleGenerator, BenchmarkRunner, compare_results, save_results
+from DocStringGenerator.ConfigManager import ConfigManager
+
+class TestBenchmark(unittest.TestCase):
+    def test_synthetic_module_matches_response(self):
+        source_code, response = SyntheticModuleGenerator().generate(200)
+        tree = ast.parse(source_code)
+        self.assertGreaterEqual(source_code.count('\n'), 200)
+        class_names = {node.name for node in tree.body if isinstance(node, ast.ClassDef)}
+        function_names = {node.name for node in tree.body if isinstance(node, ast.FunctionDef)}
+        docstrings = response['docstrings']
+        self.assertEqual(class_names, set(docstrings) - {'global_functions'})
+        self.assertEqual(function_names, set(docstrings['global_functions']))
+
+    def test_generation_is_deterministic(self):
+        self.assertEqual(SyntheticModuleGenerator(3).generate(100), SyntheticModuleGenerator(3).generate(100))
+
+    def test_run_process_code(self):
+        runner = BenchmarkRunner(measure_memory=True)
+        config_before = dict(ConfigManager().config)
+        result = runner.run_process_code(100)
+        self.assertTrue(result['valid'])
+        self.assertIn('ask', result['phases'])
+        self.assertGreater(result['peak_memory'], 0)
+        self.assertEqual(ConfigManager().config, config_before)
+
+    def test_simulated_failures(self):
+        result = BenchmarkRunner(failure_rate=1.0, measure_memory=False).run_process_code(100)
+        self.assertFalse(result['valid'])
+
+    def test_seed_makes_simulated_failures_reproducible(self):
+        runner = BenchmarkRunner(failure_rate=0.5, seed=7, measure_memory=False)
+        draws = []
+        for _ in range(2):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                _, model_path = runner.generator.write_fixtures(Path(tmpdir), 'seeded', 10)
+                with runner._configured(model_path):
+                    communicator = runner.code_processor.communicator_manager.bot_communicator
+                    self.assertEqual(runner.settings['verbose'], ConfigManager().config['verbose'])
+                    draws.append([communicator.random.random() for _ in range(5)])
+        self.assertEqual(draws[0], draws[1])
+
+    def test_compare_and_save_results(self):
+        baseline = [{'name': 'process_code[100]', 'wall_time': 1.0}]
+        self.assertEqual(compare_results([{'name': 'process_code[100]', 'wall_time': 1.1}], baseline), [])
+        self.assertEqual(len(compare_results([{'name': 'process_code[100]', 'wall_time': 1.5}], baseline)), 1)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            results_path = Path(tmpdir, 'results.json')
+            save_results(baseline, results_path, {})
+            save_results(baseline, results_path, {})
+            self.assertEqual(results_path.read_text().count('process_code[100]'), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.DependencyContainer import DependencyContainer
+dependencies = DependencyContainer()
+from DocStringGenerator.BaseBotCommunicator import BaseBotCommunicator
+from DocStringGenerator.CheckpointJournal import CheckpointJournal
+from DocStringGenerator.CodeProcessor import CodeProcessor
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.Utility import APIResponse
+
+class Interrupted(Exception):
+    pass
+
+class FunctionCommunicator(BaseBotCommunicator):
+    """Documents the single global function of each file, and is interrupted when asked about fail_on."""
+    def __init__(self, fail_on: str = ''):
+        super().__init__()
+        self.fail_on = fail_on
+        self.asked: list[str] = []
+
+    def ask_for_docstrings(self, source_code: str, retry_count: int=1) -> APIResponse:
+        name = source_code.split('def ')[1].split('(')[0]
+        if name == self.fail_on:
+            raise Interrupted()
+        self.asked.append(name)
+        return APIResponse(json.dumps({"docstrings": {"global_functions": {name: f"Documents {name}."}}}), True)
+
+class ContextLengthCommunicator(BaseBotCommunicator):
+    """Replies that the context length is exceeded for code holding more than one function."""
+    def ask_for_docstrings(self, source_code: str, retry_count: int=1) -> APIResponse:
+        names = [part.split('(')[0] for part in source_code.split('def ')[1:]]
+        if len(names) > 1:
+            return APIResponse("This model's maximum context length is exceeded.", True)
+        return APIResponse(json.dumps({"docstrings": {"global_functions": {names[0]: f"Documents {names[0]}."}}}), True)
+
+class TestCheckpointJournal(unittest.TestCase):
+    def setUp(self):
+        self.config = ConfigManager().config
+        self.saved_config = dict(self.config)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.journal_path = Path(self.root, 'checkpoint.jsonl')
+        self.journal: CheckpointJournal = dependencies.resolve(CheckpointJournal)
+        self.code_processor: CodeProcessor = dependencies.resolve(CodeProcessor)
+        self.saved_communicator = self.code_processor.communicator_manager.bot_communicator
+
+    def tearDown(self):
+        self.journal.close()
+        self.code_processor.communicator_manager.bot_communicator = self.saved_communicator
+        self.tmpdir.cleanup()
+        self.config.clear()
+        self.config.update(self.saved_config)
+
+    def test_entries_survive_reopening(self):
+        self.journal.open(self.journal_path)
+        self.journal.record_part('part one', '{"docstrings": {}}')
+        self.journal.record_part('part two', 'invalid')
+        self.journal.discard_part('part two')
+        self.journal.record_file_done('a.py', 'source')
+        self.journal.close()
+        with open(self.journal_path, 'a') as journal:
+            journal.write('{"type": "part", "key": "cut sh')
+
+        self.assertEqual(4, self.journal.open(self.journal_path))
+        self.assertEqual('{"docstrings": {}}', self.journal.cached_part('part one'))
+        self.assertIsNone(self.journal.cached_part('part two'))
+        self.assertTrue(self.journal.is_file_done('a.py', 'source'))
+        self.assertFalse(self.journal.is_file_done('a.py', 'changed source'))
+        self.journal.clear()
+        self.assertFalse(self.journal_path.exists())
+
+    def test_resume_skips_finished_files_and_parts(self):
+        source_folder = Path(self.root, 'src')
+        source_folder.mkdir()
+        for name in ('a', 'b'):
+            Path(source_folder, f'{name}.py').write_text(f'def {name}():\n    return 1\n')
+        self.config.update({'path': str(source_folder), 'checkpoint_path': str(self.journal_path), 'output_path': str(Path(self.root, 'out')),
+                            'wipe_docstrings': False, 'include_subfolders': False, 'disable_log_processed_file': True, 'verbose': False})
+
+        self.code_processor.communicator_manager.bot_communicator = FunctionCommunicator(fail_on='b')
+        self.config['verbose'] = False
+        with self.assertRaises(Interrupted):
+            self.code_processor.process_folder_or_file()
+        self.assertTrue(self.journal_path.exists())
+
+        communicator = FunctionCommunicator()
+        self.code_processor.communicator_manager.bot_communicator = communicator
+        self.config['verbose'] = False
+        response = self.code_processor.process_folder_or_file()
+        self.assertTrue(response.is_valid)
+        self.assertEqual(['b'], communicator.asked)
+        self.assertIn('Documents b.', Path(self.root, 'out', 'b.py').read_text())
+        self.assertFalse(self.journal_path.exists())
+
+    def test_resume_skips_files_documented_in_place(self):
+        source_folder = Path(self.root, 'src')
+        source_folder.mkdir()
+        for name in ('a', 'b'):
+            Path(source_folder, f'{name}.py').write_text(f'def {name}():\n    return 1\n')
+        self.config.update({'path': str(source_folder), 'checkpoint_path': str(self.journal_path), 'in_place': True, 'output_path': '',
+                            'wipe_docstrings': False, 'include_subfolders': False, 'disable_log_processed_file': True, 'verbose': False})
+
+        self.code_processor.communicator_manager.bot_communicator = FunctionCommunicator(fail_on='b')
+        self.config['verbose'] = False
+        with self.assertRaises(Interrupted):
+            self.code_processor.process_folder_or_file()
+        self.assertIn('Documents a.', Path(source_folder, 'a.py').read_text())
+
+        communicator = FunctionCommunicator()
+        self.code_processor.communicator_manager.bot_communicator = communicator
+        self.config['verbose'] = False
+        response = self.code_processor.process_folder_or_file()
+        self.assertTrue(response.is_valid)
+        self.assertEqual(['b'], communicator.asked)
+        self.assertEqual(1, Path(source_folder, 'a.py').read_text().count('Documents a.'))
+
+    def test_recorded_parts_are_not_requested_again(self):
+        communicator = FunctionCommunicator()
+        communicator_manager = self.code_processor.communicator_manager
+        communicator_manager.bot_communicator = communicator
+        self.config['verbose'] = False
+        self.journal.open(self.journal_path)
+        self.journal.record_part('def a():\n    return 1\n', '{"docstrings": {"global_functions": {"a": "Recorded."}}}')
+
+        self.config['wipe_docstrings'] = False
+        response = self.code_processor.process_code('def a():\n    return 1\n')
+        self.assertTrue(response.is_valid)
+        self.assertIn('"""Recorded."""', response.content)
+        self.assertEqual([], communicator.asked)
+
+    def test_context_length_replies_are_not_recorded(self):
+        communicator = ContextLengthCommunicator()
+        self.code_processor.communicator_manager.bot_communicator = communicator
+        self.config.update({'verbose': False, 'wipe_docstrings': False})
+        self.journal.open(self.journal_path)
+
+        source = 'def a():\n    return 1\n\ndef b():\n    return 2\n'
+        response = self.code_processor.process_code(source)
+        self.assertTrue(response.is_valid)
+        self.assertIsNone(self.journal.cached_part(source))
+        self.assertEqual(2, len(self.journal.parts))
+
+if __name__ == '__main__':
+    unittest.main()
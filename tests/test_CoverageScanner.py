@@ -0,0 +1,66 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.CoverageScanner import CoverageScanner, scan_source
+
+DOCUMENTED = 'def documented():\n    """Doc."""\n'
+UNDOCUMENTED = 'class Undocumented:\n    async def run(self):\n        pass\n'
+
+class TestCoverageScanner(unittest.TestCase):
+    def setUp(self):
+        self.config = ConfigManager().config
+        self.saved_config = dict(self.config)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        Path(self.root, 'documented.py').write_text(DOCUMENTED)
+        Path(self.root, 'undocumented.py').write_text(UNDOCUMENTED)
+        Path(self.root, 'ignored.py').write_text(UNDOCUMENTED)
+        Path(self.root, 'package').mkdir()
+        Path(self.root, 'package', 'nested.py').write_text(UNDOCUMENTED)
+        self.config.update({'include_subfolders': False, 'ignore': ['ignored.py']})
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        self.config.clear()
+        self.config.update(self.saved_config)
+
+    def test_scan_source(self):
+        coverage = scan_source(UNDOCUMENTED)
+        self.assertEqual(2, coverage.total_definitions)
+        self.assertEqual([('Undocumented', 'ClassDef', 1), ('run', 'AsyncFunctionDef', 2)],
+                         [(item['name'], item['kind'], item['line']) for item in coverage.missing])
+        self.assertIn('Invalid Python code', scan_source('def broken(').error)
+
+    def test_scan_uses_process_folder_rules(self):
+        report = CoverageScanner().scan(self.root)
+        self.assertEqual({'documented.py', 'undocumented.py'}, {Path(file.path).name for file in report.files})
+        self.assertEqual(['undocumented.py'], [Path(file.path).name for file in report.files_needing_work()])
+
+        self.config['include_subfolders'] = True
+        report = CoverageScanner().scan(self.root)
+        self.assertEqual({'undocumented.py', 'nested.py'}, {Path(file.path).name for file in report.files_needing_work()})
+        self.assertEqual(5, report.total_definitions)
+        self.assertEqual(4, report.missing_definitions)
+
+    def test_parallel_scan_matches_sequential(self):
+        for index in range(40):
+            Path(self.root, f'module_{index}.py').write_text(DOCUMENTED if index % 2 else UNDOCUMENTED)
+        parallel = CoverageScanner().scan(self.root, workers=2)
+        sequential = CoverageScanner().scan(self.root, workers=1)
+        self.assertEqual(sorted(file.path for file in parallel.files_needing_work()),
+                         sorted(file.path for file in sequential.files_needing_work()))
+
+    def test_verify(self):
+        self.assertTrue(CoverageScanner().verify(Path(self.root, 'documented.py')).is_valid)
+        response = CoverageScanner().verify(self.root)
+        self.assertFalse(response.is_valid)
+        self.assertIn('1 need work', response.error_message)
+
+if __name__ == '__main__':
+    unittest.main()
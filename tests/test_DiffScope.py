@@ -0,0 +1,168 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.DependencyContainer import DependencyContainer
+dependencies = DependencyContainer()
+from DocStringGenerator.BaseBotCommunicator import BaseBotCommunicator
+from DocStringGenerator.CodeProcessor import CodeProcessor
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.DiffScope import changed_definitions, diff_hunks
+from DocStringGenerator.Utility import APIResponse
+
+ORIGINAL = '''class Calculator:
+    """Adds numbers."""
+
+    def add(self, a, b):
+        """Returns a + b."""
+        return a + b
+
+    def subtract(self, a, b):
+        return a - b
+
+def helper():
+    return 1
+
+def untouched():
+    return 2
+'''
+
+CHANGED = '''class Calculator:
+    """Adds numbers."""
+    precision = 2
+
+    def add(self, a, b):
+        """Returns a + b."""
+        return round(a + b, self.precision)
+
+    def subtract(self, a, b):
+        return a - b
+
+def helper():
+    def inner():
+        return 1
+    return inner()
+
+def untouched():
+    return 2
+'''
+
+class MissingCommunicator(BaseBotCommunicator):
+    """Answers every request for missing docstrings, recording the definitions asked about."""
+    def __init__(self):
+        super().__init__()
+        self.asked: list[list[str]] = []
+
+    def ask(self, prompt, replacements, keep_history: bool = True) -> APIResponse:
+        names: list[str] = json.loads(replacements['function_names'])
+        self.asked.append(names)
+        docstrings: dict = {}
+        for name in names:
+            class_name, _, method = name.rpartition('.')
+            if class_name:
+                docstrings.setdefault(class_name, {}).setdefault('methods', {})[method] = f'New {name}.'
+            elif name[0].isupper():
+                docstrings.setdefault(name, {})['docstring'] = f'New {name}.'
+            else:
+                docstrings.setdefault('global_functions', {})[name] = f'New {name}.'
+        return APIResponse(json.dumps({"docstrings": docstrings}), True)
+
+class FailingCommunicator(BaseBotCommunicator):
+    def ask(self, prompt, replacements, keep_history: bool = True) -> APIResponse:
+        return APIResponse("", False, "Service unavailable.")
+
+class PartialCommunicator(MissingCommunicator):
+    """Answers for everything but the methods."""
+    def ask(self, prompt, replacements, keep_history: bool = True) -> APIResponse:
+        replacements = {**replacements, 'function_names': json.dumps([name for name in json.loads(replacements['function_names']) if '.' not in name])}
+        return super().ask(prompt, replacements, keep_history)
+
+class TestDiffScope(unittest.TestCase):
+    def setUp(self):
+        self.config = ConfigManager().config
+        self.saved_config = dict(self.config)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.code_processor: CodeProcessor = dependencies.resolve(CodeProcessor)
+        self.saved_communicator = self.code_processor.communicator_manager.bot_communicator
+
+    def tearDown(self):
+        self.code_processor.communicator_manager.bot_communicator = self.saved_communicator
+        self.tmpdir.cleanup()
+        self.config.clear()
+        self.config.update(self.saved_config)
+
+    def git(self, *args: str):
+        subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args], cwd=self.root, capture_output=True, check=True)
+
+    def commit_change(self) -> Path:
+        try:
+            self.git('init', '-q')
+        except (OSError, subprocess.CalledProcessError):
+            self.skipTest('git is not available')
+        path = Path(self.root, 'calculator.py')
+        path.write_text(ORIGINAL)
+        Path(self.root, 'other.py').write_text('def other():\n    return 3\n')
+        self.git('add', '.')
+        self.git('commit', '-q', '-m', 'initial')
+        path.write_text(CHANGED)
+        self.git('commit', '-q', '-am', 'change')
+        return path
+
+    def test_changed_lines_map_to_the_innermost_definition(self):
+        definitions = changed_definitions(CHANGED, [(3, 3), (7, 7), (13, 15)])
+        self.assertEqual([('Calculator', 'ClassDef', ''), ('add', 'FunctionDef', 'Calculator'), ('helper', 'FunctionDef', '')],
+                         [(definition['name'], definition['kind'], definition['class']) for definition in definitions])
+        self.assertEqual([], changed_definitions(CHANGED, [(4, 4)]))
+
+    def test_hunks_of_a_revision_range(self):
+        path = self.commit_change()
+        hunks = diff_hunks('HEAD~1..HEAD', self.root)
+        self.assertEqual([path.resolve()], list(hunks))
+        self.assertEqual([(3, 3), (7, 7), (13, 15)], hunks[path.resolve()])
+
+    def test_only_changed_definitions_are_documented(self):
+        path = self.commit_change()
+        communicator = MissingCommunicator()
+        self.code_processor.communicator_manager.bot_communicator = communicator
+        self.config.update({'path': str(self.root), 'diff': 'HEAD~1', 'in_place': True, 'output_path': '', 'wipe_docstrings': True,
+                            'include_subfolders': False, 'disable_log_processed_file': True, 'verbose': False})
+
+        response = self.code_processor.process_folder_or_file()
+        self.assertTrue(response.is_valid)
+        self.assertEqual([['Calculator', 'Calculator.add', 'helper']], communicator.asked)
+        documented = path.read_text()
+        self.assertIn('New Calculator.add.', documented)
+        self.assertNotIn('Returns a + b.', documented)
+        self.assertIn('New helper.', documented)
+        self.assertNotIn('subtract.', documented)
+        self.assertNotIn('untouched.', documented)
+        self.assertEqual('def other():\n    return 3\n', Path(self.root, 'other.py').read_text())
+
+    def test_wiped_docstrings_are_kept_without_an_answer(self):
+        path = self.commit_change()
+        self.config.update({'path': str(self.root), 'diff': 'HEAD~1', 'in_place': True, 'output_path': '', 'wipe_docstrings': True,
+                            'include_subfolders': False, 'disable_log_processed_file': True, 'verbose': False})
+        for communicator in (FailingCommunicator(), PartialCommunicator()):
+            self.code_processor.communicator_manager.bot_communicator = communicator
+            self.config['verbose'] = False
+            response = self.code_processor.process_folder_or_file()
+            self.assertFalse(response.is_valid)
+            self.assertEqual(CHANGED, path.read_text())
+        self.assertIn('Calculator.add', response.content[0]['response'].error_message)
+
+    def test_an_invalid_range_fails_the_run(self):
+        self.commit_change()
+        self.config.update({'path': str(self.root), 'diff': 'no-such-revision', 'verbose': False})
+        response = self.code_processor.process_folder_or_file()
+        self.assertFalse(response.is_valid)
+        self.assertIn('no-such-revision', response.error_message)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+import unittest
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.DependencyContainer import DependencyContainer
+dependencies = DependencyContainer()
+from DocStringGenerator.CodeProcessor import CodeProcessor
+from DocStringGenerator.DocstringProcessor import DocstringProcessor
+from DocStringGenerator.DocstringModel import DocstringSet
+
+DOCSTRINGS = {
+    "Calculator": {
+        "docstring": "Adds numbers.",
+        "example": "calculator = Calculator()\ncalculator.add(1, 2)",
+        "methods": {"add": "Returns a + b."}
+    },
+    "global_functions": {"helper": "Returns one."}
+}
+
+SOURCE = '''class Calculator:
+    def add(self, a, b):
+        return a + b
+
+def helper():
+    return 1
+'''
+
+class TestDocstringModel(unittest.TestCase):
+    def setUp(self):
+        self.docstring_processor: DocstringProcessor = dependencies.resolve(DocstringProcessor)
+
+    def test_round_trip(self):
+        docstring_set = DocstringSet.from_dict(DOCSTRINGS)
+        self.assertEqual(DOCSTRINGS, docstring_set.to_dict())
+        calculator = docstring_set.class_docstrings()["Calculator"]
+        self.assertEqual("Returns a + b.", calculator.methods.get("add"))
+        self.assertIsNone(calculator.methods.get("subtract"))
+        self.assertEqual(["helper"], [function.name for function in docstring_set.global_functions])
+
+    def test_names_are_interned(self):
+        first = DocstringSet.from_dict(json.loads(json.dumps(DOCSTRINGS)))
+        second = DocstringSet.from_dict(json.loads(json.dumps(DOCSTRINGS)))
+        self.assertIs(first.classes[0].name, second.classes[0].name)
+        self.assertIs(first.classes[0].methods.names[0], second.classes[0].methods.names[0])
+
+    def test_insert_docstrings_accepts_either_form(self):
+        from_dict = self.docstring_processor.insert_docstrings(SOURCE, DOCSTRINGS)
+        from_set = self.docstring_processor.insert_docstrings(SOURCE, DocstringSet.from_dict(DOCSTRINGS))
+        self.assertEqual(from_dict, from_set)
+        self.assertIn('"""Returns one."""', from_set)
+
+    def test_examples_and_merge(self):
+        docstring_set = self.docstring_processor.to_docstring_set(DOCSTRINGS)
+        examples = CodeProcessor().parse_examples_from_docstrings(docstring_set)
+        self.assertEqual({"Calculator": DOCSTRINGS["Calculator"]["example"]}, examples.content)
+        other = DocstringSet.from_dict({"Calculator": {"methods": {"sub": "Returns a - b."}}})
+        merged = self.docstring_processor.merge_docstring_sets([docstring_set, other])
+        self.assertEqual(["add", "sub"], list(merged.class_docstrings()["Calculator"].methods.names))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import queue
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.FileDiscovery import FileDiscovery, GitignorePattern
+
+class TestFileDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        files = {
+            'main.py': '"""Reports generated by CI."""\ndef main():\n    pass\n',
+            'notes.txt': 'not python',
+            'skip_me.py': 'x = 1\n',
+            'generated_pb2.py': '# Generated by the protocol buffer compiler.  DO NOT EDIT!\nx = 1\n',
+            'blob.py': 'x = 1\n\0\0',
+            'package/module.py': 'x = 1\n',
+            'package/build/out.py': 'x = 1\n',
+            'package/keep.py': 'x = 1\n',
+            'package/test_module.py': 'x = 1\n',
+            'node_modules/lib/index.py': 'x = 1\n',
+            '.venv/lib/site.py': 'x = 1\n',
+            '.gitignore': 'build/\ntest_*.py\n',
+            'package/.gitignore': '*.py\n!keep.py\n'
+        }
+        for name, content in files.items():
+            Path(self.root, name).parent.mkdir(parents=True, exist_ok=True)
+            Path(self.root, name).write_text(content)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def relative(self, files) -> list[str]:
+        return [Path(file).relative_to(self.root).as_posix() for file in files]
+
+    def test_top_folder_only(self):
+        discovery = FileDiscovery(ignore=['skip_*'])
+        self.assertEqual(['main.py'], self.relative(discovery.discover(self.root)))
+        self.assertEqual({'binary', 'generated'}, {reason for _, reason in discovery.skipped})
+
+    def test_subfolders_with_gitignore(self):
+        discovery = FileDiscovery(include_subfolders=True, ignore=['skip_me.py'])
+        self.assertEqual(['main.py', 'package/keep.py'], self.relative(discovery.discover(self.root)))
+        discovery = FileDiscovery(include_subfolders=True, use_gitignore=False, skip_generated=False, max_file_size=0)
+        self.assertEqual(['generated_pb2.py', 'main.py', 'skip_me.py', 'package/keep.py', 'package/module.py',
+                          'package/test_module.py', 'package/build/out.py'], self.relative(discovery.discover(self.root)))
+
+    def test_huge_files_are_skipped(self):
+        discovery = FileDiscovery(max_file_size=10)
+        self.assertEqual([], list(discovery.discover(self.root / 'main.py')))
+
+    def test_feed(self):
+        work_queue: queue.Queue = queue.Queue()
+        FileDiscovery(include_subfolders=True).feed(self.root, work_queue).join()
+        self.assertEqual(['main.py', 'skip_me.py', 'package/keep.py'], self.relative(iter(work_queue.get, None)))
+
+    def test_gitignore_patterns(self):
+        self.assertTrue(GitignorePattern('/docs/*.py').matches('docs/a.py', False))
+        self.assertFalse(GitignorePattern('/docs/*.py').matches('src/docs/a.py', False))
+        self.assertTrue(GitignorePattern('**/gen/*.py').matches('a/b/gen/x.py', False))
+        self.assertTrue(GitignorePattern('gen/').matches('a/gen', True))
+        self.assertFalse(GitignorePattern('gen/').matches('a/gen', False))
+        self.assertTrue(GitignorePattern('file[0-9].py').matches('x/file1.py', False))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.CodeProcessor import CodeProcessor
+from DocStringGenerator.DocstringProcessor import DocstringProcessor
+from DocStringGenerator.Instrumentation import Instrumentation
+from DocStringGenerator.Logger import Logger
+from DocStringGenerator.DependencyContainer import DependencyContainer
+dependencies = DependencyContainer()
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.instrumentation: Instrumentation = dependencies.resolve(Instrumentation)
+        self.instrumentation.reset()
+        self.code_processor: CodeProcessor = dependencies.resolve(CodeProcessor)
+        self.docstring_processor: DocstringProcessor = dependencies.resolve(DocstringProcessor)
+
+    def test_span_records_per_file(self):
+        with Logger.context(file='a.py', bot='File'):
+            with self.instrumentation.span('ask', bytes_in=10, tokens_in=3) as span:
+                span.set_output('x' * 8, count_tokens=True)
+        summary = self.instrumentation.summary()
+        self.assertEqual(summary['phases']['ask']['count'], 1)
+        self.assertEqual(summary['phases']['ask']['bytes_out'], 8)
+        self.assertEqual(summary['phases']['ask']['tokens_out'], 2)
+        self.assertIn('a.py', summary['files'])
+        self.assertIn('File', summary['bots'])
+
+    def test_pipeline_methods_are_instrumented(self):
+        source = "class A:\n    def f(self):\n        pass\n"
+        self.code_processor.split_source_code(source, 1)
+        self.code_processor.verify_code_docstrings(source)
+        self.docstring_processor.insert_docstrings(source, {"A": {"docstring": "Doc"}})
+        phases = self.instrumentation.summary()['phases']
+        self.assertEqual(phases['split_source_code']['bytes_in'], len(source))
+        self.assertEqual(phases['verify_code_docstrings']['errors'], 1)
+        self.assertIn('insert_docstrings', phases)
+
+    def test_sizes_are_utf8_bytes(self):
+        source = "def f():\n    return 'é'\n"
+        self.code_processor.split_source_code(source, 1)
+        with self.instrumentation.span('ask') as span:
+            span.set_output('→')
+        phases = self.instrumentation.summary()['phases']
+        self.assertEqual(phases['split_source_code']['bytes_in'], len(source) + 1)
+        self.assertEqual(phases['ask']['bytes_out'], 3)
+
+    def test_failed_span_counts_error(self):
+        with self.assertRaises(ValueError):
+            with self.instrumentation.span('parse_json'):
+                raise ValueError('bad')
+        self.assertEqual(self.instrumentation.summary()['phases']['parse_json']['errors'], 1)
+
+    def test_dump_report(self):
+        with self.instrumentation.span('wipe_docstrings'):
+            pass
+        with tempfile.TemporaryDirectory() as tmpdir:
+            report_path = os.path.join(tmpdir, 'report.json')
+            self.instrumentation.dump_report(report_path)
+            with open(report_path) as f:
+                report = json.load(f)
+        self.assertIn('wipe_docstrings', report['phases'])
+        self.assertIn('wipe_docstrings', self.instrumentation.format_summary())
+
+if __name__ == '__main__':
+    unittest.main()
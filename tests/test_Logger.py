@@ -0,0 +1,92 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.Logger import Logger, ConsoleSink, JsonlFileSink, CallbackSink, DEBUG, INFO, WARNING
+
+class TestLogger(unittest.TestCase):
+    def setUp(self):
+        self.config = ConfigManager().config
+        self.saved_config = dict(self.config)
+        self.config.update({'verbose': True, 'log_level': 'INFO', 'log_file': '', 'log_async': True, 'bot': 'File'})
+
+    def tearDown(self):
+        self.config.clear()
+        self.config.update(self.saved_config)
+
+    def test_console_sink_receives_batched_messages(self):
+        stream = io.StringIO()
+        logger = Logger()
+        logger.sinks = [ConsoleSink(DEBUG, stream)]
+        for token in ['Hello', ', ', 'world']:
+            logger.log(token)
+        logger.log_line('!')
+        logger.flush()
+        self.assertEqual(stream.getvalue(), 'Hello, world!\n')
+
+    def test_level_filter(self):
+        stream = io.StringIO()
+        logger = Logger()
+        logger.sinks = [ConsoleSink(INFO, stream)]
+        logger.log('token')
+        logger.log_line('status')
+        logger.flush()
+        self.assertEqual(stream.getvalue(), 'status\n')
+
+    def test_not_verbose_keeps_warnings_only(self):
+        self.config['verbose'] = False
+        stream = io.StringIO()
+        logger = Logger()
+        logger.sinks = [ConsoleSink(DEBUG, stream)]
+        logger.log_line('status')
+        logger.log_line('problem', WARNING)
+        logger.flush()
+        self.assertEqual(stream.getvalue(), 'problem\n')
+
+    def test_jsonl_sink_records_context(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_path = os.path.join(tmpdir, 'log.jsonl')
+            self.config['log_file'] = log_path
+            logger = Logger()
+            logger.sinks = [sink for sink in logger.sinks if isinstance(sink, JsonlFileSink)]
+            with Logger.context(job='job1', file='a.py'):
+                with Logger.context(phase='ask'):
+                    logger.log_line('sending')
+            logger.log_line('done')
+            logger.flush()
+            for sink in logger.sinks:
+                sink.close()
+            with open(log_path) as f:
+                records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]['job'], 'job1')
+        self.assertEqual(records[0]['file'], 'a.py')
+        self.assertEqual(records[0]['phase'], 'ask')
+        self.assertEqual(records[0]['bot'], 'File')
+        self.assertEqual(records[1]['job'], '')
+
+    def test_callback_sink_streams_every_chunk(self):
+        chunks = []
+        logger = Logger(lambda data: chunks.append((data.bot_name, data.chunk)))
+        self.assertIsInstance(logger.sinks[0], CallbackSink)
+        logger.log('a')
+        logger.log('b')
+        logger.flush()
+        self.assertEqual(chunks, [('File', 'a'), ('File', 'b')])
+
+    def test_synchronous_mode(self):
+        self.config['log_async'] = False
+        stream = io.StringIO()
+        logger = Logger()
+        logger.sinks = [ConsoleSink(DEBUG, stream)]
+        logger.log('now')
+        self.assertEqual(stream.getvalue(), 'now')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.Instrumentation import Instrumentation
+from DocStringGenerator.Logger import Logger
+from DocStringGenerator.Metrics import Metrics, Counter, Gauge, Histogram
+from DocStringGenerator.DependencyContainer import DependencyContainer
+dependencies = DependencyContainer()
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics: Metrics = dependencies.resolve(Metrics)
+        self.instrumentation: Instrumentation = dependencies.resolve(Instrumentation)
+
+    def test_counter_render(self):
+        counter = Counter('test_total', 'A counter.', ('bot',))
+        counter.inc(bot='File')
+        counter.inc(2, bot='File')
+        self.assertEqual(counter.render(), ['# HELP test_total A counter.', '# TYPE test_total counter', 'test_total{bot="File"} 3'])
+
+    def test_gauge_callback(self):
+        gauge = Gauge('test_depth', 'A gauge.', ('bot',), callback=lambda: {('File',): 4})
+        self.assertIn('test_depth{bot="File"} 4', gauge.render())
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram('test_seconds', 'A histogram.', buckets=(1, 5))
+        histogram.observe(0.5)
+        histogram.observe(3)
+        histogram.observe(10)
+        lines = histogram.render()
+        self.assertIn('test_seconds_bucket{le="1"} 1', lines)
+        self.assertIn('test_seconds_bucket{le="5"} 2', lines)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 3', lines)
+        self.assertIn('test_seconds_count 3', lines)
+
+    def test_ask_spans_feed_metrics(self):
+        before = self.metrics.tokens.value(bot='MetricsBot', direction='out')
+        with Logger.context(bot='MetricsBot'):
+            with self.instrumentation.span('ask', tokens_in=5) as span:
+                self.assertEqual(self.metrics.in_flight.value(bot='MetricsBot'), 1)
+                span.set_output('abcdefgh', count_tokens=True)
+            with self.instrumentation.span('ask_retry'):
+                pass
+        self.assertEqual(self.metrics.in_flight.value(bot='MetricsBot'), 0)
+        self.assertEqual(self.metrics.tokens.value(bot='MetricsBot', direction='out') - before, 2)
+        self.assertGreaterEqual(self.metrics.retries.value(bot='MetricsBot', kind='ask_retry'), 1)
+        self.assertIn('docstring_ask_duration_seconds_count{bot="MetricsBot"}', self.metrics.render())
+
+if __name__ == '__main__':
+    unittest.main()
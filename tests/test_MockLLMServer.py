@@ -0,0 +1,90 @@
+import os
+import sys
+import unittest
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.MockLLMServer import MockLLMServer, MockLLMSettings, DEFAULT_PAYLOAD
+from DocStringGenerator.OpenAICommunicator import OpenAICommunicator
+from DocStringGenerator.AnthropicCommunicator import AnthropicCommunicator
+
+class TestMockLLMServer(unittest.TestCase):
+    def setUp(self):
+        self.server = MockLLMServer(settings=MockLLMSettings(token_rate=0, time_to_first_token=0)).start()
+        self.config = ConfigManager().config
+        self.saved_config = dict(self.config)
+        self.config.update({'verbose': False, 'openai_base_url': f'{self.server.base_url}/v1', 'anthropic_base_url': self.server.base_url})
+        self.env = patch.dict(os.environ, {'OPENAI_API_KEY': 'test-key', 'ANTHROPIC_API_KEY': 'test-key'})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.server.stop()
+        self.config.clear()
+        self.config.update(self.saved_config)
+
+    def test_openai_stream(self):
+        self.config.update({'bot': 'OpenAI', 'model': 'gpt-3.5-turbo-1106'})
+        communicator = OpenAICommunicator()
+        response = communicator.ask('Document this', {})
+        self.assertTrue(response.is_valid, response.error_message)
+        self.assertEqual(response.content, DEFAULT_PAYLOAD)
+
+    def test_anthropic_stream(self):
+        self.config.update({'bot': 'Anthropic', 'model': 'claude-2.1'})
+        communicator = AnthropicCommunicator()
+        response = communicator.ask('Document this', {})
+        self.assertTrue(response.is_valid, response.error_message)
+        self.assertEqual(response.content, DEFAULT_PAYLOAD)
+
+    def test_concurrent_requests_are_all_counted(self):
+        def post(_):
+            request = urllib.request.Request(f'{self.server.base_url}/v1/chat/completions', data=b'{"messages": []}',
+                                             headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(request) as response:
+                response.read()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(post, range(40)))
+        self.assertEqual(40, self.server.request_count)
+
+    def test_structured_output_requests(self):
+        self.config.update({'bot': 'OpenAI', 'model': 'gpt-3.5-turbo-1106'})
+        OpenAICommunicator().ask('Document this', {})
+        self.assertEqual({'type': 'json_object'}, self.server.last_request['response_format'])
+        self.assertIn('JSON', self.server.last_request['messages'][0]['content'])
+
+        self.config['openai_json_schema'] = True
+        OpenAICommunicator().ask('Document this', {'ask_missing': 'True'})
+        json_schema = self.server.last_request['response_format']['json_schema']['schema']
+        self.assertIn('docstrings', json_schema['properties'])
+
+        self.config.update({'bot': 'Anthropic', 'model': 'claude-2.1'})
+        response = AnthropicCommunicator().ask('Document this', {})
+        self.assertTrue(self.server.last_request['prompt'].endswith('Assistant:{'))
+        self.assertEqual(response.content, DEFAULT_PAYLOAD)
+
+        self.config['structured_output'] = False
+        OpenAICommunicator().ask('Document this', {})
+        self.assertNotIn('response_format', self.server.last_request)
+
+    def test_injected_errors(self):
+        self.server.settings.rate_limit_rate = 1
+        self.config.update({'bot': 'Anthropic', 'model': 'claude-2.1'})
+        response = AnthropicCommunicator().ask('Document this', {})
+        self.assertFalse(response.is_valid)
+        self.assertIn('429', response.error_message)
+
+        self.server.settings.rate_limit_rate = 0
+        self.server.settings.server_error_rate = 1
+        self.config.update({'bot': 'OpenAI', 'model': 'gpt-3.5-turbo-1106'})
+        communicator = OpenAICommunicator()
+        communicator.client = communicator.client.with_options(max_retries=0)
+        response = communicator.ask('Document this', {})
+        self.assertFalse(response.is_valid)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.DependencyContainer import DependencyContainer
+dependencies = DependencyContainer()
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.OutputWriter import OutputWriter
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        self.config = ConfigManager().config
+        self.saved_config = dict(self.config)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name, 'src')
+        Path(self.root, 'package').mkdir(parents=True)
+        self.source = Path(self.root, 'package', 'module.py')
+        self.source.write_text('x = 1\n')
+        self.config.update({'path': str(self.root), 'bot': 'OpenAI', 'in_place': False, 'output_path': '', 'background_writes': True})
+        self.writer = OutputWriter()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        self.config.clear()
+        self.config.update(self.saved_config)
+
+    def test_target_paths(self):
+        self.assertEqual(Path(self.root, 'package', 'OpenAI', 'module.py'), self.writer.target_path(self.source))
+        self.config['output_path'] = str(Path(self.tmpdir.name, 'out'))
+        self.assertEqual(Path(self.tmpdir.name, 'out', 'package', 'module.py'), self.writer.target_path(self.source))
+        self.config['in_place'] = True
+        self.assertEqual(self.source, self.writer.target_path(self.source))
+
+    def test_atomic_in_place_write_keeps_mode(self):
+        self.config['in_place'] = True
+        os.chmod(self.source, 0o640)
+        self.writer.write(self.source, 'x = 2\n')
+        self.assertEqual('x = 2\n', self.source.read_text())
+        self.assertEqual(0o640, self.source.stat().st_mode & 0o777)
+        self.assertEqual(['module.py'], os.listdir(self.source.parent))
+
+    def test_new_files_get_the_default_mode(self):
+        self.config['output_path'] = str(Path(self.tmpdir.name, 'out'))
+        target = self.writer.write(self.source, 'x = 2\n')
+        opened = Path(target.parent, 'opened.py')
+        opened.write_text('')
+        self.assertEqual(opened.stat().st_mode & 0o777, target.stat().st_mode & 0o777)
+
+    def test_content_is_written_as_utf8_and_failures_leave_no_temporary_file(self):
+        self.config['in_place'] = True
+        self.writer.write(self.source, 'name = "é"\r\n')
+        self.assertEqual('name = "é"\r\n'.encode('utf-8'), self.source.read_bytes())
+        self.writer.write(self.source, 'x = "\ud800"\n')
+        self.assertEqual(1, len(self.writer.errors))
+        self.assertEqual(['module.py'], os.listdir(self.source.parent))
+
+    def test_background_writes_finish_with_the_block(self):
+        self.config['output_path'] = str(Path(self.tmpdir.name, 'out'))
+        written: list[Path] = []
+        with self.writer.background():
+            target = self.writer.write(self.source, 'x = 3\n', written.append)
+        self.assertEqual([target], written)
+        self.assertEqual('x = 3\n', target.read_text())
+
+    def test_failed_writes_are_reported(self):
+        self.config['output_path'] = str(self.source)
+        with self.writer.background():
+            self.writer.write(self.source, 'x = 4\n')
+        errors = self.writer.take_errors()
+        self.assertEqual(1, len(errors))
+        self.assertEqual([], self.writer.take_errors())
+        self.assertEqual('x = 1\n', self.source.read_text())
+
+if __name__ == '__main__':
+    unittest.main()
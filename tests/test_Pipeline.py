@@ -0,0 +1,122 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.DependencyContainer import DependencyContainer
+dependencies = DependencyContainer()
+from DocStringGenerator.BaseBotCommunicator import BaseBotCommunicator
+from DocStringGenerator.CodeProcessor import CodeProcessor
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.Pipeline import Pipeline, Stage, StageQueue
+from DocStringGenerator.Utility import APIResponse
+
+class SlowCommunicator(BaseBotCommunicator):
+    """Documents the single global function of each file after a delay, recording how many requests overlap."""
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.in_flight = 0
+        self.most_in_flight = 0
+        self.lock = threading.Lock()
+
+    def ask_for_docstrings(self, source_code: str, retry_count: int=1) -> APIResponse:
+        with self.lock:
+            self.in_flight += 1
+            self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        name = source_code.split('def ')[1].split('(')[0]
+        return APIResponse(json.dumps({"docstrings": {"global_functions": {name: f"Documents {name}."}}}), True)
+
+class TestPipeline(unittest.TestCase):
+    def test_put_blocks_while_the_queue_is_full(self):
+        queue: StageQueue[int] = StageQueue(1)
+        queue.put(1)
+        putter = threading.Thread(target=queue.put, args=(2,), daemon=True)
+        putter.start()
+        putter.join(0.1)
+        self.assertTrue(putter.is_alive())
+        queue.put_feedback(3)
+        self.assertEqual(2, len(queue))
+        self.assertEqual([1, 3], [queue.get(), queue.get()])
+        putter.join(1)
+        self.assertFalse(putter.is_alive())
+        self.assertEqual(2, queue.get())
+        queue.close()
+        self.assertIsNone(queue.get())
+
+    def test_items_are_routed_back_to_earlier_stages(self):
+        attempts: dict[int, int] = {}
+        def request(item: list[int]) -> str:
+            attempts[item[0]] = attempts.get(item[0], 0) + 1
+            return 'check'
+        def check(item: list[int]) -> str | None:
+            return 'request' if item[0] % 2 and attempts[item[0]] < 3 else None
+        pipeline = Pipeline([Stage('request', request, 3), Stage('check', check, 2)], queue_size=2)
+        finished = pipeline.run([[number] for number in range(10)])
+        self.assertEqual(list(range(10)), sorted(item[0] for item in finished))
+        self.assertEqual({number: 3 if number % 2 else 1 for number in range(10)}, attempts)
+
+    def test_a_failing_stage_stops_the_run(self):
+        def fail(item: int) -> str | None:
+            if item == 2:
+                raise ValueError(item)
+            return None
+        pipeline = Pipeline([Stage('fail', fail)], queue_size=1)
+        with self.assertRaises(ValueError):
+            pipeline.run(iter(range(1000)))
+        self.assertLess(len(pipeline.finished), 999)
+
+    def test_run_inline_stops_before_a_stage(self):
+        visited: list[str] = []
+        finished: list[list[str]] = []
+        stages = [Stage(name, lambda item, name=name, next_name=next_name: item.append(name) or next_name)
+                  for name, next_name in (('a', 'b'), ('b', 'c'), ('c', None))]
+        Pipeline(stages, on_finish=finished.append).run_inline(visited, stop_before='c')
+        self.assertEqual(['a', 'b'], visited)
+        self.assertEqual([visited], finished)
+
+class TestFolderPipeline(unittest.TestCase):
+    def setUp(self):
+        self.config = ConfigManager().config
+        self.saved_config = dict(self.config)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.code_processor: CodeProcessor = dependencies.resolve(CodeProcessor)
+        self.saved_communicator = self.code_processor.communicator_manager.bot_communicator
+
+    def tearDown(self):
+        self.code_processor.communicator_manager.bot_communicator = self.saved_communicator
+        self.tmpdir.cleanup()
+        self.config.clear()
+        self.config.update(self.saved_config)
+
+    def test_files_are_requested_concurrently(self):
+        source_folder = Path(self.root, 'src')
+        source_folder.mkdir()
+        names = [f'f{index}' for index in range(8)]
+        for name in names:
+            Path(source_folder, f'{name}.py').write_text(f'def {name}():\n    return 1\n')
+        communicator = SlowCommunicator(0.2)
+        self.code_processor.communicator_manager.bot_communicator = communicator
+        self.config.update({'path': str(source_folder), 'output_path': str(Path(self.root, 'out')), 'wipe_docstrings': False,
+                            'include_subfolders': False, 'disable_log_processed_file': True, 'verbose': False,
+                            'pipeline_workers': {'request': 4}})
+
+        response = self.code_processor.process_folder_or_file()
+        self.assertTrue(response.is_valid)
+        self.assertGreater(communicator.most_in_flight, 1)
+        self.assertEqual({}, communicator._conversations)
+        for name in names:
+            self.assertIn(f'Documents {name}.', Path(self.root, 'out', f'{name}.py').read_text())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.DependencyContainer import DependencyContainer
+dependencies = DependencyContainer()
+from DocStringGenerator.Benchmark import SyntheticModuleGenerator
+from DocStringGenerator.CodeProcessor import CodeProcessor
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.DocstringModel import DocstringSet
+from DocStringGenerator.FileCommunicator import FileCommunicator
+from DocStringGenerator.PostProcessPool import PostProcessPool, MIN_SIZE_FOR_POOL
+
+class TestPostProcessPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.source_code, cls.response = SyntheticModuleGenerator().generate(2000)
+
+    def setUp(self):
+        self.config = ConfigManager().config
+        self.saved_config = dict(self.config)
+        self.code_processor: CodeProcessor = dependencies.resolve(CodeProcessor)
+        self.pool: PostProcessPool = dependencies.resolve(PostProcessPool)
+        self.config.update({'verbose': False, 'post_process_workers': 2})
+
+    def tearDown(self):
+        self.config.clear()
+        self.config.update(self.saved_config)
+
+    def test_workers_return_what_the_process_computes(self):
+        self.assertGreater(len(self.source_code), MIN_SIZE_FOR_POOL)
+        docstrings = DocstringSet.from_dict(self.response['docstrings'])
+        expected = self.code_processor.post_process(self.source_code, docstrings)
+        responses = [{'content': json.dumps(self.response), 'source_code': self.source_code, 'part_index': 0}]
+        expected_docstrings = self.code_processor.docstring_processor.extract_docstrings(responses)
+        with self.pool.session():
+            self.assertTrue(self.pool.running)
+            self.assertEqual(self.pool.post_process(self.source_code, docstrings), expected)
+            extracted = self.pool.extract_docstrings(responses)
+        self.assertFalse(self.pool.running)
+        self.assertTrue(expected['verified'])
+        self.assertTrue(extracted.is_valid)
+        self.assertEqual(extracted.content, expected_docstrings.content)
+
+    def test_without_a_session_work_stays_in_process(self):
+        self.config['post_process_workers'] = 0
+        with self.pool.session():
+            self.assertFalse(self.pool.running)
+            result = self.pool.post_process("def f():\n    pass\n", DocstringSet.from_dict({'global_functions': {'f': 'Does f.'}}))
+        self.assertEqual(result['example_errors'], None)
+        self.assertTrue(result['verified'])
+        self.assertIn('Does f.', result['source_code'])
+
+    def test_process_code_gives_the_same_code_with_workers(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _, model_path = SyntheticModuleGenerator().write_fixtures(Path(tmpdir), 'module', 2000)
+            communicator_manager = self.code_processor.communicator_manager
+            saved_communicator = communicator_manager.bot_communicator
+            communicator_manager.bot_communicator = FileCommunicator()
+            self.config.update({'verbose': False, 'bot': 'File', 'model': str(model_path)})
+            try:
+                expected = self.code_processor.process_code(self.source_code)
+                with self.pool.session():
+                    response = self.code_processor.process_code(self.source_code)
+            finally:
+                communicator_manager.bot_communicator = saved_communicator
+        self.assertTrue(expected.is_valid)
+        self.assertEqual(response.content, expected.content)
+
+if __name__ == '__main__':
+    unittest.main()
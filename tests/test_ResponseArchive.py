@@ -0,0 +1,109 @@
+import gzip
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.BaseBotCommunicator import BaseBotCommunicator
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.FileCommunicator import FileCommunicator
+from DocStringGenerator.Logger import Logger
+from DocStringGenerator.ResponseArchive import ResponseArchive, hash_text
+from DocStringGenerator.Utility import APIResponse
+
+class EchoCommunicator(BaseBotCommunicator):
+    """Answers every prompt with a response naming the prompt's length."""
+    def ask(self, prompt, replacements, keep_history: bool = True) -> APIResponse:
+        prompt_text = self.format_prompt(prompt, replacements).content
+        return APIResponse(json.dumps({"length": len(prompt_text)}), True)
+
+class TestResponseArchive(unittest.TestCase):
+    def setUp(self):
+        self.config = ConfigManager().config
+        self.saved_config = dict(self.config)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        ResponseArchive.close_all()
+        self.tmpdir.cleanup()
+        self.config.clear()
+        self.config.update(self.saved_config)
+
+    def test_records_are_indexed_and_survive_reopening(self):
+        archive = ResponseArchive(self.root)
+        archive.record('prompt one', 'response one', file='a.py', bot='OpenAI', model='gpt-4')
+        archive.record('prompt two', '', False, 'timeout', file='b.py', bot='OpenAI', model='gpt-4')
+        archive.record('prompt one', 'response one again', file='a.py', bot='Anthropic', model='claude')
+        archive.close()
+
+        reopened = ResponseArchive(self.root)
+        self.assertEqual(len(reopened.index), 3)
+        self.assertEqual([entry['bot'] for entry in reopened.find(file='a.py')], ['OpenAI', 'Anthropic'])
+        self.assertEqual(reopened.find(prompt_hash=hash_text('prompt two'))[0]['is_valid'], False)
+        self.assertEqual(reopened.replay('prompt one')['response'], 'response one again')
+        self.assertEqual(reopened.replay('prompt one', bot='OpenAI')['response'], 'response one')
+        self.assertIsNone(reopened.replay('prompt two'))
+        self.assertEqual([record['error'] for record in reopened.records(file='b.py')], ['timeout'])
+
+    def test_segments_are_compressed_and_rotated(self):
+        archive = ResponseArchive(self.root, segment_bytes=200)
+        for index in range(10):
+            archive.record(f'prompt {index}', f'response {index} ' * 20)
+        archive.close()
+        segments = sorted(self.root.glob('responses-*.jsonl.gz'))
+        self.assertGreater(len(segments), 1)
+        with gzip.open(segments[0], 'rt') as segment:
+            self.assertEqual(json.loads(segment.readline())['prompt'], 'prompt 0')
+        self.assertEqual(ResponseArchive(self.root).replay('prompt 9')['response'], 'response 9 ' * 20)
+
+    def test_records_are_readable_while_the_segment_is_open(self):
+        archive = ResponseArchive(self.root)
+        archive.record('first', 'one')
+        self.assertEqual(archive.replay('first')['response'], 'one')
+        archive.record('second', 'two')
+        self.assertEqual(ResponseArchive(self.root).replay('second')['response'], 'two')
+        archive.close()
+
+    def test_a_new_session_does_not_overwrite_earlier_segments(self):
+        first = ResponseArchive(self.root)
+        first.record('first', 'one')
+        first.close()
+        second = ResponseArchive(self.root)
+        second.record('second', 'two')
+        second.close()
+        reopened = ResponseArchive(self.root)
+        self.assertEqual(len(list(self.root.glob('responses-*.jsonl.gz'))), 2)
+        self.assertEqual(reopened.replay('first')['response'], 'one')
+        self.assertEqual(reopened.replay('second')['response'], 'two')
+
+    def test_keep_responses_records_every_request_and_file_replays_them(self):
+        communicator = EchoCommunicator()
+        self.config.update({'verbose': False, 'keep_responses': True, 'response_archive_path': str(self.root),
+                            'bot': 'Echo', 'model': 'echo-1'})
+        with Logger.context(file='module.py'):
+            recorded = communicator.ask_for_docstrings('def f():\n    pass\n')
+        self.assertTrue(recorded.is_valid)
+        entries = ResponseArchive.shared(self.root).find(file='module.py', bot='Echo', model='echo-1')
+        self.assertEqual(len(entries), 1)
+
+        replaying = FileCommunicator()
+        self.config.update({'verbose': False, 'replay_archive': str(self.root), 'bot': 'File'})
+        replayed = replaying.ask_for_docstrings('def f():\n    pass\n')
+        self.assertEqual(replayed.content, recorded.content)
+        self.assertFalse(replaying.ask_for_docstrings('def g():\n    pass\n').is_valid)
+        # Replaying does not add to the archive
+        self.assertEqual(len(ResponseArchive.shared(self.root).index), 1)
+
+    def test_without_keep_responses_nothing_is_recorded(self):
+        communicator = EchoCommunicator()
+        self.config.update({'verbose': False, 'keep_responses': False, 'response_archive_path': str(self.root)})
+        communicator.ask_for_docstrings('def f():\n    pass\n')
+        self.assertFalse(any(self.root.iterdir()))
+
+if __name__ == '__main__':
+    unittest.main()
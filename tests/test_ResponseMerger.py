@@ -0,0 +1,66 @@
+import copy
+import os
+import sys
+import threading
+import unittest
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.ResponseMerger import ResponseMerger
+
+PARTS = [
+    {"docstrings": {"A": {"docstring": "Class A.", "methods": {"a": "Method a."}}}},
+    {"docstrings": {"A": {"methods": {"b": "Method b."}}, "global_functions": {"f": "Function f."}}},
+    {"docstrings": {"A": {"docstring": "Another A."}, "global_functions": {"g": "Function g."}}}
+]
+
+class TestResponseMerger(unittest.TestCase):
+    def test_merges_in_place_without_modifying_parts(self):
+        parts = copy.deepcopy(PARTS)
+        merger = ResponseMerger()
+        for part in parts:
+            merger.add(part)
+        self.assertEqual({
+            "A": {"docstring": "Another A.", "methods": {"a": "Method a.", "b": "Method b."}},
+            "global_functions": {"f": "Function f.", "g": "Function g."}
+        }, merger.result()["docstrings"])
+        self.assertEqual(["docstrings.A.docstring"], merger.conflicts)
+        self.assertEqual(PARTS, parts)
+
+    def test_repeated_values_are_not_conflicts(self):
+        merger = ResponseMerger()
+        merger.add(PARTS[0])
+        merger.add(PARTS[0])
+        self.assertEqual([], merger.conflicts)
+
+    def test_out_of_order_parts_merge_in_part_order(self):
+        merger = ResponseMerger()
+        merger.add(PARTS[2], 2)
+        merger.add(PARTS[1], 1)
+        self.assertEqual(2, merger.pending_count)
+        merger.add(PARTS[0], 0)
+        self.assertEqual(0, merger.pending_count)
+        self.assertEqual("Another A.", merger.result()["docstrings"]["A"]["docstring"])
+
+    def test_concurrent_parts_give_the_sequential_result(self):
+        parts = [{"docstrings": {f"C{index % 7}": {"methods": {f"m{index}": str(index)}, "docstring": str(index)}}} for index in range(64)]
+        sequential = ResponseMerger()
+        for part in parts:
+            sequential.add(part)
+        merger = ResponseMerger()
+        threads = [threading.Thread(target=merger.add, args=(part, index)) for index, part in reversed(list(enumerate(parts)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sequential.result(), merger.result())
+        self.assertEqual(sequential.conflicts, merger.conflicts)
+
+    def test_result_merges_parts_after_a_missing_one(self):
+        merger = ResponseMerger()
+        merger.add(PARTS[0], 0)
+        merger.add(PARTS[2], 2)
+        self.assertEqual("Another A.", merger.result()["docstrings"]["A"]["docstring"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.DependencyContainer import DependencyContainer
+dependencies = DependencyContainer()
+from DocStringGenerator.BaseBotCommunicator import BaseBotCommunicator
+from DocStringGenerator.CodeProcessor import CodeProcessor
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.Scheduler import Scheduler, git_modified_times
+from DocStringGenerator.Utility import APIResponse
+
+class FunctionCommunicator(BaseBotCommunicator):
+    """Documents the single global function of each file, recording the order files are asked about."""
+    def __init__(self):
+        super().__init__()
+        self.asked: list[str] = []
+
+    def ask_for_docstrings(self, source_code: str, retry_count: int=1) -> APIResponse:
+        name = source_code.split('def ')[1].split('(')[0]
+        self.asked.append(name)
+        return APIResponse(json.dumps({"docstrings": {"global_functions": {name: f"Documents {name}."}}}), True)
+
+class TokenCommunicator(BaseBotCommunicator):
+    """Answers through ask(), so requests are counted in the instrumentation like those of a real bot."""
+    def __init__(self):
+        super().__init__()
+        self.asked: list[str] = []
+        self.lock = threading.Lock()
+
+    def ask(self, prompt, replacements, keep_history: bool = True) -> APIResponse:
+        name = replacements['source_code'].split('def ')[1].split('(')[0]
+        with self.lock:
+            self.asked.append(name)
+        time.sleep(0.01)
+        return APIResponse(json.dumps({"docstrings": {"global_functions": {name: f"Documents {name}."}}}), True)
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.files: list[Path] = []
+        for name, size in (('a', 30), ('b', 10), ('c', 20)):
+            path = Path(self.root, f'{name}.py')
+            path.write_text('x' * size)
+            self.files.append(path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def names(self, scheduler: Scheduler) -> list[str]:
+        return [path.stem for path in scheduler.schedule(iter(self.files), self.root)]
+
+    def test_orders(self):
+        os.utime(self.files[0], (1000, 1000))
+        os.utime(self.files[1], (3000, 3000))
+        os.utime(self.files[2], (2000, 2000))
+        self.assertEqual(['a', 'b', 'c'], self.names(Scheduler('walk')))
+        self.assertEqual(['b', 'c', 'a'], self.names(Scheduler('smallest')))
+        self.assertEqual(['a', 'c', 'b'], self.names(Scheduler('largest')))
+        self.assertEqual(['b', 'c', 'a'], self.names(Scheduler('recent')))
+        with self.assertRaises(ValueError):
+            Scheduler('random')
+
+    def test_priority_files_come_first(self):
+        self.assertEqual(['c', 'a', 'b'], self.names(Scheduler('walk', ['c.py'])))
+        listing = Path(self.root, 'changed.txt')
+        listing.write_text(f'{self.files[0]}\nb.py\n')
+        self.assertEqual(['a', 'b', 'c'], self.names(Scheduler('largest', str(listing))))
+
+    def test_token_budget_stops_scheduling(self):
+        used = [0]
+        scheduler = Scheduler('walk', token_budget=100, tokens_used=lambda: used[0])
+        scheduled = []
+        for path in scheduler.schedule(iter(self.files), self.root):
+            scheduled.append(path.stem)
+            used[0] += 60
+        self.assertEqual(['a', 'b'], scheduled)
+        self.assertEqual(2, scheduler.scheduled)
+        self.assertIn('token budget', scheduler.exhausted)
+
+    def test_files_in_flight_hold_back_the_token_budget(self):
+        used = [0]
+        scheduler = Scheduler('walk', token_budget=100, tokens_used=lambda: used[0])
+        self.assertTrue(scheduler.admit(60))
+        # The first request has not been counted yet, but its estimate leaves no room for a second one
+        self.assertFalse(scheduler.admit(60))
+        self.assertIn('token budget', scheduler.exhausted)
+        scheduler.release(60)
+        self.assertFalse(scheduler.admit(10))
+        self.assertEqual(1, scheduler.started)
+
+        scheduler = Scheduler('walk', token_budget=100, tokens_used=lambda: used[0])
+        # With nothing in flight a file starts while any budget is left, even if its estimate is larger
+        self.assertTrue(scheduler.admit(500))
+        scheduler.release(500)
+        self.assertTrue(scheduler.admit(500))
+
+    def test_git_commit_time_outranks_the_file_time(self):
+        def git(*args: str):
+            subprocess.run(['git', *args], cwd=self.root, capture_output=True, check=True,
+                           env={**os.environ, 'GIT_AUTHOR_DATE': '@2000 +0000', 'GIT_COMMITTER_DATE': '@2000 +0000'})
+        try:
+            git('init', '-q')
+            git('-c', 'user.name=test', '-c', 'user.email=test@example.com', 'add', 'a.py', 'b.py')
+            git('-c', 'user.name=test', '-c', 'user.email=test@example.com', 'commit', '-q', '-m', 'initial')
+        except (OSError, subprocess.CalledProcessError):
+            self.skipTest('git is not available')
+        for path in self.files:
+            os.utime(path, (5000, 5000))
+        os.utime(self.files[2], (1000, 1000))
+        times = git_modified_times(self.root)
+        self.assertEqual(2000, times[self.files[0].resolve()])
+        # c.py is untracked, so its own time is used
+        self.assertEqual(1000, times[self.files[2].resolve()])
+        self.files[1].write_text('changed')
+        os.utime(self.files[1], (3000, 3000))
+        self.assertEqual(['b', 'a', 'c'], self.names(Scheduler('recent')))
+
+class TestScheduledRun(unittest.TestCase):
+    def setUp(self):
+        self.config = ConfigManager().config
+        self.saved_config = dict(self.config)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.code_processor: CodeProcessor = dependencies.resolve(CodeProcessor)
+        self.saved_communicator = self.code_processor.communicator_manager.bot_communicator
+
+    def tearDown(self):
+        self.code_processor.communicator_manager.bot_communicator = self.saved_communicator
+        self.tmpdir.cleanup()
+        self.config.clear()
+        self.config.update(self.saved_config)
+
+    def test_files_are_processed_in_schedule_order_within_the_budget(self):
+        source_folder = Path(self.root, 'src')
+        source_folder.mkdir()
+        for name, padding in (('big', 400), ('small', 0), ('medium', 200)):
+            Path(source_folder, f'{name}.py').write_text(f'def {name}():\n    return 1\n' + '#' * padding + '\n')
+        journal_path = Path(self.root, 'checkpoint.jsonl')
+        communicator = FunctionCommunicator()
+        self.code_processor.communicator_manager.bot_communicator = communicator
+        self.config.update({'path': str(source_folder), 'output_path': str(Path(self.root, 'out')), 'wipe_docstrings': False,
+                            'include_subfolders': False, 'disable_log_processed_file': True, 'verbose': False,
+                            'checkpoint_path': str(journal_path), 'schedule': 'smallest', 'time_budget': 1e-9,
+                            'pipeline_workers': {stage: 1 for stage in ('read', 'request', 'parse', 'insert', 'examples', 'verify')}})
+
+        response = self.code_processor.process_folder_or_file()
+        self.assertTrue(response.is_valid)
+        self.assertEqual([], communicator.asked)
+        self.assertTrue(journal_path.exists())
+
+        self.config['time_budget'] = 0
+        response = self.code_processor.process_folder_or_file()
+        self.assertTrue(response.is_valid)
+        self.assertEqual(['small', 'medium', 'big'], communicator.asked)
+        self.assertFalse(journal_path.exists())
+
+    def test_token_budget_holds_back_queued_files(self):
+        source_folder = Path(self.root, 'src')
+        source_folder.mkdir()
+        for index in range(20):
+            Path(source_folder, f'f{index}.py').write_text(f'def f{index}():\n    return {index}\n')
+        journal_path = Path(self.root, 'checkpoint.jsonl')
+        communicator = TokenCommunicator()
+        self.code_processor.communicator_manager.bot_communicator = communicator
+        self.config.update({'path': str(source_folder), 'output_path': str(Path(self.root, 'out')), 'wipe_docstrings': False,
+                            'include_subfolders': False, 'disable_log_processed_file': True, 'verbose': False,
+                            'checkpoint_path': str(journal_path), 'token_budget': 1})
+
+        response = self.code_processor.process_folder_or_file()
+        self.assertTrue(response.is_valid)
+        self.assertEqual(1, len(communicator.asked))
+        self.assertEqual([f'{communicator.asked[0]}.py'], os.listdir(Path(self.root, 'out')))
+        self.assertTrue(journal_path.exists())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import sys
+import unittest
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.SourceBuffer import SourceBuffer
+from DocStringGenerator.CodeProcessor import CodeProcessor
+
+SOURCE = "class A:\n    def f(self):\n        return 'é'\n\ndef g():\n    pass\n"
+
+class TestSourceBuffer(unittest.TestCase):
+    def test_lines(self):
+        buffer = SourceBuffer(SOURCE)
+        self.assertEqual(len(buffer), SOURCE.count('\n') + 1)
+        self.assertEqual(buffer.line(3), "        return 'é'")
+        self.assertEqual(buffer[2], "        return 'é'")
+        self.assertEqual(buffer.lines(1, 3), "    def f(self):\n        return 'é'\n")
+        self.assertEqual(buffer.lines(4, 100), "def g():\n    pass\n")
+        self.assertEqual(buffer[-1], '')
+        with self.assertRaises(IndexError):
+            buffer[len(buffer)]
+
+    def test_all_line_breaks_end_a_line(self):
+        buffer = SourceBuffer('a = 1\r\nb = 2\rc = 3\n')
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(buffer[1], 'b = 2')
+        self.assertEqual(buffer.lines(0, 2), 'a = 1\r\nb = 2\r')
+
+    def test_empty_text(self):
+        buffer = SourceBuffer('')
+        self.assertEqual(len(buffer), 1)
+        self.assertEqual(buffer.lines(0, 1), '')
+
+    def test_split_parts_are_slices_of_the_source(self):
+        code_processor = CodeProcessor()
+        parts = code_processor.split_source_code(SOURCE, 2)
+        self.assertEqual(''.join(parts), SOURCE)
+        self.assertEqual(parts[0], "class A:\n    def f(self):\n        return 'é'\n")
+        invalid_source = "def f(:\n    pass\nx = 1\n"
+        self.assertEqual(''.join(code_processor.split_source_code(invalid_source, 3)), invalid_source)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import unittest
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.SourcePatcher import SourcePatcher
+
+SOURCE = "class A:\n    def f(self):\n        return 1\n"
+
+class TestSourcePatcher(unittest.TestCase):
+    def test_edits_are_applied_in_one_pass(self):
+        patcher = SourcePatcher(SOURCE)
+        patcher.replace(3, 15, 3, 16, "2")
+        patcher.insert_lines_after(1, '    """Doc."""')
+        patcher.insert(1, 0, "# header\n")
+        response = patcher.apply()
+        self.assertTrue(response.is_valid)
+        self.assertEqual('# header\nclass A:\n    """Doc."""\n    def f(self):\n        return 2\n', response.content)
+
+    def test_inserts_at_same_position_keep_their_order(self):
+        patcher = SourcePatcher(SOURCE)
+        patcher.insert_lines_after(3, "    def g(self):\n        pass")
+        patcher.insert_lines_after(3, "    def h(self):\n        pass")
+        content = patcher.apply().content
+        self.assertLess(content.index("def g"), content.index("def h"))
+        self.assertTrue(content.endswith("pass\n"))
+
+    def test_overlapping_edits_conflict(self):
+        patcher = SourcePatcher(SOURCE)
+        patcher.delete(2, 0, 3, 16)
+        patcher.replace(3, 8, 3, 16, "pass")
+        patcher.insert(2, 0, "    # boundary insert is fine\n")
+        self.assertEqual(1, len(patcher.conflicts()))
+        response = patcher.apply()
+        self.assertFalse(response.is_valid)
+        self.assertIn("Conflicting edit", response.error_message)
+
+    def test_crlf_and_unicode_columns(self):
+        patcher = SourcePatcher("x = 'é'\r\ny = 1\r\n")
+        self.assertEqual(4, patcher.char_column(1, 4))
+        self.assertEqual(7, patcher.char_column(1, 8))
+        patcher.insert_lines_after(1, "z = 2")
+        self.assertEqual("x = 'é'\r\nz = 2\r\ny = 1\r\n", patcher.apply().content)
+
+    def test_unified_diff(self):
+        patcher = SourcePatcher(SOURCE)
+        patcher.replace(3, 15, 3, 16, "2")
+        diff = patcher.diff("a.py").content
+        self.assertIn("--- a/a.py", diff)
+        self.assertIn("-        return 1", diff)
+        self.assertIn("+        return 2", diff)
+
+if __name__ == '__main__':
+    unittest.main()
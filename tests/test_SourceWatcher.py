@@ -0,0 +1,123 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.DependencyContainer import DependencyContainer
+dependencies = DependencyContainer()
+from DocStringGenerator.BaseBotCommunicator import BaseBotCommunicator
+from DocStringGenerator.CodeProcessor import CodeProcessor
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.FileDiscovery import FileDiscovery
+from DocStringGenerator.SourceWatcher import SourceWatcher
+from DocStringGenerator.Utility import APIResponse
+
+DOCUMENTED = 'def first():\n    """Returns one."""\n    return 1\n'
+
+class FunctionCommunicator(BaseBotCommunicator):
+    """Answers every request for missing docstrings of global functions, recording the names asked about."""
+    def __init__(self):
+        super().__init__()
+        self.asked: list[list[str]] = []
+
+    def ask(self, prompt, replacements, keep_history: bool = True) -> APIResponse:
+        names: list[str] = json.loads(replacements['function_names'])
+        self.asked.append(names)
+        return APIResponse(json.dumps({"docstrings": {"global_functions": {name: f"New {name}." for name in names}}}), True)
+
+class TestSourceWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.path = Path(self.root, 'module.py').absolute()
+        self.path.write_text('x = 1\n')
+        self.now = 0.0
+        self.watcher = SourceWatcher(self.root, FileDiscovery(), debounce=1.0, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def save(self, path: Path, content: str | bytes, mtime: int):
+        if isinstance(content, bytes):
+            path.write_bytes(content)
+        else:
+            path.write_text(content)
+        os.utime(path, ns=(mtime * 10**9, mtime * 10**9))
+
+    def poll_at(self, now: float) -> list[Path]:
+        self.now = now
+        return self.watcher.poll()
+
+    def test_saves_are_debounced(self):
+        self.save(self.path, 'x = 2\n', 100)
+        self.assertEqual([], self.poll_at(0))
+        self.save(self.path, 'x = 23\n', 101)
+        self.assertEqual([], self.poll_at(0.5))
+        self.assertEqual([], self.poll_at(1.4))
+        self.assertEqual([self.path], self.poll_at(1.6))
+        self.assertEqual([], self.poll_at(5))
+
+    def test_new_files_are_reported_and_binary_files_skipped(self):
+        added = Path(self.root, 'added.py').absolute()
+        self.save(added, 'y = 1\n', 100)
+        self.save(Path(self.root, 'binary.py'), b'\0\1', 100)
+        self.assertEqual([], self.poll_at(0))
+        self.assertEqual([added], self.poll_at(1))
+
+    def test_refreshed_writes_are_not_changes(self):
+        self.save(self.path, 'x = 2\n', 100)
+        self.watcher.refresh(self.path)
+        self.assertEqual([], self.poll_at(0))
+        self.assertEqual([], self.poll_at(2))
+
+class TestWatchMode(unittest.TestCase):
+    def setUp(self):
+        self.config = ConfigManager().config
+        self.saved_config = dict(self.config)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.code_processor: CodeProcessor = dependencies.resolve(CodeProcessor)
+        self.saved_communicator = self.code_processor.communicator_manager.bot_communicator
+
+    def tearDown(self):
+        self.code_processor.communicator_manager.bot_communicator = self.saved_communicator
+        self.tmpdir.cleanup()
+        self.config.clear()
+        self.config.update(self.saved_config)
+
+    def wait_for(self, path: Path, text: str):
+        deadline = time.monotonic() + 10
+        while text not in path.read_text() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertIn(text, path.read_text())
+
+    def test_only_edited_definitions_are_documented(self):
+        path = Path(self.root, 'module.py')
+        path.write_text(DOCUMENTED)
+        communicator = FunctionCommunicator()
+        self.code_processor.communicator_manager.bot_communicator = communicator
+        self.config.update({'path': str(self.root), 'in_place': True, 'output_path': '', 'wipe_docstrings': False, 'include_subfolders': False,
+                            'disable_log_processed_file': True, 'verbose': False, 'watch_interval': 0.02, 'watch_debounce': 0.05})
+        stop = threading.Event()
+        watcher_thread = threading.Thread(target=self.code_processor.watch, args=(stop,), daemon=True)
+        watcher_thread.start()
+        try:
+            time.sleep(0.1)
+            path.write_text(DOCUMENTED + '\ndef second():\n    return 2\n')
+            self.wait_for(path, 'New second.')
+            path.write_text(path.read_text() + '\ndef third():\n    return 3\n')
+            self.wait_for(path, 'New third.')
+        finally:
+            stop.set()
+            watcher_thread.join(5)
+        self.assertEqual([['second'], ['third']], communicator.asked)
+        self.assertIn('Returns one.', path.read_text())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import ast
 import unittest
 import os
 import sys
@@ -161,3 +162,22 @@ class OuterClass:
         self.assertIn("print(f\"Line {i}\")", response.content)
         self.assertIn("print(\"End of multi-line example\")", response.content)        
 
+
+    def test_many_classes_single_pass(self):
+        code_source = "".join(f"class Class{i}:\n    def method(self):\n        pass\n\n" for i in range(50))
+        examples = {f"Class{i}": f"print({i})" for i in range(50)}
+        response = self.code_processor.add_example_functions_to_classes(code_source, examples)
+        self.assertTrue(response.is_valid)
+
+        tree = ast.parse(response.content)
+        for i, node in enumerate(tree.body):
+            self.assertEqual(f"Class{i}", node.name)
+            self.assertEqual(["method", f"example_function_Class{i}"], [method.name for method in node.body])
+
+    def test_nested_class_example_indentation(self):
+        code_source = "class OuterClass:\n    class InnerClass:\n        def inner_method(self):\n            pass\n"
+        response = self.code_processor.add_example_functions_to_classes(code_source, {"InnerClass": "print('inner')"})
+        self.assertTrue(response.is_valid)
+
+        inner_class = ast.parse(response.content).body[0].body[0]
+        self.assertEqual("example_function_InnerClass", inner_class.body[-1].name)
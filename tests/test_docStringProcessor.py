@@ -154,6 +154,13 @@ class TestExtractDocstrings(unittest.TestCase):
         
         response = self.docstring_processor.extract_docstrings(responses)
         self.assertFalse(response.is_valid)
+    def test_parse_json_structured_and_free_text(self):
+        structured = self.docstring_processor.parse_json('{"docstrings": {"global_functions": {}}}')
+        self.assertTrue(structured.is_valid)
+        free_text = self.docstring_processor.parse_json('Here you go:\n{"docstrings": {"global_functions": {}}}\nThanks')
+        self.assertTrue(free_text.is_valid)
+        self.assertEqual(structured.content, free_text.content)
+
 # Add more tests as needed
 
 if __name__ == '__main__':
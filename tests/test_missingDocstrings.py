@@ -0,0 +1,131 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.DependencyContainer import DependencyContainer
+dependencies = DependencyContainer()
+from DocStringGenerator.BaseBotCommunicator import BaseBotCommunicator
+from DocStringGenerator.CodeProcessor import CodeProcessor
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.Utility import APIResponse
+
+SOURCE = '''class Calculator:
+    """Adds numbers."""
+
+    def add(self, a, b):
+        """Returns a + b."""
+        return a + b
+
+    def subtract(self, a, b):
+        return a - b
+
+def helper():
+    return 1
+'''
+
+class RecordingCommunicator(BaseBotCommunicator):
+    def __init__(self, responses: list[dict | None]):
+        """responses are answered in turn; None fails the request."""
+        super().__init__()
+        self.responses = responses
+        self.calls: list[tuple[dict[str, str], bool]] = []
+
+    def ask(self, prompt, replacements, keep_history: bool = True) -> APIResponse:
+        self.calls.append((replacements, keep_history))
+        response = self.responses[len(self.calls) - 1]
+        if response is None:
+            return APIResponse("", False, "Service unavailable.")
+        return APIResponse(json.dumps(response), True)
+
+class TestMissingDocstrings(unittest.TestCase):
+    def setUp(self):
+        self.config = ConfigManager().config
+        self.saved_config = dict(self.config)
+        self.code_processor: CodeProcessor = dependencies.resolve(CodeProcessor)
+        self.saved_communicator = self.code_processor.communicator_manager.bot_communicator
+
+    def tearDown(self):
+        self.code_processor.communicator_manager.bot_communicator = self.saved_communicator
+        self.config.clear()
+        self.config.update(self.saved_config)
+
+    def test_targeted_stateless_request(self):
+        communicator = RecordingCommunicator([
+            {"docstrings": {"Calculator": {"methods": {"add": "Duplicate.", "subtract": "Returns a - b."}}}},
+            {"docstrings": {"global_functions": {"helper": "Returns one."}}}
+        ])
+        self.code_processor.communicator_manager.bot_communicator = communicator
+        self.config['verbose'] = False
+
+        response = self.code_processor.add_missing_docstrings(SOURCE)
+        self.assertTrue(response.is_valid)
+        self.assertIn('"""Returns a - b."""', response.content)
+        self.assertIn('"""Returns one."""', response.content)
+        self.assertNotIn('Duplicate', response.content)
+
+        first_call, keep_history = communicator.calls[0]
+        self.assertFalse(keep_history)
+        self.assertEqual(["Calculator.subtract", "helper"], json.loads(first_call['function_names']))
+        self.assertIn("def subtract(self, a, b):", first_call['source_snippets'])
+        self.assertNotIn("def add", first_call['source_snippets'])
+        # The retry only asks for what is still missing
+        self.assertEqual(["helper"], json.loads(communicator.calls[1][0]['function_names']))
+        self.assertEqual('2', communicator.calls[1][0]['retry_count'])
+
+    def test_async_definitions_are_documented_with_one_request(self):
+        source = 'class Client:\n    async def fetch(self):\n        return 1\n\nasync def main():\n    return 2\n\nasync def other():\n    return 3\n'
+        communicator = RecordingCommunicator([
+            {"docstrings": {"Client": {"docstring": "A client.", "methods": {"fetch": "Fetches."}}, "global_functions": {"main": "Runs."}}},
+            {"docstrings": {"global_functions": {"unknown": "Not in the source."}}}
+        ])
+        self.code_processor.communicator_manager.bot_communicator = communicator
+        self.config['verbose'] = False
+
+        response = self.code_processor.add_missing_docstrings(source)
+        self.assertIn('"""Fetches."""', response.content)
+        self.assertIn('"""Runs."""', response.content)
+        # The second answer inserts nothing, so no third request is sent
+        self.assertEqual(2, len(communicator.calls))
+
+    def test_a_failed_request_is_invalid(self):
+        communicator = RecordingCommunicator([{"docstrings": {"Calculator": {"methods": {"subtract": "Returns a - b."}}}}, None])
+        self.code_processor.communicator_manager.bot_communicator = communicator
+        self.config['verbose'] = False
+
+        response = self.code_processor.add_missing_docstrings(SOURCE)
+        self.assertFalse(response.is_valid)
+        self.assertEqual("Service unavailable.", response.error_message)
+        self.assertIn('"""Returns a - b."""', response.content)
+
+    def test_partly_documented_files_are_asked_only_for_what_is_missing(self):
+        with tempfile.TemporaryDirectory() as root:
+            Path(root, 'partial.py').write_text(SOURCE)
+            Path(root, 'documented.py').write_text('def documented():\n    """Documented."""\n')
+            communicator = RecordingCommunicator([
+                {"docstrings": {"Calculator": {"methods": {"subtract": "Returns a - b."}}, "global_functions": {"helper": "Returns one."}}}
+            ])
+            self.code_processor.communicator_manager.bot_communicator = communicator
+            self.config.update({'path': root, 'skip_documented_files': True, 'wipe_docstrings': False, 'in_place': True, 'output_path': '',
+                                'include_subfolders': False, 'disable_log_processed_file': True, 'verbose': False})
+
+            response = self.code_processor.process_folder_or_file()
+            self.assertTrue(response.is_valid)
+            self.assertEqual(1, len(communicator.calls))
+            self.assertEqual(["Calculator.subtract", "helper"], json.loads(communicator.calls[0][0]['function_names']))
+            documented = Path(root, 'partial.py').read_text()
+            self.assertIn('"""Returns a + b."""', documented)
+            self.assertIn('"""Returns a - b."""', documented)
+            self.assertIn('"""Returns one."""', documented)
+
+    def test_format_missing_definitions_reduces_classes_to_headers(self):
+        source = 'class Big(Base):\n    x = 1\n    y = 2\n'
+        missing = [{"name": "Big", "kind": "ClassDef", "class": "", "line": 1, "body_line": 2, "end_line": 3}]
+        self.assertEqual("# Big\nclass Big(Base):\n    ...", self.code_processor.format_missing_definitions(source, missing))
+
+if __name__ == '__main__':
+    unittest.main()
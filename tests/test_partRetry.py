@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+import unittest
+current = os.path.dirname(os.path.realpath(__file__))
+parent = os.path.dirname(current)
+sys.path.append(f"{parent}")
+from DocStringGenerator.DependencyContainer import DependencyContainer
+dependencies = DependencyContainer()
+from DocStringGenerator.BaseBotCommunicator import BaseBotCommunicator
+from DocStringGenerator.CodeProcessor import CodeProcessor
+from DocStringGenerator.DocstringProcessor import DocstringProcessor
+from DocStringGenerator.ConfigManager import ConfigManager
+from DocStringGenerator.Utility import APIResponse
+
+SOURCE = '''def first():
+    return 1
+
+def second():
+    return 2
+'''
+
+class PartCommunicator(BaseBotCommunicator):
+    def __init__(self, replies: dict[str, list[str]]):
+        super().__init__()
+        self.replies = replies
+        self.calls: list[tuple[str, str]] = []
+
+    def ask_for_docstrings(self, source_code: str, retry_count: int=1) -> APIResponse:
+        self.calls.append(('ask_for_docstrings', source_code))
+        return APIResponse(self.replies[source_code].pop(0), True)
+
+    def ask_retry_part(self, source_code: str, last_error_message: str, retry_count: int) -> APIResponse:
+        self.calls.append(('ask_retry_part', source_code))
+        return APIResponse(self.replies[source_code].pop(0), True)
+
+class TestPartRetry(unittest.TestCase):
+    def setUp(self):
+        self.config = ConfigManager().config
+        self.saved_config = dict(self.config)
+        self.code_processor: CodeProcessor = dependencies.resolve(CodeProcessor)
+        self.saved_communicator = self.code_processor.communicator_manager.bot_communicator
+        self.saved_split = self.code_processor.split_source_code
+
+    def tearDown(self):
+        self.code_processor.communicator_manager.bot_communicator = self.saved_communicator
+        self.code_processor.split_source_code = self.saved_split
+        self.config.clear()
+        self.config.update(self.saved_config)
+
+    def test_only_the_failed_part_is_asked_again(self):
+        first, second = 'def first():\n    return 1\n\n', 'def second():\n    return 2\n'
+        communicator = PartCommunicator({
+            first: [json.dumps({"docstrings": {"global_functions": {"first": "Returns one."}}})],
+            second: ['Not JSON', json.dumps({"docstrings": {"global_functions": {"second": "Returns two."}}})]
+        })
+        self.code_processor.communicator_manager.bot_communicator = communicator
+        self.config['verbose'] = False
+        # Two parts without depending on the length-exceeded fallback
+        self.code_processor.split_source_code = lambda source_code, num_parts: [first, second]
+        self.config['wipe_docstrings'] = False
+        response = self.code_processor.process_code(SOURCE)
+        self.assertTrue(response.is_valid)
+        self.assertIn('"""Returns one."""', response.content)
+        self.assertIn('"""Returns two."""', response.content)
+        self.assertEqual([('ask_for_docstrings', first), ('ask_for_docstrings', second), ('ask_retry_part', second)], communicator.calls)
+
+    def test_split_class_is_not_blamed_on_the_part_without_its_docstring(self):
+        docstring_processor: DocstringProcessor = dependencies.resolve(DocstringProcessor)
+        responses = [
+            {'content': json.dumps({"docstrings": {"A": {"docstring": "Class A.", "methods": {"a": "Method a."}}}}), 'part_index': 0},
+            {'content': json.dumps({"docstrings": {"A": {"methods": {"b": "Method b."}}}}), 'part_index': 1},
+            {'content': json.dumps({"docstrings": {"B": {"methods": {"c": "Method c."}}}}), 'part_index': 2}
+        ]
+        response = docstring_processor.extract_docstrings(responses)
+        self.assertFalse(response.is_valid)
+        self.assertEqual([2], [part['part_index'] for part in response.content])
+        self.assertIn("Part 3 of 3", response.error_message)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -183,6 +183,28 @@ class TestValidateResponse(unittest.TestCase):
         self.assertFalse(response.is_valid)
         self.assertIn("Method 'example_method' docstring should be a string", response.error_message)
 
+    def test_class_without_methods(self):
+        json_object = {"docstrings": {"example_class": {"docstring": "Class docstring"}}}
+        response = self.validator.validate_response(json_object)
+        self.assertTrue(response.is_valid)
+
+    def test_all_errors_reported_at_once(self):
+        json_object = {
+            "docstrings": {
+                "first_class": {"methods": {"ok": "Fine"}},
+                "second_class": {"docstring": "Doc", "methods": {"bad": 1, "long": "b" * 60}},
+                "global_functions": {"also_bad": ["list"]}
+            }
+        }
+        response = self.validator.validate_response(json_object, max_length=50)
+        self.assertFalse(response.is_valid)
+        errors = response.error_message.splitlines()
+        self.assertEqual(4, len(errors))
+        self.assertIn("Class 'first_class' should contain a 'docstring'", errors[0])
+        self.assertIn("Method 'bad' docstring should be a string", errors[1])
+        self.assertIn("Docstring line in 'long' exceeds maximum length of 50", errors[2])
+        self.assertIn("Method 'also_bad' docstring should be a string", errors[3])
+
 
 if __name__ == '__main__':
     unittest.main()
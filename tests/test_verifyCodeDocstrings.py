@@ -47,6 +47,16 @@ def example(
         self.assertEqual(response.content, "")
         self.assertIn("Invalid Python code", response.error_message)
 
+    def test_async_functions_and_classes_are_checked(self):
+        source = '''
+class Example:
+    async def run(self):
+        pass
+'''
+        response = self.function_to_test(source)
+        self.assertFalse(response.is_valid)
+        self.assertEqual(["Example", "run"], response.content)
+
 # More tests can be added here for different scenarios
 
 if __name__ == '__main__':